@@ -0,0 +1,161 @@
+"""
+Bulk delay scoring for flight schedule files.
+
+Reads the schedule in chunks, fans the chunks out to a process pool (each worker loads the
+model once), and streams predictions and probabilities to the output CSV in input order.
+Preprocessing is the Predictor's: the same lookups and `utils.features.build_feature_frame`.
+
+Input columns: airline_name, month (Jan..Dec), day_of_week (Mon..Sun), dep_hour (0-23),
+and either route ("ORIGIN - DEST") or origin + dest.
+
+Rows the model can't score (an origin, distance haul or cluster it never saw in training) are
+written with empty predictions and the reason in the 'error' column, as are all rows of a chunk
+that fails; the rest of the file is still scored.
+
+Usage:
+    python scripts/batch_score.py schedule.csv scored.csv --workers 8
+    python scripts/batch_score.py schedule.csv scored.csv --scaling 1,2,4,8 --limit 2000000
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.alternatives import score_batch, unknown_categories  # noqa: E402
+from utils.artifacts import latest_model_path, load_model  # noqa: E402
+from utils.clusters import make_cluster_assigners  # noqa: E402
+from utils.data import load_lookups  # noqa: E402
+from utils.features import build_feature_frame, index_lookups  # noqa: E402
+from utils.flight_summaries import load_flight_summaries  # noqa: E402
+
+OUTPUT_COLS = ['dep_delay_pred', 'arr_delay_pred', 'dep_delay_proba', 'arr_delay_proba', 'error']
+
+# Per-worker state, set once by the pool initializer
+_worker = {}
+
+
+def init_worker(model_path, lookups):
+    _worker["pipeline"] = load_model(model_path)
+    _worker["lookups"] = lookups
+
+
+def score_chunk(chunk):
+    """Scores one chunk in a worker and returns it with the prediction columns appended."""
+    raw = chunk
+    if 'route' not in raw.columns:
+        raw = raw.assign(route=raw['origin'] + ' - ' + raw['dest'])
+
+    features = build_feature_frame(raw, _worker["lookups"])
+    errors = unknown_categories(_worker["pipeline"], features)
+    scorable = errors == ''
+
+    proba = np.full((len(chunk), 2), np.nan)
+    if scorable.any():
+        proba[scorable] = score_batch(_worker["pipeline"], features[scorable])
+    return with_predictions(chunk, proba, np.where(scorable, '', 'unknown ' + errors.astype(str)))
+
+
+def with_predictions(chunk, proba, errors):
+    """`chunk` with the OUTPUT_COLS appended; predictions stay empty where proba is NaN."""
+    missing = np.isnan(proba)
+    scored = chunk.copy()
+    scored['dep_delay_pred'] = pd.array(np.where(missing[:, 0], None, proba[:, 0] > 0.5), dtype='Int8')
+    scored['arr_delay_pred'] = pd.array(np.where(missing[:, 1], None, proba[:, 1] > 0.5), dtype='Int8')
+    scored['dep_delay_proba'] = proba[:, 0].round(4)
+    scored['arr_delay_proba'] = proba[:, 1].round(4)
+    scored['error'] = errors
+    return scored
+
+
+def score_file(input_path, output_path, model_path, lookups, workers, chunksize, limit=None):
+    """
+    Scores `input_path` into `output_path` with `workers` processes.
+
+    At most 2 × workers chunks are in flight, so memory stays bounded on very large files,
+    and results are written in input order.
+
+    Returns:
+        rows (int): Rows written.
+        flagged (int): Rows written without predictions (see the 'error' column).
+    """
+    reader = pd.read_csv(input_path, chunksize=chunksize, nrows=limit)
+    in_flight = deque()
+    rows = flagged = 0
+    header = True
+
+    def write_oldest():
+        nonlocal rows, flagged, header
+        chunk, future = in_flight.popleft()
+        try:
+            scored = future.result()
+        except Exception as e:
+            # One bad chunk is flagged row by row instead of ending the run
+            print(f"Chunk at row {rows:,} failed: {type(e).__name__}: {e}")
+            scored = with_predictions(chunk, np.full((len(chunk), 2), np.nan), f"{type(e).__name__}: {e}")
+        scored.to_csv(output_path, mode='w' if header else 'a', header=header, index=False)
+        header = False
+        rows += len(scored)
+        flagged += int((scored['error'] != '').sum())
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(str(model_path), lookups)) as pool:
+        for chunk in reader:
+            in_flight.append((chunk, pool.submit(score_chunk, chunk)))
+            if len(in_flight) >= 2 * workers:
+                write_oldest()
+        while in_flight:
+            write_oldest()
+
+    return rows, flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Schedule CSV")
+    parser.add_argument("output", help="Where to write the scored CSV")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--model", default=None, help="Pipeline pickle (default: latest logreg_pipeline)")
+    parser.add_argument("--limit", type=int, default=None, help="Only score the first N rows")
+    parser.add_argument("--scaling", default=None,
+                        help="Comma-separated worker counts to benchmark instead of a single run, e.g. 1,2,4,8")
+    args = parser.parse_args()
+
+    model_path = args.model or latest_model_path("logreg_pipeline")
+    lookup_tables = load_lookups()
+    lookups = index_lookups(*lookup_tables)
+    summaries = load_flight_summaries()
+    stats = {"dest": summaries["dest_stats"], "route": summaries["route_stats"]}
+    lookups.update(make_cluster_assigners(stats, lookup_tables[2], lookup_tables[3]))
+
+    worker_counts = [int(n) for n in args.scaling.split(",")] if args.scaling else [args.workers]
+    results = []
+
+    for workers in worker_counts:
+        start = time.perf_counter()
+        rows, flagged = score_file(args.input, args.output, model_path, lookups, workers, args.chunksize, args.limit)
+        seconds = time.perf_counter() - start
+        results.append({"Workers": workers, "Rows": rows, "Seconds": seconds, "Rows/s": rows / seconds})
+        print(f"{workers:>3} workers: {rows:,} rows in {seconds:.1f}s ({rows / seconds:,.0f} rows/s)"
+              + (f", {flagged:,} not scorable (see 'error')" if flagged else ""))
+
+    if len(results) > 1:
+        results = pd.DataFrame(results)
+        results["Speedup"] = results["Rows/s"] / results["Rows/s"].iloc[0]
+        results["Efficiency"] = results["Speedup"] / (results["Workers"] / results["Workers"].iloc[0])
+        print("\n==== Scaling ====")
+        print(results.round(2).to_string(index=False))
+
+    print(f"\nWrote {args.output} (model: {Path(model_path).name})")
+
+
+if __name__ == "__main__":
+    main()
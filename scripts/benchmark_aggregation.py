@@ -0,0 +1,154 @@
+"""
+Times the EDA page's aggregations: pandas groupbys vs the bincount engine (utils.aggregation).
+
+On synthetic flights with the EDA columns it compares, per data size:
+  - pandas on string keys: one groupby per dimension, plus the "ORIGIN - DEST" route column
+    (what the EDA page did before the codebook);
+  - pandas on codebook categoricals: the same groupbys on integer-backed columns;
+  - the engine: one bincount pass over the codes of every dimension (code preparation, done
+    once per data load, is reported separately), unfiltered and with a one-month filter.
+
+Every engine table is checked equal to the string-key groupby result.
+
+Usage:
+    python scripts/benchmark_aggregation.py --rows 1000000,10000000,30000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.aggregation import CodeAggregator, Dimension, group_means  # noqa: E402
+from utils.encoding import codebook_for, encode_flights  # noqa: E402
+
+ORDERS = {
+    'month': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
+    'day_of_week': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+    'time_block': ['12am–6am', '6am–9am', '9am–12pm', '12pm–3pm', '3pm–6pm', '6pm–9pm', '9pm–12am'],
+}
+FLAGS = ['dep_delayed_15', 'arr_delayed_15']
+MINUTES = ['dep_delay', 'arr_delay']
+AGG = {'dep_delayed_15': 'mean', 'arr_delayed_15': 'mean', 'flight': 'count', 'dep_delay': 'mean', 'arr_delay': 'mean'}
+
+
+def synthetic_flights(n_rows, rng, n_airports=300, n_airlines=16):
+    # Hub-heavy airports, as in the real data
+    weights = 1.0 / np.arange(1, n_airports + 1)
+    airports = np.array([f"A{i:03d}" for i in range(n_airports)], dtype=object)
+    airlines = np.array([f"Airline {i}" for i in range(n_airlines)], dtype=object)
+    dep_delay = np.maximum(rng.normal(10, 30, n_rows).round(), -20)
+    arr_delay = np.maximum(dep_delay + rng.normal(-5, 10, n_rows).round(), -30)
+    df = pd.DataFrame({
+        col: np.asarray(values, dtype=object)[rng.integers(0, len(values), n_rows)]
+        for col, values in ORDERS.items()
+    })
+    df['airline_name'] = airlines[rng.integers(0, n_airlines, n_rows)]
+    df['origin'] = airports[rng.choice(n_airports, n_rows, p=weights / weights.sum())]
+    df['dest'] = airports[rng.choice(n_airports, n_rows, p=weights / weights.sum())]
+    df['flight'] = rng.integers(1, 9000, n_rows)
+    df['dep_delay'] = dep_delay
+    df['arr_delay'] = arr_delay
+    df['dep_delayed_15'] = (dep_delay >= 15).astype(float)
+    df['arr_delayed_15'] = (arr_delay >= 15).astype(float)
+    return df
+
+
+def pandas_tables(df, route_key):
+    """The EDA page's groupbys, keyed by strings or by codebook categoricals/route ids."""
+    time_df = df.assign(**{col: pd.Categorical(df[col], categories=order, ordered=True) for col, order in ORDERS.items()})
+    tables = {col: time_df.groupby(col, observed=False)[FLAGS].mean() for col in ORDERS}
+    tables['airline_name'] = df.groupby('airline_name', observed=True)[FLAGS].mean()
+    for col in ['origin', 'dest']:
+        tables[col] = df.groupby(col, observed=True).agg({k: AGG[k] for k in FLAGS + ['flight']})
+    if route_key == 'route':
+        df = df.assign(route=df['origin'] + ' - ' + df['dest'])
+    tables['route'] = df.groupby(route_key).agg(AGG)
+    tables['airline_route'] = df.groupby(['airline_name', route_key], observed=True).agg(AGG)
+    return tables
+
+
+def engine(df):
+    dims = {col: Dimension.of(df[col], categories=order) for col, order in ORDERS.items()}
+    dims.update({col: Dimension.of(df[col]) for col in ['airline_name', 'origin', 'dest']})
+    dims['route'] = Dimension.cross(dims['origin'], dims['dest'])
+    dims['airline_route'] = Dimension.cross(dims['airline_name'], dims['route'])
+    values = {col: df[col].to_numpy() for col in FLAGS + MINUTES}
+    values['flight'] = df['flight'].notna().to_numpy()
+    return CodeAggregator(dims, values)
+
+
+def engine_tables(totals):
+    """The same tables from `CodeAggregator.totals`, labelled like the string-key groupbys."""
+    tables = {}
+    for col, frame in totals.items():
+        means = group_means(frame, FLAGS)
+        if col in ['origin', 'dest', 'route', 'airline_route']:
+            means['flight'] = frame['flight'].astype('int64')
+        if col in ['route', 'airline_route']:
+            means[MINUTES] = group_means(frame, MINUTES)
+            index = frame.index
+            route = index.get_level_values('origin').astype(str) + ' - ' + index.get_level_values('dest').astype(str)
+            means.index = (pd.Index(route, name='route') if col == 'route' else
+                           pd.MultiIndex.from_arrays([index.get_level_values('airline_name').astype(str), route],
+                                                     names=['airline_name', 'route']))
+        elif col in ['airline_name', 'origin', 'dest']:
+            means.index = means.index.astype(str)
+        tables[col] = means
+    return tables
+
+
+def check_identical(expected, actual):
+    for name, table in expected.items():
+        table = table[actual[name].columns].sort_index()
+        pd.testing.assert_frame_equal(table, actual[name].sort_index(), check_names=False,
+                                      check_index_type=False, check_exact=True)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="1000000,10000000,30000000", help="Comma-separated data sizes")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    results = []
+    for n_rows in [int(n) for n in args.rows.split(",")]:
+        strings = synthetic_flights(n_rows, rng)
+        encoded = encode_flights(strings, codebook_for(strings))
+
+        string_s, expected = timed(lambda: pandas_tables(strings, 'route'))
+        categorical_s, _ = timed(lambda: pandas_tables(encoded, 'route_id'))
+        build_s, aggregator = timed(lambda: engine(encoded))
+        engine_s, totals = timed(lambda: aggregator.totals(keep_empty=list(ORDERS)))
+        mask = (strings['month'] == 'Jul').to_numpy()
+        filtered_s, _ = timed(lambda: aggregator.totals(mask, keep_empty=list(ORDERS)))
+
+        check_identical(expected, engine_tables(totals))
+        results.append({
+            "Rows": f"{n_rows:,}",
+            "Pandas, strings (s)": string_s,
+            "Pandas, categoricals (s)": categorical_s,
+            "Engine codes, once (s)": build_s,
+            "Engine (s)": engine_s,
+            "Engine, 1 month (s)": filtered_s,
+            "Speedup vs strings": string_s / engine_s,
+        })
+        print(f"{n_rows:,} rows done (tables identical)")
+        del strings, encoded, aggregator
+
+    print("\n==== All EDA dimensions: month, day, time block, airline, origin, dest, route, airline × route ====")
+    print(pd.DataFrame(results).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
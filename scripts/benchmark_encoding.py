@@ -0,0 +1,129 @@
+"""
+Memory and groupby time of string keys vs the codebook's integer ids (utils.encoding).
+
+String keys are what the app used before: object columns for origin, dest and airline_name,
+a per-flight "ORIGIN - DEST" route column, and lookups indexed by those strings. Encoded keys
+are categoricals over the shared codebook plus a packed int32 route_id. Both sides produce the
+same aggregates (checked), and the lookup mapping is timed through `build_feature_frame`.
+
+Usage:
+    python scripts/benchmark_encoding.py
+    python scripts/benchmark_encoding.py --repeat 10 --lookup-rows 100000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.data import load_lookups, read_flights  # noqa: E402
+from utils.encoding import codebook_for, encode_flights  # noqa: E402
+from utils.features import build_feature_frame, index_lookups  # noqa: E402
+
+DELAY_COLS = ['dep_delayed_15', 'arr_delayed_15']
+
+
+def timed(func, runs=3):
+    """Best of `runs` wall times (ms) and the last result."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=None, help="Cleaned flights CSV or store directory (default: local data)")
+    parser.add_argument("--repeat", type=int, default=1, help="Replicate the flights this many times")
+    parser.add_argument("--lookup-rows", type=int, default=50_000, help="Flights mapped through the lookups")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per measurement (best is kept)")
+    args = parser.parse_args()
+
+    flights, _ = read_flights(columns=['airline_name', 'origin', 'dest'] + DELAY_COLS, source=args.data)
+    if args.repeat > 1:
+        flights = pd.concat([flights] * args.repeat, ignore_index=True)
+    print(f"{len(flights):,} flights")
+
+    codebook = codebook_for(flights)
+    encoded = encode_flights(flights, codebook)
+    strings = flights.assign(route=flights['origin'] + ' - ' + flights['dest'])
+
+    # ------ Memory ------
+    def key_bytes(df, cols):
+        return df[cols].memory_usage(deep=True, index=False).sum()
+
+    memory = pd.DataFrame({
+        "Strings (MB)": [key_bytes(strings, ['origin', 'dest', 'airline_name', 'route']) / 1e6],
+        "Encoded (MB)": [key_bytes(encoded, ['origin', 'dest', 'airline_name', 'route_id']) / 1e6],
+    }, index=["Key columns"])
+    memory["Ratio"] = memory["Strings (MB)"] / memory["Encoded (MB)"]
+
+    # ------ Groupby ------
+    # The string side includes building the route column, as the EDA page did on every rerun
+    def by_route_strings():
+        df = flights.assign(route=flights['origin'] + ' - ' + flights['dest'])
+        return df.groupby('route')[DELAY_COLS].mean()
+
+    def by_route_ids():
+        return encoded.groupby('route_id')[DELAY_COLS].mean()
+
+    def by_airline_route_strings():
+        df = flights.assign(route=flights['origin'] + ' - ' + flights['dest'])
+        return df.groupby(['airline_name', 'route'])[DELAY_COLS].mean()
+
+    def by_airline_route_ids():
+        return encoded.groupby(['airline_name', 'route_id'], observed=True)[DELAY_COLS].mean()
+
+    timings = []
+    for label, string_func, id_func in [
+        ("Route", by_route_strings, by_route_ids),
+        ("Airline × route", by_airline_route_strings, by_airline_route_ids),
+    ]:
+        string_ms, string_result = timed(string_func, args.runs)
+        id_ms, id_result = timed(id_func, args.runs)
+
+        # Same groups and means once ids are labelled
+        id_result = id_result.reset_index()
+        id_result['route_id'] = codebook.route_labels(id_result['route_id'])
+        keys = [col for col in id_result.columns if col not in DELAY_COLS]
+        id_result = id_result.astype({col: str for col in keys}).set_index(keys).sort_index()
+        string_result = string_result.sort_index()
+        assert np.array_equal(string_result.index.to_flat_index(), id_result.index.to_flat_index())
+        assert np.allclose(string_result.to_numpy(), id_result.to_numpy())
+
+        timings.append({"Operation": f"Groupby: {label}", "Groups": len(id_result),
+                        "Strings (ms)": string_ms, "Encoded (ms)": id_ms, "Speedup": string_ms / id_ms})
+
+    # ------ Lookup mapping ------
+    lookups = load_lookups()
+    sample = flights.sample(n=args.lookup_rows, replace=True, random_state=42)
+    raw = pd.DataFrame({
+        "airline_name": sample['airline_name'].to_numpy(),
+        "route": (sample['origin'] + ' - ' + sample['dest']).to_numpy(),
+        "month": "Jan",
+        "day_of_week": "Mon",
+        "dep_hour": 12,
+    })
+    string_index = index_lookups(*lookups)
+    id_index = index_lookups(*lookups, codebook=codebook_for(flights, lookups))
+
+    string_ms, string_features = timed(lambda: build_feature_frame(raw, string_index), args.runs)
+    id_ms, id_features = timed(lambda: build_feature_frame(raw, id_index), args.runs)
+    pd.testing.assert_frame_equal(string_features, id_features, check_dtype=False)
+    timings.append({"Operation": f"Lookup mapping ({len(raw):,} flights)", "Groups": None,
+                    "Strings (ms)": string_ms, "Encoded (ms)": id_ms, "Speedup": string_ms / id_ms})
+
+    print("\n==== Memory of the key columns ====")
+    print(memory.round(1).to_string())
+    print(f"\n==== Best of {args.runs} runs (results checked identical) ====")
+    print(pd.DataFrame(timings).round(1).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
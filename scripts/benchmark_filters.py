@@ -0,0 +1,92 @@
+"""
+Times bitmap cross-filter queries on a synthetic dataset with the EDA page's filter columns.
+
+Usage:
+    python scripts/benchmark_filters.py --rows 30000000 --queries 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.filter_index import BitmapIndex  # noqa: E402
+
+CARDINALITY = {
+    'month': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
+    'day_of_week': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+    'time_block': ['12am–6am', '6am–9am', '9am–12pm', '12pm–3pm', '3pm–6pm', '6pm–9pm', '9pm–12am'],
+    'airline_name': [f"Airline {i}" for i in range(16)],
+    'origin': [f"A{i:02d}" for i in range(40)],
+    'dist_haul': ['Short', 'Medium', 'Long'],
+}
+
+
+def synthetic_flights(n_rows, rng):
+    return pd.DataFrame({
+        col: pd.Categorical.from_codes(rng.integers(0, len(values), n_rows), values)
+        for col, values in CARDINALITY.items()
+    })
+
+
+def random_selection(rng):
+    # Filter 1-4 columns, 1-3 values each
+    cols = rng.choice(list(CARDINALITY), size=rng.integers(1, 5), replace=False)
+    return {
+        col: list(rng.choice(CARDINALITY[col], size=rng.integers(1, 4), replace=False))
+        for col in cols
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=30_000_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    df = synthetic_flights(args.rows, rng)
+
+    start = time.perf_counter()
+    index = BitmapIndex(df, list(CARDINALITY))
+    print(f"Index build: {time.perf_counter() - start:.1f}s, {index.nbytes() / 1e6:,.0f} MB")
+
+    bitmap_ms, mask_ms, scan_ms = [], [], []
+    for _ in range(args.queries):
+        selection = random_selection(rng)
+
+        start = time.perf_counter()
+        index.query_bits(selection)
+        bitmap_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        mask = index.query(selection)
+        mask_ms.append((time.perf_counter() - start) * 1000)
+
+        # Rescanning the frame for the same filters
+        start = time.perf_counter()
+        scan = np.ones(len(df), dtype=bool)
+        for col, values in selection.items():
+            scan &= df[col].isin(values).to_numpy()
+        scan_ms.append((time.perf_counter() - start) * 1000)
+
+        # None means nothing is filtered (e.g. every haul selected): every row matches
+        if mask is None:
+            mask = np.ones(len(df), dtype=bool)
+        assert np.array_equal(mask, scan)
+
+    report = pd.DataFrame({
+        "Bitmap AND/OR": bitmap_ms,
+        "Bitmap → row mask": mask_ms,
+        "Frame rescan": scan_ms,
+    }).describe(percentiles=[0.5, 0.99]).loc[["mean", "50%", "99%", "max"]]
+    print(f"\nQuery latency (ms) over {args.queries} random filter combinations on {args.rows:,} rows")
+    print(report.round(1).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Sustained ingestion throughput and read latency of the live delay windows (utils.live_delays).
+
+Synthetic flight status events (hub-heavy airports, as in the real network) are written as a
+JSON-lines file, then:
+  - end to end: a FlightStatusFeed reads, parses, encodes and adds the whole file;
+  - windows only: the same events, already parsed and encoded, added in batches;
+  - reads: `current` latency for a random airline and route, as the Predictor's live panel reads them.
+
+The final windows are checked against the same counts recomputed with pandas over the events
+still inside the window.
+
+Usage:
+    python scripts/benchmark_live_delays.py --events 2000000 --batch 10000
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.encoding import CodeBook  # noqa: E402
+from utils.live_delays import FlightStatusFeed, RollingDelayWindows  # noqa: E402
+
+# Room for every route the synthetic network can fly within the window, so nothing is dropped
+CAPACITY = {"route": 65_536}
+
+
+def synthetic_events(n_events, rng, n_airports=350, n_airlines=15, events_per_second=5.0):
+    weights = 1.0 / np.arange(1, n_airports + 1)
+    weights /= weights.sum()
+    airports = np.array([f"A{i:03d}" for i in range(n_airports)], dtype=object)
+    airlines = np.array([f"Airline {i}" for i in range(n_airlines)], dtype=object)
+    dep_delay = np.maximum(rng.normal(10, 30, n_events).round(), -20)
+    arr_delay = np.maximum(dep_delay + rng.normal(-5, 10, n_events).round(), -30)
+    events = pd.DataFrame({
+        # Roughly in order, with some jitter (out-of-order arrivals within a few minutes)
+        "ts": 1.7e9 + np.arange(n_events) / events_per_second + rng.uniform(-300, 0, n_events),
+        "airline_name": airlines[rng.integers(0, n_airlines, n_events)],
+        "origin": airports[rng.choice(n_airports, n_events, p=weights)],
+        "dest": airports[rng.choice(n_airports, n_events, p=weights)],
+        "dep_delay": dep_delay,
+        "arr_delay": np.where(rng.random(n_events) < 0.5, arr_delay, np.nan),  # half not yet arrived
+    })
+    return events, CodeBook(airports, airlines)
+
+
+def write_events(events, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in events.to_dict("records"):
+            record = {k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in record.items()}
+            f.write(json.dumps(record) + "\n")
+
+
+def expected_window(events, windows, codebook):
+    """Per-route counts over the events inside the final window, recomputed from scratch."""
+    bucket = np.floor_divide(events["ts"], windows.bucket_seconds).astype(np.int64)
+    inside = events[bucket > windows.head - windows.n_buckets]
+    route_ids = codebook.route_ids(inside["origin"], inside["dest"])
+    return inside.groupby(route_ids).agg(departures=("dep_delay", "count"), arrivals=("arr_delay", "count"),
+                                         avg_dep_delay=("dep_delay", "mean"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--batch", type=int, default=10_000, help="Events per batch for the windows-only run")
+    parser.add_argument("--reads", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    events, codebook = synthetic_events(args.events, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "flight_status.jsonl"
+        write_events(events, path)
+        size_mb = path.stat().st_size / 1e6
+
+        start = time.perf_counter()
+        feed = FlightStatusFeed(str(path), codebook, RollingDelayWindows(capacity=CAPACITY), follow=False)
+        feed.join()
+        end_to_end_s = time.perf_counter() - start
+    assert feed.error is None, feed.error
+
+    origin_ids = codebook.airport_ids(events["origin"])
+    route_ids = codebook.pack_routes(origin_ids, codebook.airport_ids(events["dest"]))
+    airline_ids = codebook.airline_ids(events["airline_name"])
+    windows = RollingDelayWindows(capacity=CAPACITY)
+    start = time.perf_counter()
+    for i in range(0, args.events, args.batch):
+        part = slice(i, i + args.batch)
+        windows.add(events["ts"].to_numpy()[part], airline_ids[part], origin_ids[part], route_ids[part],
+                    events["dep_delay"].to_numpy()[part], events["arr_delay"].to_numpy()[part])
+    windows_s = time.perf_counter() - start
+
+    # Same state either way, and equal to a from-scratch recomputation of the final window
+    expected = expected_window(events, windows, codebook)
+    for route_id, row in expected.sample(min(500, len(expected)), random_state=0).iterrows():
+        for state in (feed.windows, windows):
+            got = state.current("route", route_id)
+            assert got["departures"] == row["departures"] and got["arrivals"] == row["arrivals"]
+            assert np.isclose(got["avg_dep_delay"], row["avg_dep_delay"])
+
+    read_keys = rng.choice(expected.index.to_numpy(), args.reads)
+    read_airlines = rng.integers(0, len(codebook.airlines), args.reads)
+    read_us = np.zeros(args.reads)
+    for i, (route_id, airline_id) in enumerate(zip(read_keys, read_airlines)):
+        start = time.perf_counter()
+        windows.current("airline", airline_id)
+        windows.current("route", route_id)
+        read_us[i] = (time.perf_counter() - start) * 1e6
+
+    stats = windows.stats()
+    print(f"{args.events:,} events ({size_mb:,.0f} MB of JSON lines), "
+          f"{windows.window_seconds / 3600:g} h window in {windows.n_buckets} buckets")
+    print(f"Keys in window: {stats['keys']}; dropped for capacity: {stats['dropped']}; late: {stats['late']:,}")
+    print(f"Window memory: {windows.nbytes() / 1e6:,.1f} MB (fixed, whatever the event count)\n")
+    print(pd.DataFrame([
+        {"Path": "file → parse → encode → windows", "Seconds": end_to_end_s, "Events/s": args.events / end_to_end_s},
+        {"Path": f"windows only ({args.batch:,}-event batches)", "Seconds": windows_s, "Events/s": args.events / windows_s},
+    ]).round(2).to_string(index=False))
+
+    p50, p99 = np.percentile(read_us, [50, 99])
+    print(f"\nReads (airline + route) over {args.reads:,} random keys: "
+          f"p50 {p50:,.1f} µs, p99 {p99:,.1f} µs, max {read_us.max():,.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Times SimilarRouteIndex queries on a synthetic route network of a given size.
+
+Routes connect random airport pairs, with hub airports (a Zipf-like draw) carrying most of
+them, as in real networks. Each query searches the routes sharing the queried route's origin
+or destination. A brute-force scan over the same routes checks the results.
+
+Usage:
+    python scripts/benchmark_similar_routes.py --routes 50000 --airports 2000 --queries 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.encoding import ROUTE_SHIFT  # noqa: E402
+from utils.similar_routes import SimilarRouteIndex  # noqa: E402
+
+
+def synthetic_routes(n_routes, n_airports, rng):
+    weights = 1.0 / np.arange(1, n_airports + 1)
+    weights /= weights.sum()
+    origin_ids = rng.choice(n_airports, size=n_routes * 2, p=weights)
+    dest_ids = rng.choice(n_airports, size=n_routes * 2, p=weights)
+    pairs = pd.DataFrame({'origin_id': origin_ids, 'dest_id': dest_ids})
+    pairs = pairs[pairs['origin_id'] != pairs['dest_id']].drop_duplicates().head(n_routes)
+
+    n = len(pairs)
+    table = pd.DataFrame({
+        'dep_rate': rng.beta(2, 8, n),
+        'arr_rate': rng.beta(2, 8, n),
+        'route_density': rng.integers(1, 5000, n),
+        'distance': rng.integers(80, 3000, n),
+        'route_cluster': rng.integers(0, 4, n),
+        'origin_id': pairs['origin_id'].to_numpy(),
+        'dest_id': pairs['dest_id'].to_numpy(),
+    })
+    table.index = (table['origin_id'].to_numpy() << ROUTE_SHIFT) | table['dest_id'].to_numpy()
+    return table
+
+
+def brute_force(index, route_id, k):
+    pos = index.position[route_id]
+    shares = ((index.origin_ids == index.origin_ids[pos]) | (index.dest_ids == index.dest_ids[pos])
+              | (index.origin_ids == index.dest_ids[pos]) | (index.dest_ids == index.origin_ids[pos]))
+    shares[pos] = False
+    candidates = np.flatnonzero(shares)
+    dists = np.linalg.norm(index.vectors[candidates] - index.vectors[pos], axis=1)
+    return np.sort(dists)[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", type=int, default=50_000)
+    parser.add_argument("--airports", type=int, default=2_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--k", type=int, default=12, help="Neighbours per query (the Predictor scores 12)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    table = synthetic_routes(args.routes, args.airports, rng)
+
+    start = time.perf_counter()
+    index = SimilarRouteIndex(table)
+    print(f"Index build: {time.perf_counter() - start:.2f}s for {len(index):,} routes, "
+          f"{len(index.trees):,} airport trees, {index.nbytes() / 1e6:,.1f} MB")
+
+    queried = rng.choice(index.route_ids, size=args.queries)
+    index.query(queried[0], k=args.k)
+
+    query_us = np.zeros(args.queries)
+    for i, route_id in enumerate(queried):
+        start = time.perf_counter()
+        index.query(route_id, k=args.k)
+        query_us[i] = (time.perf_counter() - start) * 1e6
+
+    # Same neighbour distances as scanning every route that shares an airport
+    for route_id in queried[:100]:
+        _, dists = index.query(route_id, k=args.k)
+        assert np.allclose(dists, brute_force(index, route_id, args.k))
+
+    p50, p99 = np.percentile(query_us, [50, 99])
+    print(f"\nQuery latency over {args.queries:,} random routes (k={args.k}): "
+          f"mean {query_us.mean():,.0f} µs, p50 {p50:,.0f} µs, p99 {p99:,.0f} µs, max {query_us.max():,.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
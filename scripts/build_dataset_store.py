@@ -0,0 +1,95 @@
+"""
+Builds the partitioned columnar copy of the cleaned flights dataset.
+
+The CSV is rewritten as Parquet under flight_data_store/year=YYYY/month=Mon/origin=XXX/.
+Queries through `utils.data.read_flights` then skip partitions that can't match their
+month/origin filters and read only the projected columns. The EDA page, the Predictor's
+route → airline lookup and the training scripts use the store automatically once it exists.
+
+A stratified sample (month × airline × origin, with its weights) is written alongside, as
+flight_data_preview.parquet: the EDA page's fast preview reads only that file, so its first
+visit never loads or indexes the full table.
+
+With --benchmark a few typical queries are timed against a full CSV read, with the
+partitions and bytes each one actually scanned.
+
+Usage:
+    python scripts/build_dataset_store.py --data flight_data.csv --benchmark
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.data import DATASET_STORE_PATH, PREVIEW_SAMPLE_PATH, ensure_flight_data  # noqa: E402
+from utils.dataset_store import query_store, write_store  # noqa: E402
+from utils.sampling import read_sample, stratified_sample, write_sample  # noqa: E402
+
+# (label, columns, filters)
+BENCHMARK_QUERIES = [
+    ("Full table", None, None),
+    ("EDA delay sketches (6 columns)",
+     ['origin', 'dest', 'airline_name', 'month', 'dep_delay', 'arr_delay'], None),
+    ("One month", None, {'month': 'Jul'}),
+    ("One origin, summer, delay flags",
+     ['dest', 'airline_name', 'dep_delayed_15', 'arr_delayed_15'],
+     {'origin': 'EWR', 'month': ['Jun', 'Jul', 'Aug']}),
+]
+
+
+def benchmark(csv_path, store_path):
+    start = time.perf_counter()
+    pd.read_csv(csv_path)
+    csv_seconds = time.perf_counter() - start
+    csv_bytes = os.path.getsize(csv_path)
+
+    results = [{"Query": "CSV full read", "Partitions": "-", "MB read": csv_bytes / 1e6,
+                "Rows": None, "ms": csv_seconds * 1000}]
+    for label, columns, filters in BENCHMARK_QUERIES:
+        _, stats = query_store(store_path, columns=columns, filters=filters)
+        results.append({"Query": label, "Partitions": f"{stats.files_scanned}/{stats.files_total}",
+                        "MB read": stats.bytes_scanned / 1e6, "Rows": stats.rows, "ms": stats.seconds * 1000})
+
+    results = pd.DataFrame(results)
+    results["Speedup vs CSV"] = results["ms"].iloc[0] / results["ms"]
+    print("\n==== Query I/O ====")
+    print(results.round(2).to_string(index=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=None, help="Cleaned flights CSV (default: download flight_data.csv)")
+    parser.add_argument("--output", default=DATASET_STORE_PATH, help="Store directory")
+    parser.add_argument("--preview-output", default=PREVIEW_SAMPLE_PATH, help="Preview sample file")
+    parser.add_argument("--preview-size", type=int, default=200_000, help="Target rows in the preview sample")
+    parser.add_argument("--benchmark", action="store_true", help="Time typical queries against the CSV afterwards")
+    args = parser.parse_args()
+
+    csv_path = args.data or ensure_flight_data()
+
+    start = time.perf_counter()
+    df = pd.read_csv(csv_path)
+    write_store(df, args.output)
+    files = list(Path(args.output).rglob("*.parquet"))
+    store_bytes = sum(f.stat().st_size for f in files)
+    print(f"Wrote {len(files)} partitions to {args.output} "
+          f"({store_bytes / 1e6:.1f} MB vs {os.path.getsize(csv_path) / 1e6:.1f} MB CSV) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    sample = stratified_sample(df, size=args.preview_size)
+    write_sample(df, sample, args.preview_output)
+    _, _, read_seconds = read_sample(args.preview_output)
+    print(f"Wrote a {len(sample):,}-row preview sample of {sample.n_rows:,} flights to {args.preview_output} "
+          f"({os.path.getsize(args.preview_output) / 1e6:.1f} MB, read back in {read_seconds:.2f}s)")
+
+    if args.benchmark:
+        benchmark(csv_path, args.output)
+
+
+if __name__ == "__main__":
+    main()
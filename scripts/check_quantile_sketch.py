@@ -0,0 +1,76 @@
+"""
+Checks the delay quantile sketches against exact quantiles on the cleaned dataset.
+
+Usage:
+    python scripts/check_quantile_sketch.py --data flight_data.csv
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.quantiles import DEFAULT_QUANTILES, build_delay_sketches  # noqa: E402
+
+KEY_COLS = ['origin', 'dest', 'airline_name', 'month']
+VALUE_COLS = ['dep_delay', 'arr_delay']
+
+
+def exact_quantiles(df, key_cols, value_col, qs):
+    grouped = df.dropna(subset=[value_col]).groupby(key_cols, observed=True)[value_col]
+    return pd.concat(
+        {f"p{q * 100:g}": grouped.quantile(q, interpolation='lower') for q in qs},
+        axis=1
+    )
+
+
+def max_relative_error(approx, exact):
+    approx, exact = approx.align(exact, join='inner')
+    approx, exact = approx.to_numpy(dtype=float), exact.to_numpy(dtype=float)
+    # Values under 1 minute are sketched as exactly 0
+    scale = np.where(np.abs(exact) < 1, 1.0, np.abs(exact))
+    return np.nanmax(np.abs(approx - exact) / scale)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="flight_data.csv", help="Cleaned flights CSV")
+    parser.add_argument("--accuracy", type=float, default=0.01, help="Sketch relative accuracy")
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    chunks = pd.read_csv(args.data, usecols=KEY_COLS + VALUE_COLS, chunksize=args.chunksize)
+    sketches = build_delay_sketches(chunks, KEY_COLS, VALUE_COLS, relative_accuracy=args.accuracy)
+    print(f"Built sketches in one pass: {time.perf_counter() - start:.2f}s")
+
+    df = pd.read_csv(args.data, usecols=KEY_COLS + VALUE_COLS)
+    failures = 0
+
+    for col in VALUE_COLS:
+        raw_bytes = df[col].notna().sum() * 8
+        sketch_bytes = sketches[col].counts.memory_usage(deep=True)
+        print(f"\n==== {col} ====")
+        print(f"Raw values: {raw_bytes / 1e6:.1f} MB | sketch: {sketch_bytes / 1e6:.1f} MB")
+
+        # Finest key, then merged (rolled-up) keys
+        for keys in [KEY_COLS, ['origin', 'dest', 'airline_name'], ['origin', 'dest'], ['airline_name']]:
+            sketch = sketches[col] if keys == KEY_COLS else sketches[col].rollup(keys)
+            approx = sketch.quantiles(DEFAULT_QUANTILES)
+            exact = exact_quantiles(df, keys, col, DEFAULT_QUANTILES)
+            error = max_relative_error(approx, exact)
+            status = "OK" if error <= args.accuracy + 1e-9 else "FAIL"
+            failures += status == "FAIL"
+            print(f"{' × '.join(keys):<40} keys={len(exact):>7,}  max rel. error={error:.4f}  {status}")
+
+    if failures:
+        sys.exit(f"\n{failures} check(s) exceeded the {args.accuracy:.2%} accuracy bound.")
+    print(f"\nAll quantiles within {args.accuracy:.2%} of exact.")
+
+
+if __name__ == "__main__":
+    main()
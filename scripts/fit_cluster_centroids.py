@@ -0,0 +1,71 @@
+"""
+Exports the destination and route cluster centroids used for unseen keys.
+
+The notebook's KMeans labels live only in the dest_cluster / route_cluster lookups. This
+rebuilds the StandardScaler statistics and the centroids from the keys already labelled
+(a KMeans centroid is the mean of its members) and writes them to
+streamlit_app/lookups/cluster_centroids.json, along with the per-destination/route stats and
+the other flight summaries (utils.flight_summaries). The Predictor and batch scoring then place
+destinations and routes missing from the lookups by nearest centroid on their exported delay
+and traffic stats, instead of defaulting to cluster 0.
+
+Also reports how often nearest-centroid reproduces the lookup label for known keys, and the
+assignment time per unseen key.
+
+Usage:
+    python scripts/fit_cluster_centroids.py
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.clusters import (CENTROIDS_PATH, CLUSTER_FEATURES, ClusterAssigner,  # noqa: E402
+                            fit_cluster_models, save_cluster_models)
+from utils.data import LOOKUPS_DIR, load_lookups, read_flights  # noqa: E402
+from utils.flight_summaries import SUMMARY_COLUMNS, export_flight_summaries  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=None, help="Cleaned flights CSV or store directory (default: local data)")
+    parser.add_argument("--output", default=str(CENTROIDS_PATH))
+    parser.add_argument("--lookups-dir", default=str(LOOKUPS_DIR), help="Where to export the flight summaries")
+    args = parser.parse_args()
+
+    flights, _ = read_flights(columns=SUMMARY_COLUMNS, source=args.data)
+    summaries = export_flight_summaries(flights, args.lookups_dir)
+    stats_by_key = {key: summaries[f"{key}_stats"].set_index(key) for key in ['dest', 'route']}
+    _, _, dest_cluster_lookup, route_cluster_lookup = load_lookups()
+    models = fit_cluster_models(stats_by_key, dest_cluster_lookup, route_cluster_lookup)
+    save_cluster_models(models, Path(args.output))
+
+    lookups = {
+        'dest': dest_cluster_lookup.drop_duplicates('dest').set_index('dest')['dest_cluster'],
+        'route': route_cluster_lookup.drop_duplicates('route').set_index('route')['route_cluster'],
+    }
+    for key, model in models.items():
+        stats = stats_by_key[key]
+        known = stats.index.intersection(lookups[key].index)
+        agreement = (model.predict(stats.loc[known, CLUSTER_FEATURES].to_numpy()) == lookups[key].loc[known].to_numpy()).mean()
+
+        # Time cold assignments: an assigner with an empty lookup treats every key as unseen
+        assigner = ClusterAssigner(lookups[key].iloc[:0], model, stats)
+        start = time.perf_counter()
+        assigner.assign(stats.index.to_numpy())
+        per_key_us = (time.perf_counter() - start) / len(stats) * 1e6
+
+        print(f"{key}: {len(model.labels)} centroids | nearest-centroid matches lookup for "
+              f"{agreement:.1%} of {len(known):,} known keys | {per_key_us:.2f} µs per unseen key "
+              f"(batch of {len(stats):,}) | unlabelled keys in data: "
+              f"{int(np.sum(~stats.index.isin(lookups[key].index))):,}")
+
+    print(f"\nWrote {args.output} and the flight summaries in {args.lookups_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Global explanation summaries for the delay models, for the EDA page.
+
+The transformed rows come from the feature store (utils.feature_store, as built by
+scripts/train_from_features.py): the design each model was saved with, or else the design
+for its preprocessor, built once and memory-mapped afterwards. A stratified sample of its
+rows (proportional by month × airline × origin, or every row) is explained in parallel chunks
+with the shared `utils.explanations` attributions:
+
+- logreg_pipeline: exact linear SHAP, coef × (x − mean of the training rows), per output (log-odds).
+- multioutput_rf: TreeExplainer, positive class, per output (probability).
+
+Chunks return mergeable sums only, which are combined into per-feature importance
+(mean |SHAP|, mean SHAP) and dependence curves (mean SHAP per feature-value decile) per model
+and output. The result is two small CSVs in streamlit_app/explanations/, updated after each
+model. Models whose artifact isn't a Pipeline saved by train_from_features.py --save (like
+the bundled multioutput_rf.pkl) are skipped; the default explains the logistic regression only.
+
+Usage:
+    python scripts/global_explanations.py --sample 100000 --workers 8
+    python scripts/global_explanations.py --models logreg,rf
+    python scripts/global_explanations.py --sample 0 --models logreg   # whole dataset
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.artifacts import MANIFEST_PATH, latest_model_path, load_model  # noqa: E402
+from utils.data import read_flights  # noqa: E402
+from utils.explanations import (EXPLANATIONS_DIR, IMPORTANCE_PATH, DEPENDENCE_PATH,  # noqa: E402
+                                transformed_feature_names, to_dense, dependence_edges,
+                                explain_summaries, global_frames, mean_row)
+from utils.feature_store import FEATURE_STORE_DIR, get_design, load_design  # noqa: E402
+from utils.sampling import PREVIEW_STRATA, stratified_sample  # noqa: E402
+from utils.training import FEATURE_COLS, make_linear_preprocessor, make_tree_preprocessor  # noqa: E402
+
+# kind → (artifact name, preprocessor of its design)
+ARTIFACTS = {"logreg": ("logreg_pipeline", make_linear_preprocessor),
+             "rf": ("multioutput_rf", make_tree_preprocessor)}
+
+# Per-worker state, set once by the pool initializer
+_worker = {}
+
+
+def init_worker(kind, estimators, background_mean, edges):
+    _worker.update(kind=kind, estimators=estimators, background_mean=background_mean, edges=edges)
+
+
+def explain_chunk(X):
+    return explain_summaries(_worker["kind"], _worker["estimators"], X, _worker["background_mean"], _worker["edges"])
+
+
+def model_design(kind, df, store):
+    """The saved model's own design when its manifest entry names one, else the design for its preprocessor."""
+    name, make_preprocessor = ARTIFACTS[kind]
+    entry = json.loads(MANIFEST_PATH.read_text()).get(name, {}) if MANIFEST_PATH.exists() else {}
+    path = Path(store) / entry.get("feature_store_key", "")
+    if entry.get("feature_store_key") and (path / "meta.json").exists():
+        return load_design(path)
+    design, _, _ = get_design(df, make_preprocessor(), store, feature_cols=FEATURE_COLS)
+    return design
+
+
+def design_rows(design, rows):
+    """Dense transformed rows at these positions of the time-ordered data (train rows, then test)."""
+    n_train = design['X_train'].shape[0]
+    rows = np.sort(rows)
+    return np.vstack([to_dense(design['X_train'][rows[rows < n_train]]),
+                      to_dense(design['X_test'][rows[rows >= n_train] - n_train])])
+
+
+def load_pipeline(kind):
+    """The model's latest artifact, or None (with the reason printed) if it isn't a usable Pipeline."""
+    path = latest_model_path(ARTIFACTS[kind][0])
+    try:
+        pipeline = load_model(path)
+    except Exception as e:
+        print(f"{kind}: skipped, {path.name} can't be loaded ({type(e).__name__}: {e})")
+        return None
+    if not hasattr(pipeline, "named_steps"):
+        print(f"{kind}: skipped, {path.name} is not a preprocessor + classifier Pipeline; "
+              "save one with train_from_features.py --save")
+        return None
+    return pipeline
+
+
+def explain_model(kind, df, rows, store, workers, chunksize):
+    """Importance and dependence tables for one model, or None when it is skipped."""
+    pipeline = load_pipeline(kind)
+    if pipeline is None:
+        return None
+    estimators = pipeline.named_steps['classifier'].estimators_
+    design = model_design(kind, df, store)
+
+    X = design_rows(design, rows)
+    if X.shape[1] != estimators[0].n_features_in_:
+        print(f"{kind}: skipped, the stored design has {X.shape[1]} features and the model "
+              f"{estimators[0].n_features_in_}; retrain it with train_from_features.py --save")
+        return None
+    feature_names = transformed_feature_names(design['preprocessor'])
+    if len(feature_names) != X.shape[1]:
+        feature_names = design['feature_names']
+
+    background_mean = mean_row(design['X_train']) if kind == "logreg" else None
+    chunks = [X[i:i + chunksize] for i in range(0, len(X), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(kind, estimators, background_mean, dependence_edges(X))) as pool:
+        results = list(pool.map(explain_chunk, chunks))
+
+    return global_frames(results, feature_names, kind, design['target_names'])
+
+
+def save_model_frames(kind, importance, dependence):
+    """Replaces this model's rows in the stored CSVs, keeping the other models' rows."""
+    EXPLANATIONS_DIR.mkdir(exist_ok=True)
+    for path, frame in [(IMPORTANCE_PATH, importance), (DEPENDENCE_PATH, dependence)]:
+        if path.exists():
+            stored = pd.read_csv(path)
+            frame = pd.concat([stored[stored['model'] != kind], frame], ignore_index=True)
+        frame.to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=None, help="Cleaned flights CSV or store directory (default: local data)")
+    parser.add_argument("--store", default=FEATURE_STORE_DIR, help="Feature store directory")
+    parser.add_argument("--models", default="logreg",
+                        help="Comma-separated: logreg, rf (rf needs a Pipeline saved by train_from_features.py --save)")
+    parser.add_argument("--sample", type=int, default=100_000,
+                        help="Stratified sample size (month × airline × origin); 0 uses every row")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunksize", type=int, default=5_000)
+    args = parser.parse_args()
+
+    # The full rows, for the design key (and a build on first use); strata from the same rows
+    df, _ = read_flights(source=args.data)
+    if args.sample and args.sample < len(df):
+        rows = stratified_sample(df, PREVIEW_STRATA, size=args.sample, min_per_stratum=1, seed=42).rows
+    else:
+        rows = np.arange(len(df))
+    print(f"Explaining {len(rows):,} of {len(df):,} flights")
+
+    for kind in args.models.split(","):
+        start = time.perf_counter()
+        frames = explain_model(kind, df, rows, args.store, args.workers, args.chunksize)
+        if frames is None:
+            continue
+        # Written per model, so a later model's failure never loses this one's results
+        model_importance, model_dependence = frames
+        save_model_frames(kind, model_importance, model_dependence)
+        print(f"{kind}: {time.perf_counter() - start:.1f}s, written to {EXPLANATIONS_DIR}")
+        for output, top in model_importance.groupby('output'):
+            print(f"  {output}: " + ", ".join(top.nlargest(5, 'mean_abs_shap')['feature']))
+
+
+if __name__ == "__main__":
+    main()
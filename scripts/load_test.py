@@ -0,0 +1,158 @@
+"""
+Local load test for the Predictor: how many concurrent sessions one app process can serve.
+
+Streamlit runs every browser session's script in its own thread of a single process, so each
+simulated session here is a thread that submits flights back to back through the Predictor's
+own code path (`utils.prediction.predict_and_explain`: lookup mapping, pipeline.predict and the
+per-request SHAP LinearExplainer, plus recommendations). Submissions are sampled from the
+flights data, so airlines, routes, months, days and hours follow real traffic.
+
+For each concurrency level it reports throughput, p50/p95/p99 latency, and the process RSS
+(peak during the level and growth over the loaded-artifacts baseline). By default every
+submission is computed; --cache puts the shared PredictionCache in front, as the app does.
+
+Usage:
+    python scripts/load_test.py --sessions 1,2,4,8,16,32 --requests 400
+    python scripts/load_test.py --sessions 8 --requests 2000 --cache
+"""
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.data import read_flights  # noqa: E402
+from utils.memory import RSSSampler, rss_bytes  # noqa: E402
+from utils.prediction import artifact_fingerprint, build_artifacts, predict_and_explain  # noqa: E402
+from utils.prediction_cache import PredictionCache, normalize_flight_input  # noqa: E402
+
+
+def sample_requests(n, seed=42, source=None):
+    """`n` Predictor submissions drawn from the flights, so popular routes and airlines dominate."""
+    flights, _ = read_flights(columns=["airline_name", "origin", "dest", "month", "day_of_week", "hour"],
+                              source=source)
+    sample = flights.sample(n=n, replace=True, random_state=seed)
+    return [
+        {
+            "airline_name": row.airline_name,
+            "route": f"{row.origin} - {row.dest}",
+            "month": row.month,
+            "day_of_week": row.day_of_week,
+            "dep_hour": int(row.hour),
+        }
+        for row in sample.itertuples(index=False)
+    ]
+
+
+def run_level(artifacts, version, requests, sessions, cache=None):
+    """
+    Runs `requests` through `sessions` concurrent sessions and returns latencies and timings.
+
+    Each session takes the next pending submission as soon as its previous one returns.
+    """
+    latencies = np.zeros(len(requests))
+    errors = 0
+    next_index = iter(range(len(requests)))
+    lock = threading.Lock()
+
+    def submit(user_input):
+        compute = lambda: predict_and_explain(artifacts, user_input)
+        if cache is None:
+            return compute()
+        return cache.get_or_compute(normalize_flight_input(**user_input), version, compute)
+
+    def session():
+        nonlocal errors
+        while True:
+            with lock:
+                i = next(next_index, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            try:
+                failed = submit(requests[i]) is None
+            except Exception:
+                failed = True
+            latencies[i] = time.perf_counter() - start
+            if failed:
+                with lock:
+                    errors += 1
+
+    sampler = RSSSampler()
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        for _ in range(sessions):
+            pool.submit(session)
+    seconds = time.perf_counter() - start
+    peak_rss = sampler.stop()
+
+    return latencies, errors, seconds, peak_rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,2,4,8,16,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=400, help="Submissions per concurrency level")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed submissions before the first level")
+    parser.add_argument("--cache", action="store_true", help="Serve repeats from a shared PredictionCache, as the app does")
+    parser.add_argument("--data", default=None, help="Cleaned flights CSV or store directory (default: local data)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    version = artifact_fingerprint()
+    artifacts = build_artifacts(version)
+    print(f"Artifacts loaded in {time.perf_counter() - start:.1f}s ({Path(version[0]).name})")
+
+    levels = [int(n) for n in args.sessions.split(",")]
+    requests = sample_requests(args.requests * len(levels) + args.warmup, args.seed, args.data)
+
+    for user_input in requests[:args.warmup]:
+        predict_and_explain(artifacts, user_input)
+    baseline_rss = rss_bytes()
+    print(f"Baseline RSS after warm-up: {baseline_rss / 1e6:,.0f} MB\n")
+
+    results = []
+    offset = args.warmup
+    for sessions in levels:
+        level_requests = requests[offset:offset + args.requests]
+        offset += args.requests
+        cache = PredictionCache(maxsize=2048) if args.cache else None
+
+        latencies, errors, seconds, peak_rss = run_level(artifacts, version, level_requests, sessions, cache)
+        p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+        results.append({
+            "Sessions": sessions,
+            "Requests": len(level_requests),
+            "Errors": errors,
+            "Req/s": len(level_requests) / seconds,
+            "p50 (ms)": p50,
+            "p95 (ms)": p95,
+            "p99 (ms)": p99,
+            "Peak RSS (MB)": peak_rss / 1e6,
+            "RSS growth (MB)": (peak_rss - baseline_rss) / 1e6,
+        })
+        print(f"{sessions:>3} sessions: {results[-1]['Req/s']:,.1f} req/s, p95 {p95:,.0f} ms"
+              + (f", cache hit rate {cache.stats()['hit_rate']:.0%}" if cache else ""))
+
+    results = pd.DataFrame(results)
+    print("\n==== Latency and memory vs concurrency ====")
+    print(results.round(1).to_string(index=False))
+
+    # Saturation: the first level where adding sessions no longer buys 10% more throughput
+    gains = results["Req/s"].pct_change().to_numpy()
+    saturated = np.flatnonzero(gains < 0.10)
+    if len(saturated):
+        print(f"\nThroughput stops scaling at ~{results['Sessions'].iloc[saturated[0] - 1]} sessions; "
+              f"beyond that, extra sessions only add queueing latency.")
+
+
+if __name__ == "__main__":
+    main()
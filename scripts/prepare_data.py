@@ -0,0 +1,314 @@
+"""
+Reproducible data preparation: the notebook's cleaning and feature engineering as cached stages.
+
+Stages (as in notebooks/flight_delay_analysis.ipynb):
+
+    flights, airline_codes ─ merge_airlines ─ drop_missing ─ parse_dates ─ delay_flags ─┬─ time_features ───────┐
+                                                                                       ├─ route_features ─┬─ route_density ──┤
+                                                                                       │                  └─ route_clusters ─┤
+                                                                                       ├─ dest_clusters ──────────────────────┤
+                                                                                       └─ airline_delays ─────────────────────┴─ assemble ─ export
+
+Every stage's output is cached under prep_cache/<stage>/<key>.parquet, keyed by the hash of
+its code, parameters and inputs (the raw CSVs by content). A rerun skips every stage whose
+key is unchanged, so editing e.g. the delay-score maps reruns time_features, assemble and
+export but not the clustering. Stages whose inputs are ready run in parallel.
+
+The export stage writes the cleaned dataset and the four lookup CSVs the app reads
+(streamlit_app/lookups/{name}.csv), the flight summaries the Predictor reads instead of the
+dataset (utils.flight_summaries) and the cluster centroids, each via a temporary file and an
+atomic rename.
+
+KMeans numbers clusters arbitrarily. To keep the cluster ids used on the EDA page stable when
+the raw data changes, copy an exported cluster_centroids.json to the --reference-centroids file
+(lookups/cluster_reference.json). New clusters are then aligned to it. The pipeline reads that
+file but never writes it, so exporting doesn't change the clustering stages' keys.
+
+Raw inputs (data/README.md) are downloaded from Google Drive if missing.
+
+Usage:
+    python scripts/prepare_data.py
+    python scripts/prepare_data.py --workers 4 --force dest_clusters route_clusters
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import gdown
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.clusters import (CENTROIDS_PATH, CLUSTER_FEATURES, NearestCentroid,  # noqa: E402
+                            cluster_stats, load_cluster_models, save_cluster_models)
+from utils.data import FLIGHT_DATA_PATH, LOOKUP_NAMES, LOOKUPS_DIR  # noqa: E402
+from utils.encoding import codebook_for, save_codebook  # noqa: E402
+from utils.features import dow_score_map, month_score_map, time_score_map  # noqa: E402
+from utils.flight_summaries import SUMMARY_NAMES, flight_summaries  # noqa: E402
+from utils.stages import PREP_CACHE_DIR, Source, Stage, StagePipeline, atomic_write_csv  # noqa: E402
+from utils.training import MONTH_ORDER  # noqa: E402
+
+RAW_DATA_URLS = {
+    "data/flight.csv": "https://drive.google.com/uc?id=1IOGhRRj9A02fp1TvX4IDZsymkImaRyFi",
+    "data/airlines_carrier_codes.csv": "https://drive.google.com/uc?id=16nz4fm0ABhu9JaYSWbqpZft47rj_I4BV",
+}
+
+DAY_ORDER = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+TIME_BINS = [0, 6, 9, 12, 15, 18, 21, 24]
+TIME_LABELS = ['12am–6am', '6am–9am', '9am–12pm', '12pm–3pm', '3pm–6pm', '6pm–9pm', '9pm–12am']
+COLS_TO_DROP = ['year', 'day', 'dep_time', 'sched_dep_time', 'arr_time',
+                'sched_arr_time', 'tailnum', 'carrier', 'id']
+
+
+# ------ Cleaning ------
+def merge_airlines(flights, airline_codes):
+    # Merging airline names into flights data, then drop the duplicate code column
+    flights_df = flights.merge(airline_codes, left_on='carrier', right_on='Carrier Code', how='left')
+    return flights_df.drop(columns='Carrier Code')
+
+
+def drop_missing(flights_df):
+    return flights_df.dropna().reset_index(drop=True)
+
+
+def parse_dates(flights_df):
+    # Combine year, month, and day into a datetime column; day of week and month names as ordered categories
+    date = pd.to_datetime(flights_df[['year', 'month', 'day']])
+    return flights_df.assign(
+        date=date,
+        day_of_week=pd.Categorical(date.dt.strftime('%a'), categories=DAY_ORDER, ordered=True),
+        month=pd.Categorical(flights_df['month'].map(dict(enumerate(MONTH_ORDER, start=1))),
+                             categories=MONTH_ORDER, ordered=True),
+    ).rename(columns={'Airline Name': 'airline_name'})
+
+
+def delay_flags(flights_df):
+    # Flags for delays >= 15 minutes and for any delay, as 0/1
+    flights_df = flights_df.assign(
+        dep_delayed_15=(flights_df['dep_delay'] >= 15).astype(int),
+        arr_delayed_15=(flights_df['arr_delay'] >= 15).astype(int),
+        dep_delayed=(flights_df['dep_delay'] > 0).astype(int),
+        arr_delayed=(flights_df['arr_delay'] > 0).astype(int),
+    )
+    return flights_df.drop(columns=COLS_TO_DROP).reset_index(drop=True)
+
+
+# ------ Row-level features ------
+def time_features(flights_df, month_scores, dow_scores, time_scores):
+    # The score maps are parameters, so editing them in utils.features reruns this stage
+    time_block = pd.cut(flights_df['hour'], bins=TIME_BINS, labels=TIME_LABELS, right=False)
+    return pd.DataFrame({
+        'time_block': time_block,
+        'is_redeye': ((flights_df['hour'] >= 22) | (flights_df['hour'] <= 5)).astype(int),
+        'month_delay_score': flights_df['month'].astype(str).map(month_scores).astype(int),
+        'dow_delay_score': flights_df['day_of_week'].astype(str).map(dow_scores).astype(int),
+        'time_block_score': time_block.astype(str).map(time_scores).astype(int),
+    })
+
+
+def route_features(flights_df):
+    # Short: ≤1000 miles, Medium: ≤2500, Long: beyond
+    return pd.DataFrame({
+        'route': flights_df['origin'] + ' - ' + flights_df['dest'],
+        'dist_haul': pd.cut(flights_df['distance'], bins=[-np.inf, 1000, 2500, np.inf],
+                            labels=['Short', 'Medium', 'Long']).astype(str),
+    })
+
+
+def route_density(route_features):
+    route_counts = route_features['route'].value_counts()
+    return route_counts.rename_axis('route').rename('route_density').reset_index()
+
+
+def airline_delays(flights_df):
+    return (
+        flights_df.groupby('airline_name')
+        .agg(
+            airline_avg_arr_delay=('arr_delay', 'mean'),
+            airline_avg_dep_delay=('dep_delay', 'mean')
+        )
+        .round(2)
+        .reset_index()
+    )
+
+
+# ------ Clustering ------
+def align_labels(stats, labels, reference):
+    """
+    Renumbers KMeans labels to the closest reference centroids (one-to-one where possible).
+
+    KMeans numbers clusters arbitrarily, while the app's cluster labels are keyed by id. New
+    centroids are compared with the reference ones in the reference's scaled space; unmatched
+    clusters (when k grew) get fresh ids after the reference ones.
+    """
+    if reference is None:
+        return labels
+    scaled = (stats[CLUSTER_FEATURES].to_numpy(dtype=float) - reference.mean) / reference.scale
+    new_ids = np.unique(labels)
+    centroids = np.stack([scaled[labels == i].mean(axis=0) for i in new_ids])
+    distances = ((centroids[:, None, :] - reference.centroids[None, :, :]) ** 2).sum(axis=2)
+    rows, cols = linear_sum_assignment(distances)
+
+    mapping = {new_ids[r]: int(reference.labels[c]) for r, c in zip(rows, cols)}
+    next_id = int(max(reference.labels.max(), new_ids.max())) + 1
+    for i in new_ids:
+        if i not in mapping:
+            mapping[i] = next_id
+            next_id += 1
+    return np.array([mapping[i] for i in labels])
+
+
+def kmeans_clusters(stats, n_clusters, reference):
+    features_scaled = StandardScaler().fit_transform(stats[CLUSTER_FEATURES])
+    labels = KMeans(n_clusters=n_clusters, random_state=42, n_init=10).fit_predict(features_scaled)
+    return align_labels(stats, labels, reference)
+
+
+def dest_clusters(flights_df, reference_centroids=None, n_clusters=5):
+    stats = cluster_stats(flights_df, 'dest')
+    reference = (reference_centroids or {}).get('dest')
+    return pd.DataFrame({'dest': stats.index, 'dest_cluster': kmeans_clusters(stats, n_clusters, reference)})
+
+
+def route_clusters(flights_df, route_features, reference_centroids=None, n_clusters=4):
+    stats = cluster_stats(flights_df.assign(route=route_features['route'].to_numpy()), 'route')
+    reference = (reference_centroids or {}).get('route')
+    return pd.DataFrame({'route': stats.index, 'route_cluster': kmeans_clusters(stats, n_clusters, reference)})
+
+
+# ------ Final dataset and exports ------
+def assemble(flights_df, time_features, route_features, route_density, dest_clusters, route_clusters, airline_delays):
+    flights_df = pd.concat([flights_df, time_features, route_features], axis=1)
+    flights_df = flights_df.merge(airline_delays, on='airline_name', how='left')
+    flights_df['dest_cluster'] = flights_df['dest'].map(dest_clusters.set_index('dest')['dest_cluster'])
+    flights_df['route_cluster'] = flights_df['route'].map(route_clusters.set_index('route')['route_cluster'])
+    flights_df['route_density'] = flights_df['route'].map(route_density.set_index('route')['route_density'])
+    return flights_df
+
+
+def export(flights_df, dest_clusters, route_clusters, airline_delays, dataset_path, lookups_dir, centroids_path):
+    lookups_dir = Path(lookups_dir)
+    lookups = {
+        "airline_delay": airline_delays,
+        "route_dist": flights_df[['route', 'route_density', 'dist_haul', 'distance']].drop_duplicates(),
+        "dest_cluster": dest_clusters,
+        "route_cluster": route_clusters,
+    }
+    # Per-destination/route stats, route delay rates and the SHAP background sample
+    lookups.update(flight_summaries(flights_df))
+    for name, lookup in lookups.items():
+        atomic_write_csv(lookup, lookups_dir / f"{name}.csv")
+
+    # Centroids for destinations/routes missing from the lookups (utils.clusters)
+    models = {}
+    for key, lookup in [('dest', dest_clusters), ('route', route_clusters)]:
+        stats = lookups[f"{key}_stats"].set_index(key)
+        models[key] = NearestCentroid.fit(stats, lookup.set_index(key).loc[stats.index, f"{key}_cluster"])
+    save_cluster_models(models, Path(centroids_path))
+
+    # Integer ids for every airport and airline (utils.encoding); existing ids never change
+    codebook_path = lookups_dir / "codebook.json"
+    lookup_tables = tuple(lookups[name] for name in LOOKUP_NAMES)
+    save_codebook(codebook_for(flights_df, lookup_tables, path=codebook_path), codebook_path)
+
+    atomic_write_csv(flights_df, dataset_path)
+
+    return pd.DataFrame({
+        "file": [str(lookups_dir / f"{name}.csv") for name in lookups] + [str(dataset_path)],
+        "rows": [len(lookup) for lookup in lookups.values()] + [len(flights_df)],
+    })
+
+
+def read_reference_centroids(path):
+    return load_cluster_models(Path(path)) or {}
+
+
+def ensure_raw_data(path):
+    if not Path(path).exists():
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        gdown.download(RAW_DATA_URLS[path], str(path), quiet=True)
+    return path
+
+
+def build_pipeline(flights_path, airlines_path, dataset_path, lookups_dir, centroids_path, cache_dir,
+                   reference_path=None):
+    sources = [
+        Source("flights", flights_path),
+        Source("airline_codes", airlines_path),
+    ]
+    # Reference centroids (if pinned) only steer cluster numbering; their content is part of the key.
+    # They are a separate file from the exported centroids, which would otherwise feed back as an input
+    if reference_path is not None and Path(reference_path).exists():
+        sources.append(Source("reference_centroids", reference_path, read=read_reference_centroids))
+        reference = ["reference_centroids"]
+    else:
+        reference = []
+
+    stages = [
+        Stage("merge_airlines", merge_airlines, ["flights", "airline_codes"]),
+        Stage("drop_missing", drop_missing, ["merge_airlines"]),
+        Stage("parse_dates", parse_dates, ["drop_missing"]),
+        Stage("delay_flags", delay_flags, ["parse_dates"]),
+        Stage("time_features", time_features, ["delay_flags"],
+              params={"month_scores": month_score_map, "dow_scores": dow_score_map, "time_scores": time_score_map}),
+        Stage("route_features", route_features, ["delay_flags"]),
+        Stage("route_density", route_density, ["route_features"]),
+        Stage("airline_delays", airline_delays, ["delay_flags"]),
+        Stage("dest_clusters", dest_clusters, ["delay_flags"] + reference,
+              params={"n_clusters": 5}, deps=[kmeans_clusters, align_labels, cluster_stats]),
+        Stage("route_clusters", route_clusters, ["delay_flags", "route_features"] + reference,
+              params={"n_clusters": 4}, deps=[kmeans_clusters, align_labels, cluster_stats]),
+        Stage("assemble", assemble, ["delay_flags", "time_features", "route_features", "route_density",
+                                     "dest_clusters", "route_clusters", "airline_delays"]),
+        Stage("export", export, ["assemble", "dest_clusters", "route_clusters", "airline_delays"],
+              params={"dataset_path": str(dataset_path), "lookups_dir": str(lookups_dir),
+                      "centroids_path": str(centroids_path)},
+              deps=[NearestCentroid, save_cluster_models, atomic_write_csv, codebook_for, save_codebook,
+                    flight_summaries],
+              targets=[dataset_path, centroids_path, Path(lookups_dir) / "codebook.json"]
+                      + [Path(lookups_dir) / f"{name}.csv" for name in LOOKUP_NAMES + SUMMARY_NAMES]),
+    ]
+    return StagePipeline(sources, stages, cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flights", default="data/flight.csv", help="Raw flights CSV")
+    parser.add_argument("--airlines", default="data/airlines_carrier_codes.csv", help="Carrier code → airline name CSV")
+    parser.add_argument("--output", default=FLIGHT_DATA_PATH, help="Where to write the cleaned dataset")
+    parser.add_argument("--lookups-dir", default=str(LOOKUPS_DIR))
+    parser.add_argument("--centroids", default=str(CENTROIDS_PATH), help="Where to export the cluster centroids")
+    parser.add_argument("--reference-centroids", default=str(LOOKUPS_DIR / "cluster_reference.json"),
+                        help="Pinned centroids that new cluster ids are aligned to (read only; used if it exists)")
+    parser.add_argument("--cache", default=PREP_CACHE_DIR, help="Stage cache directory")
+    parser.add_argument("--workers", type=int, default=None, help="Stages run in parallel (default: CPU count)")
+    parser.add_argument("--force", nargs="*", default=[], help="Stages to rerun even if cached")
+    args = parser.parse_args()
+
+    for path in [args.flights, args.airlines]:
+        if path in RAW_DATA_URLS:
+            ensure_raw_data(path)
+
+    pipeline = build_pipeline(args.flights, args.airlines, args.output, args.lookups_dir, args.centroids, args.cache,
+                              reference_path=args.reference_centroids)
+
+    start = time.perf_counter()
+    report = pipeline.run(workers=args.workers, force=args.force)
+    seconds = time.perf_counter() - start
+
+    print("\n==== Stages ====")
+    print(report.round(2).to_string(index=False))
+    ran = report["status"].eq("ran").sum()
+    print(f"\n{ran} of {len(report)} stages ran, {len(report) - ran} reused from {args.cache}/ "
+          f"in {seconds:.1f}s (stage time {report['seconds'].sum():.1f}s)")
+    if ran and Path("flight_data_store").is_dir():
+        print("Note: flight_data_store/ is now stale; rebuild it with scripts/build_dataset_store.py")
+
+
+if __name__ == "__main__":
+    main()
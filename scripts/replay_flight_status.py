@@ -0,0 +1,101 @@
+"""
+Stand-in for a live flight status feed: replays the flights data as status events.
+
+Each flight becomes one JSON line with the fields `utils.live_delays` reads:
+    {"ts": 1718000000.0, "status": "arrived", "airline_name": "...", "origin": "ATL",
+     "dest": "LAX", "dep_delay": 12.0, "arr_delay": 3.0}
+
+Event time starts at the current time and advances by 86400 / --flights-per-day per flight,
+so the stream has a realistic density whatever the replay speed. --rate caps the events sent
+per wall-clock second (0 = as fast as possible).
+
+Events are appended to a file (the Predictor's default feed is flight_status.jsonl) or served
+over TCP to every client that connects (point FLIGHT_STATUS_FEED at tcp://localhost:PORT).
+
+Usage:
+    python scripts/replay_flight_status.py --out flight_status.jsonl --rate 50
+    python scripts/replay_flight_status.py --serve 9099 --rate 1000
+"""
+import argparse
+import json
+import socketserver
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.data import read_flights  # noqa: E402
+
+
+def event_lines(flights, start_ts, flights_per_day):
+    step = 86400 / flights_per_day
+    for i, row in enumerate(flights.itertuples(index=False)):
+        yield json.dumps({
+            "ts": start_ts + i * step,
+            "status": "arrived",
+            "airline_name": row.airline_name,
+            "origin": row.origin,
+            "dest": row.dest,
+            "dep_delay": None if np.isnan(row.dep_delay) else float(row.dep_delay),
+            "arr_delay": None if np.isnan(row.arr_delay) else float(row.arr_delay),
+        }) + "\n"
+
+
+def paced(lines, rate, batch=100):
+    """Batches of lines, sent at no more than `rate` lines per second."""
+    start, sent, chunk = time.perf_counter(), 0, []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) == batch:
+            yield "".join(chunk)
+            sent, chunk = sent + batch, []
+            if rate:
+                time.sleep(max(0.0, start + sent / rate - time.perf_counter()))
+    if chunk:
+        yield "".join(chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="JSON-lines file to append to")
+    target.add_argument("--serve", type=int, metavar="PORT", help="Serve the events over TCP on this port")
+    parser.add_argument("--rate", type=float, default=50, help="Events per second (0 = unthrottled)")
+    parser.add_argument("--flights-per-day", type=float, default=20_000, help="Event-time density")
+    parser.add_argument("--limit", type=int, help="Stop after this many flights")
+    args = parser.parse_args()
+
+    flights, _ = read_flights(columns=["airline_name", "origin", "dest", "dep_delay", "arr_delay"])
+    if args.limit:
+        flights = flights.head(args.limit)
+
+    def stream():
+        return paced(event_lines(flights, time.time(), args.flights_per_day), args.rate)
+
+    if args.out:
+        with open(args.out, "a", encoding="utf-8") as f:
+            for chunk in stream():
+                f.write(chunk)
+                f.flush()
+        print(f"Appended {len(flights):,} events to {args.out}")
+        return
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                for chunk in stream():
+                    self.wfile.write(chunk.encode("utf-8"))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    with socketserver.ThreadingTCPServer(("", args.serve), Handler) as server:
+        server.daemon_threads = True
+        print(f"Serving {len(flights):,} events per client on tcp://localhost:{args.serve}")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
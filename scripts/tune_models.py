@@ -0,0 +1,154 @@
+"""
+Parallel, cached hyperparameter search for the logistic regression and random forest models.
+
+The preprocessor is fitted once per CV split and cached on disk (Pipeline(memory=...)), so
+candidates that share a split reuse its output instead of refitting the PowerTransformer /
+log / sqrt / MinMax / one-hot steps. Candidates and CV folds run in parallel across cores.
+With --search halving, candidates are first scored on small subsamples and only the best
+ones get more rows (successive halving).
+
+With --baseline the same candidates are also run the way the notebook does it (sequential,
+preprocessor refit inside every fit) and the wall times are compared.
+
+Usage:
+    python scripts/tune_models.py --data flight_data.csv --model both --search halving --baseline
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from joblib import Memory
+from sklearn.pipeline import Pipeline
+from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.multioutput import MultiOutputClassifier
+from sklearn.model_selection import ParameterSampler, GridSearchCV
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.data import read_flights  # noqa: E402
+from utils.training import (make_linear_preprocessor, make_tree_preprocessor,  # noqa: E402
+                            split_features_targets, time_split, make_pr_auc_scorer)
+
+MODELS = {
+    "logreg": {
+        "preprocessor": make_linear_preprocessor,
+        "estimator": lambda: LogisticRegression(solver='saga', random_state=42, max_iter=1000,
+                                                class_weight='balanced'),
+        "params": {
+            "classifier__estimator__C": [0.001, 0.01, 0.1, 1, 10],
+            "classifier__estimator__penalty": ['l1', 'l2'],
+        },
+    },
+    "rf": {
+        "preprocessor": make_tree_preprocessor,
+        "estimator": lambda: RandomForestClassifier(random_state=42, class_weight='balanced'),
+        "params": {
+            "classifier__estimator__n_estimators": [50, 100, 200],
+            "classifier__estimator__max_depth": [10, 15, 20, None],
+            "classifier__estimator__min_samples_leaf": [1, 2, 4],
+            "classifier__estimator__max_features": ['sqrt', 'log2'],
+        },
+    },
+}
+
+
+def make_pipeline(model, memory=None, inner_jobs=1):
+    return Pipeline([
+        ("preprocessor", MODELS[model]["preprocessor"]()),
+        ("classifier", MultiOutputClassifier(MODELS[model]["estimator"](), n_jobs=inner_jobs))
+    ], memory=memory)
+
+
+def run_search(model, X, y, args, memory, n_jobs, search):
+    """Runs one search and returns (fitted search, wall seconds)."""
+    # Same candidate list for every mode so wall times are comparable
+    candidates = [
+        {k: [v] for k, v in params.items()}
+        for params in ParameterSampler(MODELS[model]["params"], n_iter=args.n_candidates, random_state=42)
+    ]
+    pipeline = make_pipeline(model, memory=memory, inner_jobs=1 if n_jobs == 1 else args.inner_jobs)
+
+    common = dict(scoring=make_pr_auc_scorer(), cv=args.cv, n_jobs=n_jobs, refit=False)
+    if search == "halving":
+        searcher = HalvingGridSearchCV(
+            pipeline, candidates, factor=args.factor, resource='n_samples',
+            min_resources=args.min_resources, random_state=42, **common
+        )
+    else:
+        searcher = GridSearchCV(pipeline, candidates, **common)
+
+    start = time.perf_counter()
+    searcher.fit(X, y)
+    return searcher, time.perf_counter() - start
+
+
+def summarize(searcher, top=5):
+    results = pd.DataFrame(searcher.cv_results_)
+    if "iter" in results:
+        # Only the last halving round saw the most data
+        results = results[results["iter"] == results["iter"].max()]
+    cols = ["mean_test_score", "std_test_score", "mean_fit_time", "params"]
+    return results.sort_values("mean_test_score", ascending=False)[cols].head(top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="flight_data.csv", help="Cleaned flights CSV or partitioned store directory")
+    parser.add_argument("--model", choices=["logreg", "rf", "both"], default="both")
+    parser.add_argument("--search", choices=["random", "halving"], default="halving")
+    parser.add_argument("--n-candidates", type=int, default=12)
+    parser.add_argument("--cv", type=int, default=3)
+    parser.add_argument("--factor", type=int, default=3, help="Successive halving reduction factor")
+    parser.add_argument("--min-resources", type=int, default=5_000, help="Rows per candidate in the first halving round")
+    parser.add_argument("--sample", type=int, default=None, help="Tune on a random subsample of the training rows")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel candidates × folds")
+    parser.add_argument("--inner-jobs", type=int, default=1, help="Parallel outputs inside each MultiOutputClassifier")
+    parser.add_argument("--cache-dir", default=None, help="Preprocessor cache (default: temporary directory)")
+    parser.add_argument("--baseline", action="store_true",
+                        help="Also time the sequential, uncached search on the same candidates")
+    args = parser.parse_args()
+
+    df, stats = read_flights(source=args.data)
+    if stats:
+        print(f"Loaded {stats}")
+    X, y = split_features_targets(df)
+    X_train, _, y_train, _ = time_split(X, y)
+    if args.sample:
+        X_train = X_train.sample(n=min(args.sample, len(X_train)), random_state=42)
+        y_train = y_train.loc[X_train.index]
+
+    models = ["logreg", "rf"] if args.model == "both" else [args.model]
+    timings = []
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        memory = Memory(args.cache_dir or tmp_dir, verbose=0)
+
+        for model in models:
+            print(f"\n==== {model}: {args.search} search, {args.n_candidates} candidates, {args.cv}-fold CV ====")
+            searcher, seconds = run_search(model, X_train, y_train, args, memory, args.n_jobs, args.search)
+            print(summarize(searcher).to_string(index=False))
+            print(f"Best: {searcher.best_params_} (avg PR AUC {searcher.best_score_:.3f})")
+            timings.append({"Model": model, "Mode": f"parallel + cached ({args.search})", "Wall (s)": seconds})
+
+            if args.baseline:
+                _, base_seconds = run_search(model, X_train, y_train, args, None, 1, "random")
+                timings.append({"Model": model, "Mode": "sequential, uncached (current loop)", "Wall (s)": base_seconds})
+
+        memory.clear(warn=False)
+
+    timings = pd.DataFrame(timings)
+    if args.baseline:
+        baseline = timings[timings["Mode"].str.startswith("sequential")].set_index("Model")["Wall (s)"]
+        timings["Speedup"] = timings["Model"].map(baseline) / timings["Wall (s)"]
+    print("\n==== Wall time ====")
+    print(timings.round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Incremental (partial_fit) updates for the multi-output delay classifier.
+
+The classifier is an SGD-trained logistic regression (log loss) inside a MultiOutputClassifier,
+so new data is folded in month by month instead of refitting from scratch. The fitted
+preprocessor is reused: its statistics stay fixed, or with --scalers incremental the
+StandardScaler/MinMaxScaler steps are updated with partial_fit (power-transform lambdas and
+one-hot categories always stay fixed).
+
+Every run writes a new version of 'logreg_pipeline' to streamlit_app/models/, which the
+Predictor picks up without a restart.
+
+Usage:
+    # Start the SGD model from the full history, one month at a time
+    python scripts/update_model_incremental.py --data flight_data.csv --init --parity
+
+    # Fold in a new month
+    python scripts/update_model_incremental.py --data flights_2024_01.csv
+
+    # Fold in specific months from the partitioned store (only those partitions are read)
+    python scripts/update_model_incremental.py --data flight_data_store --months Nov,Dec
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.multioutput import MultiOutputClassifier
+from sklearn.preprocessing import StandardScaler, MinMaxScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
+
+from utils.artifacts import latest_model_path, load_model, save_versioned_model  # noqa: E402
+from utils.data import read_flights  # noqa: E402
+from utils.training import (TARGET_COLS, MONTH_ORDER, make_linear_preprocessor,  # noqa: E402
+                            split_features_targets, time_split, get_multioutput_proba,
+                            evaluate_multioutput_model)
+
+CLASSES = [np.array([0, 1])] * len(TARGET_COLS)
+
+
+def monthly_chunks(df):
+    """Yields (month, rows) in calendar order; falls back to one chunk without a month column."""
+    if 'month' not in df.columns:
+        yield 'all', df
+        return
+    for month in sorted(df['month'].unique(), key=lambda m: MONTH_ORDER.index(m) if m in MONTH_ORDER else m):
+        yield month, df[df['month'] == month]
+
+
+def pooled_class_weight(y):
+    """'balanced' weights pooled over both outputs (partial_fit needs a fixed dict)."""
+    positive_rate = np.asarray(y).mean()
+    return {0: 0.5 / (1 - positive_rate), 1: 0.5 / positive_rate}
+
+
+def update_scalers(preprocessor, X):
+    """partial_fit the scaling steps of a fitted ColumnTransformer on a new chunk."""
+    for _, transformer, cols in preprocessor.transformers_:
+        if not isinstance(transformer, Pipeline):
+            continue
+        data = X[cols]
+        for _, step in transformer.steps:
+            if isinstance(step, (StandardScaler, MinMaxScaler)):
+                step.partial_fit(data)
+            data = step.transform(data)
+
+
+def new_incremental_classifier(y_init, alpha):
+    return MultiOutputClassifier(SGDClassifier(
+        loss='log_loss',
+        alpha=alpha,
+        class_weight=pooled_class_weight(y_init),
+        random_state=42
+    ))
+
+
+def evaluate(name, model, X_test, y_test):
+    print(f"\n---- {name} ----")
+    X_test_linear = model.named_steps['preprocessor'].transform(X_test)
+    classifier = model.named_steps['classifier']
+    return evaluate_multioutput_model(
+        y_test,
+        classifier.predict(X_test_linear),
+        get_multioutput_proba(classifier, X_test_linear),
+        label_names=TARGET_COLS
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", required=True, help="Cleaned flights CSV or partitioned store directory with the new data")
+    parser.add_argument("--months", default=None, help="Comma-separated months to use, e.g. Nov,Dec")
+    parser.add_argument("--init", action="store_true",
+                        help="Start a new SGD classifier (required when the current model is not incremental)")
+    parser.add_argument("--scalers", choices=["fixed", "incremental"], default="fixed",
+                        help="Keep preprocessing statistics fixed or update the scalers with partial_fit")
+    parser.add_argument("--epochs", type=int, default=5, help="partial_fit passes over each monthly chunk")
+    parser.add_argument("--alpha", type=float, default=1e-4, help="SGD regularization strength")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Last fraction of rows kept for evaluation")
+    parser.add_argument("--parity", action="store_true",
+                        help="Also run a full LogisticRegression refit on the same rows and compare metrics")
+    parser.add_argument("--dry-run", action="store_true", help="Do not write a new artifact")
+    args = parser.parse_args()
+
+    filters = {'month': args.months.split(",")} if args.months else None
+    df, stats = read_flights(filters=filters, source=args.data)
+    if stats:
+        print(f"Loaded {stats}")
+    X, y = split_features_targets(df)
+    X_train, X_test, y_train, y_test = time_split(X, y, train_frac=1 - args.holdout)
+    train_df = df.iloc[:len(X_train)]
+
+    current_path = latest_model_path("logreg_pipeline")
+    current = load_model(current_path)
+    preprocessor = current.named_steps['preprocessor']
+    classifier = current.named_steps['classifier']
+
+    if args.init:
+        classifier = new_incremental_classifier(y_train, args.alpha)
+    elif not hasattr(classifier.estimator, 'partial_fit'):
+        sys.exit(f"{current_path.name} is not an incremental model; rerun with --init.")
+
+    print(f"Base artifact: {current_path.name} | scalers: {args.scalers}")
+
+    # ---- Incremental updates, one month at a time ----
+    months, total_start = [], time.perf_counter()
+    for month, chunk in monthly_chunks(train_df):
+        start = time.perf_counter()
+        X_chunk, y_chunk = split_features_targets(chunk)
+
+        if args.scalers == "incremental":
+            update_scalers(preprocessor, X_chunk)
+        X_chunk_linear = preprocessor.transform(X_chunk)
+
+        for _ in range(args.epochs):
+            classifier.partial_fit(X_chunk_linear, y_chunk.to_numpy(), classes=CLASSES)
+
+        months.append(str(month))
+        print(f"{month}: {len(chunk):>9,} rows in {time.perf_counter() - start:.2f}s")
+
+    incremental_seconds = time.perf_counter() - total_start
+    print(f"Incremental update: {incremental_seconds:.2f}s")
+
+    updated = Pipeline([
+        ("preprocessor", preprocessor),
+        ("classifier", classifier)
+    ])
+    inc_metrics, inc_details = evaluate("Incremental (SGD partial_fit)", updated, X_test, y_test)
+
+    # ---- Metric parity against a full refit ----
+    if args.parity:
+        start = time.perf_counter()
+        refit = Pipeline([
+            ("preprocessor", make_linear_preprocessor()),
+            ("classifier", MultiOutputClassifier(LogisticRegression(
+                solver='saga', random_state=42, max_iter=1000, class_weight='balanced'
+            )))
+        ]).fit(X_train, y_train)
+        refit_seconds = time.perf_counter() - start
+        refit_metrics, refit_details = evaluate("Full refit (LogisticRegression)", refit, X_test, y_test)
+
+        parity = pd.concat({
+            "Incremental": inc_details.set_index("Label"),
+            "Full refit": refit_details.set_index("Label"),
+        }, axis=1).round(3)
+        print("\n==== Parity ====")
+        print(parity.to_string())
+        print(f"Average PR AUC gap: {inc_metrics['Average PR AUC'] - refit_metrics['Average PR AUC']:+.3f}")
+        print(f"Wall time: incremental {incremental_seconds:.2f}s vs full refit {refit_seconds:.2f}s")
+
+    if args.dry_run:
+        return
+
+    path = save_versioned_model(updated, "logreg_pipeline", metadata={
+        "kind": "incremental-sgd",
+        "base": current_path.name,
+        "months": months,
+        "scalers": args.scalers,
+        "rows": int(len(X_train)),
+        "holdout_average_pr_auc": round(float(inc_metrics["Average PR AUC"]), 4),
+    })
+    print(f"\nSaved {path}")
+
+
+if __name__ == "__main__":
+    main()
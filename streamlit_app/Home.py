@@ -1,6 +1,7 @@
 import streamlit as st
 from pathlib import Path
 from PIL import Image
+from utils.warmup import start_warmup
 
 st.set_page_config(
     page_title="Flight Delay Predictor Home",
@@ -9,6 +10,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# Load the model and lookups in the background, so the Predictor is ready when visitors get there
+start_warmup()
+
 ## App title
 st.title("✈️ FLIGHT DELAY PREDICTION APP")
 
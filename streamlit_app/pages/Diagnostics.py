@@ -0,0 +1,134 @@
+import streamlit as st
+import pandas as pd
+from utils.memory import (memory_log_line, peak_rss_bytes, recorded_peaks, rss_bytes,
+                          session_overhead, start_memory_log, streamlit_memory_stats, tracked_sizes)
+from utils.live_delays import live_feed
+from utils.warmup import start_warmup
+
+st.set_page_config(
+    page_title="Diagnostics",
+    page_icon="🩺",
+    layout="centered",
+    initial_sidebar_state="collapsed"
+)
+
+start_memory_log()
+warmup = start_warmup()
+
+st.title("🩺 DIAGNOSTICS")
+st.write("Where this app process's memory goes. Objects appear once the page that loads them has been opened.")
+
+# ------ Process ------
+stats = streamlit_memory_stats()
+sessions = session_overhead(stats)
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Current RSS", f"{rss_bytes() / 1e6:,.0f} MB")
+col2.metric("Peak RSS", f"{peak_rss_bytes() / 1e6:,.0f} MB")
+col3.metric("Active sessions", f"{sessions['sessions']:,}",
+            f"{sessions['mean_bytes'] / 1e3:,.0f} KB state each (max {sessions['max_bytes'] / 1e3:,.0f} KB)",
+            delta_color="off")
+
+# ------ Warm-up ------
+st.markdown("#### Prediction warm-up")
+st.caption(f"Started {warmup.started_at:%Y-%m-%d %H:%M:%S}. The Predictor waits for it, and the "
+           f"`{warmup.ready_file}` file appears once it is ready.")
+
+if warmup.status() == "warming up":
+    st.info("Warming up: loading the model and lookups, then running a synthetic prediction.")
+elif warmup.status() == "failed":
+    st.error(f"Warm-up failed after {warmup.seconds:.1f}s; the Predictor builds on demand.")
+    st.code(warmup.error, language=None)
+else:
+    st.success(f"Ready after {warmup.seconds:.1f}s.")
+    st.dataframe(
+        pd.DataFrame({"Step": list(warmup.timings), "Seconds": list(warmup.timings.values())})
+        .style.format({"Seconds": "{:.2f}"}),
+        hide_index=True
+    )
+
+# ------ Live feed ------
+st.markdown("#### Live flight status feed")
+feed = live_feed()
+if feed is None:
+    st.info("Not started yet: it starts with the first Predictor session.")
+else:
+    feed_stats = feed.stats()
+    windows = feed.windows
+    st.caption(f"Reading `{feed.source}` since {feed.started_at:%Y-%m-%d %H:%M:%S}; "
+               f"{windows.window_seconds / 3600:g} h window in {windows.n_buckets} buckets, "
+               f"{windows.nbytes() / 1e6:,.1f} MB fixed.")
+    if feed.error:
+        st.error("The feed stopped; live values are frozen at the last batch.")
+        st.code(feed.error, language=None)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Events ingested", f"{feed_stats['events']:,}",
+                f"{feed_stats['late']:,} too late · {feed_stats['parse_errors']:,} unparseable", delta_color="off")
+    col2.metric("Throughput", "–" if feed_stats['events_per_second'] is None
+                else f"{feed_stats['events_per_second']:,.0f} events/s")
+    col3.metric("Lag", "–" if feed_stats['lag_seconds'] is None else f"{feed_stats['lag_seconds']:,.0f} s")
+    st.dataframe(
+        pd.DataFrame({"Keys": feed_stats["keys"], "Dropped (capacity)": feed_stats["dropped"]})
+        .rename_axis("Dimension").reset_index(),
+        hide_index=True
+    )
+
+# ------ Cached objects ------
+st.markdown("#### Cached objects")
+st.caption("Deep size: DataFrame string contents, arrays and everything a pipeline or index references.")
+
+sizes = tracked_sizes()
+if sizes.empty:
+    st.info("Nothing loaded yet: open the EDA or Predictor page first.")
+else:
+    sizes["MB"] = sizes.pop("bytes") / 1e6
+    sizes["Share"] = sizes["MB"] / sizes["MB"].sum()
+    st.dataframe(
+        sizes.rename(columns={"object": "Object", "type": "Type"})
+        .style.format({"MB": "{:,.1f}", "Share": "{:.0%}"}),
+        hide_index=True
+    )
+
+# ------ Streamlit caches ------
+st.markdown("#### Streamlit caches")
+st.caption("Entries of st.cache_data (section aggregates, route matrix, tails) and st.cache_resource, as Streamlit measures them, per cached function.")
+
+cached = stats[stats["category"] != "st_session_state"]
+if cached.empty:
+    st.info("No cache stats available (no cached entries yet, or not running under `streamlit run`).")
+else:
+    by_function = (
+        cached.groupby(["category", "name"])["bytes"]
+        .agg(["count", "sum"])
+        .rename(columns={"count": "Entries", "sum": "Bytes"})
+        .sort_values("Bytes", ascending=False)
+        .reset_index()
+        .rename(columns={"category": "Cache", "name": "Function"})
+    )
+    by_function["MB"] = by_function.pop("Bytes") / 1e6
+    st.dataframe(by_function.style.format({"MB": "{:,.2f}"}), hide_index=True)
+
+# ------ Peaks during load and aggregation ------
+st.markdown("#### Peak RSS by phase")
+st.caption("Sampled every 50 ms while each data load, aggregation or artifact build last ran.")
+
+peaks = recorded_peaks()
+if peaks.empty:
+    st.info("No loads or aggregations recorded yet.")
+else:
+    st.dataframe(
+        pd.DataFrame({
+            "Phase": peaks["phase"],
+            "Peak RSS (MB)": peaks["peak_rss"] / 1e6,
+            "Growth (MB)": peaks["rss_growth"] / 1e6,
+            "Seconds": peaks["seconds"],
+            "Last run": peaks["at"],
+        }).style.format({"Peak RSS (MB)": "{:,.0f}", "Growth (MB)": "{:,.0f}", "Seconds": "{:.2f}"}),
+        hide_index=True
+    )
+
+# ------ Log line ------
+st.markdown("#### Log line")
+st.caption("The same summary is logged every 5 minutes by the `flight_delay.memory` logger.")
+st.code(memory_log_line(), language=None)
@@ -1,7 +1,7 @@
 import streamlit as st
 import os
+import time
 import pandas as pd
-import gdown
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mtick
 import matplotlib as mpl
@@ -9,6 +9,18 @@ import numpy as np
 import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
+from concurrent.futures import ThreadPoolExecutor
+from utils.data import PREVIEW_SAMPLE_PATH, read_flights
+from utils.encoding import codebook_for, encode_flights
+from utils.route_matrix import build_route_matrix, slice_route_matrix
+from utils.quantiles import build_delay_sketches
+from utils.filter_index import BitmapIndex
+from utils.aggregation import CodeAggregator, Dimension, group_intervals, group_means
+from utils.sampling import read_sample, stratified_sample
+from utils.charts import WEBGL_THRESHOLD, reduce_scatter_points
+from utils.explanations import IMPORTANCE_PATH, DEPENDENCE_PATH
+from utils.memory import measured, record_peak, start_memory_log, track
+from utils.warmup import start_warmup
 
 # ----- Streamlit Page Config -----
 st.set_page_config(
@@ -18,6 +30,14 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+page_start = time.perf_counter()
+
+# Periodic memory log line (once per process; see the Diagnostics page)
+start_memory_log()
+
+# Prediction path warm-up (once per process, in the background)
+start_warmup()
+
 # ----- Title and Introduction -----
 st.title("📊 FLIGHT DELAY DATA ANALYSIS")
 
@@ -29,17 +49,440 @@ Imagine planning a cross-country trip in 2023. Which airlines should you trust t
 We analyzed **327,346 flights** across the United States throughout the entire year — uncovering real stories hidden behind the numbers.
 """)
 
-@st.cache_data
+# Shared, read-only: sections take filtered copies or aggregate, never modify it in place.
+# Airports and airlines are categoricals over the shared codebook, and routes a packed integer
+# 'route_id' (utils.encoding), so no route strings are built per flight. Month, day and time
+# block are ordered categoricals, so every grouping key is already an integer code
+def encode_eda_flights(df):
+    codebook = codebook_for(df)
+    df = encode_flights(df, codebook)
+    df = df.assign(**{
+        col: pd.Categorical(df[col], categories=FILTER_COLS[col][1], ordered=True)
+        for col in TIME_DIMS
+    })
+    return df, codebook
+
+# The flights with their filter index and aggregator, built on the exact executor (below) with
+# no Streamlit call, so a fast preview can start it in the background. The cached loaders
+# only wait for it
+def build_exact_state():
+    with record_peak("flights load"):
+        df, _ = read_flights()
+        df, codebook = encode_eda_flights(df)
+    filter_index = track("filter index", BitmapIndex(df, list(FILTER_COLS)))
+    aggregator = track("aggregator", build_aggregator(df))
+    return track("flights_df", df), codebook, filter_index, aggregator
+
+@st.cache_resource(show_spinner=False)
+def submit_exact_state():
+    return exact_executor().submit(build_exact_state)
+
+def live_future(submit, *args):
+    # A cached future that failed (e.g. a transient download error) is dropped and submitted
+    # again, so the failure isn't replayed on every run until the process restarts
+    future = submit(*args)
+    if future.done() and future.exception() is not None:
+        submit.clear(*args)
+        future = submit(*args)
+    return future
+
+def exact_state():
+    return live_future(submit_exact_state)
+
+@st.cache_resource(show_spinner="Loading flights...")
+def load_exact_state():
+    return exact_state().result()
+
+def load_encoded_data():
+    return load_exact_state()[:2]
+
 def load_data():
-    output = "flight_data.csv"
-    if not os.path.exists(output):
-        url = "https://drive.google.com/uc?id=1-2YlSUqC4XE_DIOanrZabDWHTm1j_FSp"
-        gdown.download(url, output, quiet=True)
-    df = pd.read_csv(output)
-    return df
+    return load_exact_state()[0]
+
+# Per-value bitmaps over the filterable columns, built once per data load
+FILTER_COLS = {
+    'month': ('Month', ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']),
+    'day_of_week': ('Day of Week', ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']),
+    'time_block': ('Time Block', ['12am–6am', '6am–9am', '9am–12pm', '12pm–3pm', '3pm–6pm', '6pm–9pm', '9pm–12am']),
+    'airline_name': ('Airline', None),
+    'origin': ('Origin', None),
+    'dist_haul': ('Distance Haul', ['Short', 'Medium', 'Long']),
+}
 
-# ----- Load Data -----
-flights_df = load_data()
+def load_filter_index():
+    return load_exact_state()[2]
+
+# Delay-minute quantile sketches per route × airline × month, built in one streaming pass
+@st.cache_resource(show_spinner=False)
+def load_delay_sketches():
+    # Only the six columns the sketches need are read (from the store, or the CSV)
+    df, _ = read_flights(columns=['origin', 'dest', 'airline_name', 'month', 'dep_delay', 'arr_delay'])
+    chunks = (df.iloc[i:i + 500_000] for i in range(0, len(df), 500_000))
+    return track("delay sketches", build_delay_sketches(chunks, ['origin', 'dest', 'airline_name', 'month']))
+
+# Tail delays (p50/p90/p99 minutes) per route and airline
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_route_airline_tails(selection_key=()):
+    sketches = load_delay_sketches()
+    tails = []
+    for col, label in [('dep_delay', 'Dep'), ('arr_delay', 'Arr')]:
+        quantiles = sketches[col].subset(dict(selection_key)).rollup(['origin', 'dest', 'airline_name']).quantiles()
+        quantiles.columns = [f"{label} Delay {q} (min)" for q in quantiles.columns]
+        tails.append(quantiles)
+    return pd.concat(tails, axis=1).round(0)
+
+# Integer codes of every dimension the sections group by, built once per data load: a filter
+# selection aggregates all of them in one bincount pass over the codes (utils.aggregation)
+DELAY_FLAGS = ['dep_delayed_15', 'arr_delayed_15']
+DELAY_MINUTES = ['dep_delay', 'arr_delay']
+TIME_DIMS = ['month', 'day_of_week', 'time_block']
+
+def build_aggregator(df, weights=None):
+    dims = {col: Dimension.of(df[col], categories=FILTER_COLS[col][1]) for col in TIME_DIMS}
+    dims.update({col: Dimension.of(df[col]) for col in ['airline_name', 'origin', 'dest']})
+    dims['route'] = Dimension.cross(dims['origin'], dims['dest'])
+    dims['airline_route'] = Dimension.cross(dims['airline_name'], dims['route'])
+
+    values = {col: df[col].to_numpy() for col in DELAY_FLAGS + DELAY_MINUTES}
+    values['flight'] = df['flight'].notna().to_numpy()  # summed: the non-null count groupby gave
+    return CodeAggregator(dims, values, weights)
+
+# ----- Exact results -----
+# One job per filter selection: the dimension totals and the sparse origin × destination matrix
+@st.cache_resource(show_spinner=False)
+def exact_executor():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="eda-exact")
+
+@measured("exact totals")
+def exact_totals(state, selection_key):
+    df, codebook, filter_index, aggregator = state
+    mask = filter_index.query(dict(selection_key))
+    return (aggregator.totals(mask, keep_empty=TIME_DIMS),
+            build_route_matrix(df if mask is None else df[mask], codebook))
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def submit_exact_job(selection_key):
+    # Shared state is resolved in the submitting session's thread: the job itself is plain
+    # computation, so it never needs (or borrows) a script context
+    state = exact_state()
+    return exact_executor().submit(lambda: exact_totals(state.result(), selection_key))
+
+def exact_job(selection_key):
+    return live_future(submit_exact_job, selection_key)
+
+def dimension_totals(selection_key=()):
+    return exact_job(selection_key).result()[0]
+
+def load_route_matrix(selection_key=()):
+    return exact_job(selection_key).result()[1]
+
+# ----- Fast preview -----
+# Opt-in: sections are first drawn from a stratified sample (month × airline × origin) with
+# confidence intervals, while the exact results run in the background. The sample is the
+# pre-drawn file written with the store (scripts/build_dataset_store.py), read on its own with
+# its own filter index; without one, it is drawn from the full data
+@st.cache_resource(show_spinner=False)
+@measured("preview sample load")
+def load_preview_sample():
+    start = time.perf_counter()
+    if os.path.exists(PREVIEW_SAMPLE_PATH):
+        df, weights, _ = read_sample(PREVIEW_SAMPLE_PATH)
+        df, codebook = encode_eda_flights(df)
+    else:
+        full, codebook = load_encoded_data()
+        sample = stratified_sample(full)
+        df, weights = full.take(sample.rows), sample.weights
+    return track("preview sample", df), codebook, weights, time.perf_counter() - start
+
+@st.cache_resource(show_spinner=False)
+def load_preview_index():
+    return track("preview filter index", BitmapIndex(load_preview_sample()[0], list(FILTER_COLS)))
+
+@st.cache_resource(show_spinner=False)
+def load_preview_aggregator():
+    df, _, weights, _ = load_preview_sample()
+    return track("preview aggregator", build_aggregator(df, weights))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def preview_totals(selection_key=()):
+    mask = load_preview_index().query(dict(selection_key))
+    return load_preview_aggregator().totals(mask, keep_empty=TIME_DIMS)
+
+def estimated_count(selection):
+    # Weighted number of sampled flights matching the selection
+    weights = load_preview_sample()[2]
+    mask = load_preview_index().query(selection)
+    return int(round((weights if mask is None else weights[mask]).sum()))
+
+def section_totals(selection_key, preview=False):
+    return preview_totals(selection_key) if preview else dimension_totals(selection_key)
+
+@st.fragment(run_every=1)
+def refine_when_exact(job):
+    if job.done():
+        st.rerun()
+    df, _, _, load_seconds = load_preview_sample()
+    st.caption(f"⚡ Preview: estimates from a stratified sample of {len(df):,} flights (loaded in "
+               f"{load_seconds:.2f} s), with 95% confidence intervals. "
+               "The charts switch to exact results as soon as they are ready.")
+
+def preview_caption(selection_key, dims):
+    # Typical and widest 95% interval of the delay rates behind a section
+    half_widths = pd.concat([group_intervals(preview_totals(selection_key)[dim], DELAY_FLAGS) for dim in dims])
+    half_widths = half_widths.stack().dropna()
+    st.caption(f"⚡ Preview: delay rates within ±{half_widths.median():.1%} (typical) and "
+               f"±{half_widths.max():.1%} (widest) at 95% confidence.")
+
+def delay_stats(totals, minutes=False):
+    # Mean delay flags, flight count (and mean delay minutes) per group, rounded like the tables
+    stats = group_means(totals, DELAY_FLAGS)
+    stats['flight'] = totals['flight'].round().astype('int64')  # estimated in preview
+    if minutes:
+        stats[DELAY_MINUTES] = group_means(totals, DELAY_MINUTES)
+    return stats.round(2)
+
+def route_label(index):
+    # "ORIGIN - DEST" for the (origin, dest) levels of a route index, built once per route
+    return (index.get_level_values('origin').astype(str) + ' - ' + index.get_level_values('dest').astype(str)).to_numpy()
+
+# ----- Section data -----
+# Each section formats its tables on first use and is cached per filter selection, so slide
+# navigation and widget changes inside a section never recompute the other sections
+
+# Map clusters to intuitive short labels with explicit order
+cluster_map = {
+    4: "Very Low Delay, Low Traffic",
+    3: "Low Delay, Avg Traffic", 
+    1: "Low Delay, High Traffic",
+    0: "Moderate Delay, Low Traffic",
+    2: "High Delay, Low Traffic"
+}
+
+# Define the desired order explicitly
+cluster_order = [
+    "Very Low Delay, Low Traffic",
+    "Low Delay, Avg Traffic",
+    "Low Delay, High Traffic",
+    "Moderate Delay, Low Traffic",
+    "High Delay, Low Traffic",
+]
+
+# Destination → cluster, fixed per destination (from the sample's rows, for a preview)
+@st.cache_resource(show_spinner=False)
+def load_dest_cluster_map(preview=False):
+    return (
+        (load_preview_sample()[0] if preview else load_data())[['dest', 'dest_cluster']]
+        .drop_duplicates()
+        .astype({'dest': str})
+        .set_index('dest')['dest_cluster']
+    )
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def time_aggregates(selection_key=(), preview=False):
+    totals = section_totals(selection_key, preview)
+
+    def trend(dim):
+        # Preview tables also carry the 95% interval half-width of each rate ('<col>_ci')
+        table = group_means(totals[dim], DELAY_FLAGS)
+        if preview:
+            table = table.join(group_intervals(totals[dim], DELAY_FLAGS).add_suffix('_ci'))
+        return table
+
+    # Monthly Delay Trends (every month, in calendar order, NaN when none selected)
+    monthly_delay = trend('month').reset_index()
+
+    # DOW Delay Trends
+    dow_delay = trend('day_of_week').reset_index()
+
+    # Hourly Delay Trends
+    time_delay = trend('time_block').round(2).reset_index()
+
+    return monthly_delay, dow_delay, time_delay
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def airline_aggregates(selection_key=(), preview=False):
+    airline_delay = group_means(section_totals(selection_key, preview)['airline_name'], DELAY_FLAGS) * 100
+
+    # Plain strings again for the charts (a categorical axis would show every codebook airline)
+    airline_delay = airline_delay.round(1).reset_index().astype({'airline_name': str}).rename(columns={
+        'airline_name': 'Airline Name',
+        'dep_delayed_15': 'Departure Delay ≥15m',
+        'arr_delayed_15': 'Arrival Delay ≥15m'
+    })
+
+    airline_delay['Total Delay'] = airline_delay['Departure Delay ≥15m'] + airline_delay['Arrival Delay ≥15m']
+    airline_delay['Dep %'] = round(airline_delay['Departure Delay ≥15m'] / airline_delay['Total Delay'] * 100, 2)
+    airline_delay['Arr %'] = round(airline_delay['Arrival Delay ≥15m'] / airline_delay['Total Delay'] * 100, 2)
+
+    return airline_delay.sort_values('Total Delay', ascending=False)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def airport_aggregates(selection_key=(), preview=False):
+    totals = section_totals(selection_key, preview)
+
+    # ---- Origin Airport Delay Trends ----
+    origin_airport_delay = delay_stats(totals['origin']).reset_index().astype({'origin': str})
+    origin_airport_delay.columns = ['Airport', 'Departure Delay ≥15m', 'Arrival Delay ≥15m', 'Total Flights']
+    origin_airport_delay.sort_values(by='Departure Delay ≥15m', ascending=False, inplace=True)
+
+    # ------- Destination Airport Delay Trends -------
+    dest_airport_delay = delay_stats(totals['dest']).reset_index().astype({'dest': str})
+    dest_airport_delay.columns = ['Airport', 'Departure Delay ≥15m', 'Arrival Delay ≥15m', 'Total Flights']
+    dest_airport_delay.sort_values(by='Departure Delay ≥15m', ascending=False, inplace=True)
+
+    # Clusters
+    dest_airport_delay['Cluster'] = dest_airport_delay['Airport'].map(load_dest_cluster_map(preview))
+    dest_airport_delay['Cluster Label'] = dest_airport_delay['Cluster'].map(cluster_map)
+
+    # Make 'Cluster Label' a categorical variable with order
+    dest_airport_delay['Cluster Label'] = pd.Categorical(dest_airport_delay['Cluster Label'],
+                                                         categories=cluster_order,
+                                                         ordered=True)
+    return origin_airport_delay, dest_airport_delay
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def route_aggregates(selection_key=(), preview=False):
+    totals = section_totals(selection_key, preview)
+
+    # Route-level delay aggregation: delay proportions, flights and average delay minutes
+    route_delay = delay_stats(totals['route'], minutes=True)
+    route_delay.insert(0, 'Route', route_label(route_delay.index))
+    route_delay = route_delay.reset_index(drop=True)
+
+    # Rename columns for clarity
+    route_delay.columns = [
+        'Route',
+        'Departure Delay ≥15m',
+        'Arrival Delay ≥15m',
+        'Total Flights',
+        'Avg Dep Delay',
+        'Avg Arr Delay'
+    ]
+
+    # Calculate delay rate (mean of dep + arr delay proportions)
+    route_delay['Delay Rate'] = ((route_delay['Departure Delay ≥15m'] + route_delay['Arrival Delay ≥15m']) / 2).round(2)
+
+    # Compute delay score (delay rate * total avg delay)
+    route_delay['Delay Score'] = (route_delay['Delay Rate'] * (route_delay['Avg Dep Delay'] + route_delay['Avg Arr Delay'])).round(2)
+
+    # Airline-by-route level aggregation
+    airline_routes = delay_stats(totals['airline_route'], minutes=True)
+    airline_routes.insert(0, 'Route', route_label(airline_routes.index))
+    airline_routes.insert(0, 'Airline', airline_routes.index.get_level_values('airline_name').astype(str))
+    airline_routes = airline_routes.reset_index(drop=True)
+
+    # Rename columns
+    airline_routes.columns = [
+        'Airline',
+        'Route',
+        'Departure Delay ≥15m',
+        'Arrival Delay ≥15m',
+        'Total Flights',
+        'Avg Dep Delay',
+        'Avg Arr Delay'
+    ]
+
+    # Calculate delay rate
+    airline_routes['Delay Rate'] = ((airline_routes['Departure Delay ≥15m'] + airline_routes['Arrival Delay ≥15m']) / 2).round(2)
+
+    # Compute delay score
+    airline_routes['Delay Score'] = (airline_routes['Delay Rate'] * (airline_routes['Avg Dep Delay'] + airline_routes['Avg Arr Delay'])).round(2)
+
+    # Routes in order of first appearance, for the route picker (in the sample, for a preview)
+    if preview:
+        df, codebook = load_preview_sample()[:2]
+        mask = load_preview_index().query(dict(selection_key))
+    else:
+        df, codebook = load_encoded_data()
+        mask = load_filter_index().query(dict(selection_key))
+    route_ids = df['route_id'].to_numpy()
+    if mask is not None:
+        route_ids = route_ids[mask]
+    route_options = codebook.route_labels(pd.unique(route_ids))
+
+    # Overall average delay across the selection, for the route comparison reference line
+    if preview:
+        airline_totals = totals['airline_name'][DELAY_FLAGS + [f"{col}_n" for col in DELAY_FLAGS]].sum()
+        overall_avg_delay = (airline_totals[DELAY_FLAGS].sum()
+                             / airline_totals[[f"{col}_n" for col in DELAY_FLAGS]].sum())
+    else:
+        flags = df[DELAY_FLAGS].to_numpy()
+        overall_avg_delay = (flags if mask is None else flags[mask]).mean()
+
+    return route_delay, airline_routes, route_options, overall_avg_delay
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def route_airline_delay(selection_key, route, preview=False):
+    # The selected route's rows of the airline × route totals
+    totals = section_totals(selection_key, preview)['airline_route']
+    route_origin, route_dest = route.split(' - ')
+    on_route = (totals.index.get_level_values('origin') == route_origin) & (totals.index.get_level_values('dest') == route_dest)
+
+    # Average delays per airline for this route
+    airline_delay = (
+        delay_stats(totals[on_route])
+        .droplevel(['origin', 'dest'])
+        .reset_index()
+        .astype({'airline_name': str})
+    )
+
+    # Rename columns for cleaner legend labels
+    airline_delay = airline_delay.rename(columns={
+        'dep_delayed_15': 'Departure Delay ≥15m',
+        'arr_delayed_15': 'Arrival Delay ≥15m',
+         'flight': 'Total Flights'
+    })
+
+    return airline_delay.sort_values('Total Flights', ascending=False)
+
+def section_timer(section_start):
+    # Wall time of the section's last run: for a click inside a section, that's the whole rerun
+    st.caption(f"⏱️ Section updated in {(time.perf_counter() - section_start) * 1000:.0f} ms")
+
+preview_mode = st.toggle(
+    "⚡ Fast preview",
+    help="Draw the charts from a stratified sample first (with confidence intervals) and "
+         "switch to exact results once they have been computed in the background."
+)
+
+# ----- Cross-filters -----
+# In preview mode the options come from the sample's own index, so nothing waits for the full load
+filter_index = load_preview_index() if preview_mode else load_filter_index()
+selection = {}
+
+with st.expander("🔎 Filter the flights behind every chart"):
+    filter_cols = st.columns(2)
+    for i, (col, (label, order)) in enumerate(FILTER_COLS.items()):
+        options = [v for v in order if v in filter_index.bitmaps[col]] if order else sorted(filter_index.values(col))
+        with filter_cols[i % 2]:
+            selection[col] = st.multiselect(label, options, placeholder="All")
+
+selection_key = tuple((col, tuple(values)) for col, values in selection.items() if values)
+
+preview = False
+if preview_mode:
+    job = exact_job(selection_key)
+    # Nothing sampled to preview (a rare day/time/haul combination): wait for the exact results
+    preview = not job.done() and estimated_count(selection) > 0
+
+query_start = time.perf_counter()
+if preview:
+    n_selected, n_total = estimated_count(selection), estimated_count({})
+else:
+    filter_index = load_filter_index()
+    n_selected, n_total = filter_index.count(selection), filter_index.n_rows
+query_ms = (time.perf_counter() - query_start) * 1000
+
+if selection_key:
+    approx = "~" if preview else ""
+    st.caption(f"Showing {approx}{n_selected:,} of {approx}{n_total:,} flights (filter resolved in {query_ms:.1f} ms).")
+
+if n_selected == 0:
+    st.warning("No flights match these filters.")
+    st.stop()
+
+if preview:
+    refine_when_exact(job)
 
 # --------- Customizations ----------
 # ----- Custom Color Palette -----
@@ -114,45 +557,21 @@ We analyzed delay rates by **month**, **day of the week**, and **time of day** t
 These insights can help travelers plan smarter — and support data-driven decisions in scheduling and operations.
 """)
 
-# Prepare data
-# Define correct 3-letter orderings
-month_order = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-
-dow_order = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-
-time_order = ['12am–6am', '6am–9am', '9am–12pm', '12pm–3pm', '3pm–6pm', '6pm–9pm', '9pm–12am']
-
-# Ensure the columns are categorical with the correct order
-flights_df['month'] = pd.Categorical(flights_df['month'], categories=month_order, ordered=True)
-flights_df['day_of_week'] = pd.Categorical(flights_df['day_of_week'], categories=dow_order, ordered=True)
-flights_df['time_block'] = pd.Categorical(flights_df['time_block'], categories=time_order, ordered=True)
-
-# Monthly Delay Trends
-monthly_delay = flights_df.groupby('month', observed=False).agg({
-    'dep_delayed_15': 'mean',
-    'arr_delayed_15': 'mean'
-}).reset_index()
-
-# DOW Delay Trends
-dow_delay = flights_df.groupby('day_of_week', observed=False).agg({
-    'dep_delayed_15': 'mean',
-    'arr_delayed_15': 'mean'
-}).reset_index()
-
-# Hourly Delay Trends
-time_delay = (
-    flights_df.groupby('time_block', observed=False)[['dep_delayed_15', 'arr_delayed_15']]
-    .mean().round(2)
-    .reset_index()
-)
+# 95% intervals around the preview's delay rates (exact tables have none)
+def confidence_bands(ax, trend, x):
+    for col, color in [('dep_delayed_15', custom_palette[0]), ('arr_delayed_15', custom_palette[1])]:
+        if f'{col}_ci' in trend.columns:
+            positions = np.arange(len(trend))
+            ax.fill_between(positions, trend[col] - trend[f'{col}_ci'], trend[col] + trend[f'{col}_ci'],
+                            color=color, alpha=0.15, linewidth=0)
 
 # -------- Slide 1: Monthly Delay Trends Plot -------------
-def time_slide_1(df):
+def time_slide_1(monthly_delay):
     fig, ax = plt.subplots(figsize=(10, 5))
 
     sns.lineplot(data=monthly_delay, x='month', y='dep_delayed_15', label='Departure Delay ≥15 min', ax=ax, color=custom_palette[0])
     sns.lineplot(data=monthly_delay, x='month', y='arr_delayed_15', label='Arrival Delay ≥15 min', ax=ax, color=custom_palette[1])
+    confidence_bands(ax, monthly_delay, 'month')
 
     ax.yaxis.set_major_formatter(mtick.PercentFormatter(xmax=1.0, decimals=0))
     ax.spines[['top', 'right']].set_visible(False)
@@ -164,11 +583,12 @@ def time_slide_1(df):
     return fig
 
 # -------- Slide 2: Weekly Delay Patterns Plot -------------
-def time_slide_2(df):
+def time_slide_2(dow_delay):
     fig, ax = plt.subplots(figsize=(10, 6))
 
     sns.lineplot(data=dow_delay, x='day_of_week', y='dep_delayed_15', label='Departure Delay ≥15 min', ax=ax, color=custom_palette[0])
     sns.lineplot(data=dow_delay, x='day_of_week', y='arr_delayed_15', label='Arrival Delay ≥15 min', ax=ax, color=custom_palette[1])
+    confidence_bands(ax, dow_delay, 'day_of_week')
 
     ax.yaxis.set_major_formatter(mtick.PercentFormatter(xmax=1.0, decimals=0))
     ax.spines[['top', 'right']].set_visible(False)
@@ -180,11 +600,12 @@ def time_slide_2(df):
     return fig    
 
 # -------- Slide 3: Hourly Delay Patterns Plot -------------
-def time_slide_3(df):
+def time_slide_3(time_delay):
     fig, ax = plt.subplots(figsize=(10, 5))
 
     sns.lineplot(data=time_delay, x='time_block', y='dep_delayed_15', label='Departure Delay ≥15 min', ax=ax, color=custom_palette[0])
     sns.lineplot(data=time_delay, x='time_block', y='arr_delayed_15', label='Arrival Delay ≥15 min', ax=ax, color=custom_palette[1])
+    confidence_bands(ax, time_delay, 'time_block')
 
     ax.yaxis.set_major_formatter(mtick.PercentFormatter(xmax=1.0, decimals=0))
     ax.spines[['top', 'right']].set_visible(False)
@@ -195,75 +616,87 @@ def time_slide_3(df):
 
     return fig        
 
-# --------- Navigation buttons
-col1a, _, col2a = st.columns([1, 6, 1])
-with col1a:
-    if st.button("◀️ Back", key="back_a") and st.session_state.slide_1 > 1:
-        st.session_state.slide_1 -= 1
-with col2a:
-    if st.button("Next ▶️", key="next_a") and st.session_state.slide_1 < 3:
-        st.session_state.slide_1 += 1
-
-if st.session_state.slide_1 == 1:
-    st.markdown("##### 🗓️ Monthly Delay Trends: Tracking Seasonal Peaks and Dips")
-    st.write("How do delays shift throughout the year?")
+# Reruns on its own when the slide buttons are clicked
+@st.fragment
+def time_patterns_section(selection_key, preview=False):
+    section_start = time.perf_counter()
+    monthly_delay, dow_delay, time_delay = time_aggregates(selection_key, preview)
+    if preview:
+        preview_caption(selection_key, TIME_DIMS)
+
+    # --------- Navigation buttons
+    col1a, _, col2a = st.columns([1, 6, 1])
+    with col1a:
+        if st.button("◀️ Back", key="back_a") and st.session_state.slide_1 > 1:
+            st.session_state.slide_1 -= 1
+    with col2a:
+        if st.button("Next ▶️", key="next_a") and st.session_state.slide_1 < 3:
+            st.session_state.slide_1 += 1
+
+    if st.session_state.slide_1 == 1:
+        st.markdown("##### 🗓️ Monthly Delay Trends: Tracking Seasonal Peaks and Dips")
+        st.write("How do delays shift throughout the year?")
     
-    fig = time_slide_1(monthly_delay)
-    st.pyplot(fig)
+        fig = time_slide_1(monthly_delay)
+        st.pyplot(fig)
 
-    st.write("""
-    - Delays **peak in summer (June–July)** and **December**, driven by **high travel demand** and **weather-related disruptions**.
-    - The **fall months (September–November)** see the **lowest delay rates**, thanks to calmer weather and lighter travel loads.
-    """)
+        st.write("""
+        - Delays **peak in summer (June–July)** and **December**, driven by **high travel demand** and **weather-related disruptions**.
+        - The **fall months (September–November)** see the **lowest delay rates**, thanks to calmer weather and lighter travel loads.
+        """)
 
-    st.write("""
-    Let’s zoom in from months to **days of the week** to uncover more timing-based insights.
-    """)
+        st.write("""
+        Let’s zoom in from months to **days of the week** to uncover more timing-based insights.
+        """)
 
-elif st.session_state.slide_1 == 2:
-    st.markdown("##### 📅 Weekly Delay Patterns: Midweek Mayhem, Thursday Calm")
-    st.write("Which days of the week see the most or least delays?")
+    elif st.session_state.slide_1 == 2:
+        st.markdown("##### 📅 Weekly Delay Patterns: Midweek Mayhem, Thursday Calm")
+        st.write("Which days of the week see the most or least delays?")
 
-    fig = time_slide_2(dow_delay)
-    st.pyplot(fig)
+        fig = time_slide_2(dow_delay)
+        st.pyplot(fig)
 
-    st.write("""
-    - **Tuesdays and Wednesdays** are the most delay-prone, likely due to **business travel surges** and midweek congestion.
-    - **Thursdays** are the most punctual, offering a sweet spot before the weekend rush.
-    """)
+        st.write("""
+        - **Tuesdays and Wednesdays** are the most delay-prone, likely due to **business travel surges** and midweek congestion.
+        - **Thursdays** are the most punctual, offering a sweet spot before the weekend rush.
+        """)
 
-    st.write("""
-    Now, let’s drill down to **hourly patterns** — when in the day are delays most likely?
-    """)
+        st.write("""
+        Now, let’s drill down to **hourly patterns** — when in the day are delays most likely?
+        """)
 
-elif st.session_state.slide_1 == 3:
-    st.markdown("##### 🕑 Hourly Delay Patterns: Evening Rush vs. Early Bird Advantage")
-    st.write("Do delays depend on what time of day you fly?")
+    elif st.session_state.slide_1 == 3:
+        st.markdown("##### 🕑 Hourly Delay Patterns: Evening Rush vs. Early Bird Advantage")
+        st.write("Do delays depend on what time of day you fly?")
 
-    fig = time_slide_3(time_delay)
-    st.pyplot(fig)
+        fig = time_slide_3(time_delay)
+        st.pyplot(fig)
 
-    st.write("""
-    - **Delays climb steadily throughout the day**, peaking during **evening hours (6 PM – 12 AM)** due to cascading operational delays.
-    - **Early morning flights (12 AM – 9 AM)** are most reliable — low traffic, rested crews, and clean schedules all contribute.
-    """)
+        st.write("""
+        - **Delays climb steadily throughout the day**, peaking during **evening hours (6 PM – 12 AM)** due to cascading operational delays.
+        - **Early morning flights (12 AM – 9 AM)** are most reliable — low traffic, rested crews, and clean schedules all contribute.
+        """)
 
-    st.write("""
-    ###### 🧾 Summary & Recommendations
+        st.write("""
+        ###### 🧾 Summary & Recommendations
 
-    **For Travelers:**  
-    - Your best bet for on-time flights? **Book early departures**, especially on **Thursdays**.
-    - Avoid **evening flights** and **midweek peaks** (Tuesdays & Wednesdays) when delays are most likely.
+        **For Travelers:**  
+        - Your best bet for on-time flights? **Book early departures**, especially on **Thursdays**.
+        - Avoid **evening flights** and **midweek peaks** (Tuesdays & Wednesdays) when delays are most likely.
 
-    **For Airlines & Airports:**  
-    - Use these patterns to **optimize flight schedules**, **adjust staffing**, and **streamline operations** during high-delay windows.
-    - Prioritizing early-day efficiency and midweek resilience could greatly improve on-time performance and customer satisfaction.
-    """)
+        **For Airlines & Airports:**  
+        - Use these patterns to **optimize flight schedules**, **adjust staffing**, and **streamline operations** during high-delay windows.
+        - Prioritizing early-day efficiency and midweek resilience could greatly improve on-time performance and customer satisfaction.
+        """)
 
-    st.markdown("""
-    **But when and how often delays occur isn't the full story —**  
-    Let’s now explore how **different airlines** stack up in delay performance.
-    """)
+        st.markdown("""
+        **But when and how often delays occur isn't the full story —**  
+        Let’s now explore how **different airlines** stack up in delay performance.
+        """)
+
+    section_timer(section_start)
+
+time_patterns_section(selection_key, preview)
 
 st.markdown("---")    
 
@@ -284,27 +717,9 @@ Each airline’s performance is visualized across six key slides:
 Let’s dive into the skies of data to see who’s making passengers wait—and who’s keeping them moving.
 """)
 
-# ----- Prepare data for airline delay analysis -----
-airline_delay = flights_df.groupby('airline_name').agg({
-    'dep_delayed_15': 'mean',
-    'arr_delayed_15': 'mean',
-}) * 100 
-
-airline_delay = airline_delay.round(1).reset_index().rename(columns={
-    'airline_name': 'Airline Name',
-    'dep_delayed_15': 'Departure Delay ≥15m',
-    'arr_delayed_15': 'Arrival Delay ≥15m'
-})
-
-airline_delay['Total Delay'] = airline_delay['Departure Delay ≥15m'] + airline_delay['Arrival Delay ≥15m']
-airline_delay['Dep %'] = round(airline_delay['Departure Delay ≥15m'] / airline_delay['Total Delay'] * 100, 2)
-airline_delay['Arr %'] = round(airline_delay['Arrival Delay ≥15m'] / airline_delay['Total Delay'] * 100, 2)
-
-airline_delay = airline_delay.sort_values('Total Delay', ascending=False)
-
 #st.dataframe(airline_delay)
 # -------- Slide 1: Total Delay Trends -------------
-def airline_slide_1(df):
+def airline_slide_1(airline_delay):
     fig, ax = plt.subplots(figsize=(8, 6))
     ax.barh(airline_delay['Airline Name'], airline_delay['Total Delay'], color=custom_palette[-4])
 
@@ -325,7 +740,7 @@ def airline_slide_1(df):
     return fig
 
 # ---------- Slide 2: Top Latecomers overall
-def airline_slide_2(df):
+def airline_slide_2(airline_delay):
     top_4 = airline_delay['Total Delay'].head(4).index
 
     colors= []
@@ -366,7 +781,7 @@ def airline_slide_2(df):
     return fig         
 
  # ---------- Slide 3: Top Puntuals overall
-def airline_slide_3(df):
+def airline_slide_3(airline_delay):
     bottom_4 = airline_delay['Total Delay'].tail(4).index
 
     colors= []
@@ -407,7 +822,7 @@ def airline_slide_3(df):
     return fig    
 
 # ------Slide 4: Delay Type
-def airline_slide_4(df):
+def airline_slide_4(airline_delay):
     fig, ax = plt.subplots(figsize=(8, 6))
 
     # Plot Departure % first
@@ -444,7 +859,7 @@ def airline_slide_4(df):
     return fig   
 
 # ---------- Slide 5-----
-def airline_slide_5(df):
+def airline_slide_5(airline_delay):
     # ----- Highlight top 4 airlines -----
     top_4 = airline_delay.head(4).index
 
@@ -506,7 +921,7 @@ def airline_slide_5(df):
     return fig   
 
 # ---------- Slide 6-----
-def airline_slide_6(df):
+def airline_slide_6(airline_delay):
     # ----- Highlight bottom 4 airlines -----
     bottom_4 = airline_delay.tail(4).index
 
@@ -567,121 +982,133 @@ def airline_slide_6(df):
     ax.margins(y=0.015)
     return fig   
 
-# --------- Navigation buttons
-col1b, _, col2b = st.columns([1, 6, 1])
-with col1b:
-    if st.button("◀️ Back", key="back_b") and st.session_state.slide_2 > 1:
-        st.session_state.slide_2 -= 1
-with col2b:
-    if st.button("Next ▶️", key="next_b") and st.session_state.slide_2 < 6:
-        st.session_state.slide_2 += 1
-
-if st.session_state.slide_2 == 1:
-    st.markdown("##### ✈️ Airline-Level Delay Performance")
-    st.write("How do airlines compare in terms of delays?")
+# Reruns on its own when the slide buttons are clicked
+@st.fragment
+def airline_section(selection_key, preview=False):
+    section_start = time.perf_counter()
+    airline_delay = airline_aggregates(selection_key, preview)
+    if preview:
+        preview_caption(selection_key, ['airline_name'])
+
+    # --------- Navigation buttons
+    col1b, _, col2b = st.columns([1, 6, 1])
+    with col1b:
+        if st.button("◀️ Back", key="back_b") and st.session_state.slide_2 > 1:
+            st.session_state.slide_2 -= 1
+    with col2b:
+        if st.button("Next ▶️", key="next_b") and st.session_state.slide_2 < 6:
+            st.session_state.slide_2 += 1
+
+    if st.session_state.slide_2 == 1:
+        st.markdown("##### ✈️ Airline-Level Delay Performance")
+        st.write("How do airlines compare in terms of delays?")
     
-    fig = airline_slide_1(airline_delay)
-    st.pyplot(fig)
-
-    st.write("""
-        There's a broad spread in total delay rates across carriers, which reveals major operational differences. Identifying top and bottom performers helps spotlight reliability gaps.
-    """)
-
-    st.write("""
-        Let's now focus on **who exactly are the worst offenders** when it comes to delays.
-    """)
-
-elif st.session_state.slide_2 == 2:
-    st.markdown("##### 🚨 Most Delayed Airlines")
-    st.markdown("Which carriers have the highest delay rates?")
-
-    fig = airline_slide_2(airline_delay)
-    st.pyplot(fig)
-
-    st.markdown("""
-        Frontier, ExpressJet, AirTran and Mesa Airlines lead in delays, each with total delay rates above 60%. These patterns suggest persistent operational or route-specific issues.
-    """)
-
-    st.markdown("""
-        But while some airlines struggle, others excel — let's now highlight the **most punctual carriers**.
-    """)
-
-elif st.session_state.slide_2 == 3:
-    st.markdown("##### ✅ Most Punctual Airlines")
-    st.markdown("Which airlines are consistently on time?")
-
-    fig = airline_slide_3(airline_delay)
-    st.pyplot(fig)
-
-    st.markdown("""
-        Hawaiian, Alaska, and US Airways maintain low delay rates, possibly due to less congested routes, efficient ground operations, and favorable scheduling.
-    """)
-
-    st.markdown("""
-        To understand the **nature of these delays**, let's break them down by type — departure vs arrival.
-    """)
-
-elif st.session_state.slide_2 == 4:
-    st.markdown("##### 📊 Delay Breakdown by Type")
-    st.markdown("How do airlines perform across Departure vs Arrival delays (≥15 minutes)?")
-
-    fig = airline_slide_4(airline_delay)
-    st.pyplot(fig)  
-
-    st.markdown("""
-        Some airlines tend to struggle more with **arrival** delays than departures — or vice versa.
-        Understanding where delays accumulate helps identify bottlenecks (e.g. gate availability vs boarding logistics).
-    """)
-
-    st.markdown("""
-        Let's zoom in further and see how **the worst-performing airlines** stack up across these two delay types.
-    """) 
-
-elif st.session_state.slide_2 == 5:
-    st.markdown("##### 🟥 Delay Split: Most Delayed Airlines")
-    st.markdown("Do worst-performing airlines struggle more with departures or arrivals?")
-
-    fig = airline_slide_5(airline_delay)
-    st.pyplot(fig)
-
-    st.markdown("""
-        - **Frontier** and **AirTran** experience **disproportionately higher arrival delays**, which may point to issues like turnaround inefficiencies or destination airport constraints.
-        - **ExpressJet** and **Mesa** show more balanced but still elevated delays.
-    """)
-
-    st.markdown("""
-        Now, let’s flip the lens again and see how the **most punctual airlines manage both types** of delays.
-    """)
-
-elif st.session_state.slide_2 == 6:
-    st.markdown("##### 🟩 Delay Split: Most Punctual Airlines")
-    st.markdown("What kind of delays are most avoided by top performers?")
-
-    fig = airline_slide_6(airline_delay)
-    st.pyplot(fig)
-
-    st.markdown("""
-        - **Hawaiian Airlines** leads with the lowest departure delay rate (35%) and highest arrival delay rate (65%) among the top four.
-        - **US Airways** follows with a departure delay rate of 40% and arrival delay rate of 60%.
-        - **American** and **Alaska Airlines** maintain relatively balanced delay patterns, though their arrival delays still exceed 50%.
-    """)
-
-    st.markdown("""
-        In summary, while top airlines perform better overall, **arrival delays remain a common challenge** — even among the most punctual carriers.
-    """)
-
-    st.markdown("""
-        ###### ✅ Recommendations for Improvement:
-        - **Benchmark operational practices** of Hawaiian and US Airways, particularly in departure scheduling and turnaround management.
-        - **Investigate persistent arrival delays**, which could stem from external airport constraints or late inbound connections.
-        - **Implement strategies to smoothen arrivals**, such as buffer scheduling or early departure leeway for high-traffic routes.
-    """)
-
-    st.markdown("""  
-    **Airline performance tells part of the story — but geography plays a major role too.**  
-    Let’s explore which **airports** are driving the most delays at both **departure and arrival** ends.
-    """)
+        fig = airline_slide_1(airline_delay)
+        st.pyplot(fig)
+
+        st.write("""
+            There's a broad spread in total delay rates across carriers, which reveals major operational differences. Identifying top and bottom performers helps spotlight reliability gaps.
+        """)
+
+        st.write("""
+            Let's now focus on **who exactly are the worst offenders** when it comes to delays.
+        """)
+
+    elif st.session_state.slide_2 == 2:
+        st.markdown("##### 🚨 Most Delayed Airlines")
+        st.markdown("Which carriers have the highest delay rates?")
+
+        fig = airline_slide_2(airline_delay)
+        st.pyplot(fig)
+
+        st.markdown("""
+            Frontier, ExpressJet, AirTran and Mesa Airlines lead in delays, each with total delay rates above 60%. These patterns suggest persistent operational or route-specific issues.
+        """)
+
+        st.markdown("""
+            But while some airlines struggle, others excel — let's now highlight the **most punctual carriers**.
+        """)
+
+    elif st.session_state.slide_2 == 3:
+        st.markdown("##### ✅ Most Punctual Airlines")
+        st.markdown("Which airlines are consistently on time?")
+
+        fig = airline_slide_3(airline_delay)
+        st.pyplot(fig)
+
+        st.markdown("""
+            Hawaiian, Alaska, and US Airways maintain low delay rates, possibly due to less congested routes, efficient ground operations, and favorable scheduling.
+        """)
+
+        st.markdown("""
+            To understand the **nature of these delays**, let's break them down by type — departure vs arrival.
+        """)
+
+    elif st.session_state.slide_2 == 4:
+        st.markdown("##### 📊 Delay Breakdown by Type")
+        st.markdown("How do airlines perform across Departure vs Arrival delays (≥15 minutes)?")
+
+        fig = airline_slide_4(airline_delay)
+        st.pyplot(fig)  
+
+        st.markdown("""
+            Some airlines tend to struggle more with **arrival** delays than departures — or vice versa.
+            Understanding where delays accumulate helps identify bottlenecks (e.g. gate availability vs boarding logistics).
+        """)
+
+        st.markdown("""
+            Let's zoom in further and see how **the worst-performing airlines** stack up across these two delay types.
+        """) 
+
+    elif st.session_state.slide_2 == 5:
+        st.markdown("##### 🟥 Delay Split: Most Delayed Airlines")
+        st.markdown("Do worst-performing airlines struggle more with departures or arrivals?")
+
+        fig = airline_slide_5(airline_delay)
+        st.pyplot(fig)
+
+        st.markdown("""
+            - **Frontier** and **AirTran** experience **disproportionately higher arrival delays**, which may point to issues like turnaround inefficiencies or destination airport constraints.
+            - **ExpressJet** and **Mesa** show more balanced but still elevated delays.
+        """)
+
+        st.markdown("""
+            Now, let’s flip the lens again and see how the **most punctual airlines manage both types** of delays.
+        """)
+
+    elif st.session_state.slide_2 == 6:
+        st.markdown("##### 🟩 Delay Split: Most Punctual Airlines")
+        st.markdown("What kind of delays are most avoided by top performers?")
+
+        fig = airline_slide_6(airline_delay)
+        st.pyplot(fig)
+
+        st.markdown("""
+            - **Hawaiian Airlines** leads with the lowest departure delay rate (35%) and highest arrival delay rate (65%) among the top four.
+            - **US Airways** follows with a departure delay rate of 40% and arrival delay rate of 60%.
+            - **American** and **Alaska Airlines** maintain relatively balanced delay patterns, though their arrival delays still exceed 50%.
+        """)
+
+        st.markdown("""
+            In summary, while top airlines perform better overall, **arrival delays remain a common challenge** — even among the most punctual carriers.
+        """)
+
+        st.markdown("""
+            ###### ✅ Recommendations for Improvement:
+            - **Benchmark operational practices** of Hawaiian and US Airways, particularly in departure scheduling and turnaround management.
+            - **Investigate persistent arrival delays**, which could stem from external airport constraints or late inbound connections.
+            - **Implement strategies to smoothen arrivals**, such as buffer scheduling or early departure leeway for high-traffic routes.
+        """)
+
+        st.markdown("""  
+        **Airline performance tells part of the story — but geography plays a major role too.**  
+        Let’s explore which **airports** are driving the most delays at both **departure and arrival** ends.
+        """)
      
+    section_timer(section_start)
+
+airline_section(selection_key, preview)
+
 st.markdown("---")   
 
 # ------------ 3. Airport-Level Delays -------------
@@ -691,63 +1118,8 @@ st.markdown("""
 We analyzed both departure and arrival delays by airport to uncover which hubs tend to cause — or suffer — the most disruption.
 """)
 
-# ---- Origin Airport Delay Trends ----
-origin_airport_delay = (
-    flights_df.groupby(['origin']).agg({
-        'dep_delayed_15': 'mean',
-        'arr_delayed_15': 'mean',
-        'flight': 'count'
-    }).round(2).reset_index()
-)
-origin_airport_delay.columns = ['Airport', 'Departure Delay ≥15m', 'Arrival Delay ≥15m', 'Total Flights']
-origin_airport_delay.sort_values(by='Departure Delay ≥15m', ascending=False, inplace=True)
-
-# ------- Destination Airport Delay Trends -------
-dest_airport_delay = (
-    flights_df.groupby(['dest']).agg({
-        'dep_delayed_15': 'mean',
-        'arr_delayed_15': 'mean',
-        'flight': 'count'
-    }).round(2).reset_index()
-)
-dest_airport_delay.columns = ['Airport', 'Departure Delay ≥15m', 'Arrival Delay ≥15m', 'Total Flights']
-dest_airport_delay.sort_values(by='Departure Delay ≥15m', ascending=False, inplace=True)
-
-# Clusters
-dest_cluster_map = (
-    flights_df[['dest', 'dest_cluster']]
-    .drop_duplicates()
-    .set_index('dest')['dest_cluster']
-)
-
-dest_airport_delay['Cluster'] = dest_airport_delay['Airport'].map(dest_cluster_map)
-
-# Map clusters to intuitive short labels with explicit order
-cluster_map = {
-    4: "Very Low Delay, Low Traffic",
-    3: "Low Delay, Avg Traffic", 
-    1: "Low Delay, High Traffic",
-    0: "Moderate Delay, Low Traffic",
-    2: "High Delay, Low Traffic"
-}
-dest_airport_delay['Cluster Label'] = dest_airport_delay['Cluster'].map(cluster_map)
-
-# Define the desired order explicitly
-cluster_order = [
-    "Very Low Delay, Low Traffic",
-    "Low Delay, Avg Traffic",
-    "Low Delay, High Traffic",
-    "Moderate Delay, Low Traffic",
-    "High Delay, Low Traffic",
-]
-
-# Make 'Cluster Label' a categorical variable with order
-dest_airport_delay['Cluster Label'] = pd.Categorical(dest_airport_delay['Cluster Label'],
-                                                     categories=cluster_order,
-                                                     ordered=True)
-
 # -------- Slide 1: Origin Airport Delay Trends -------------
-def airport_slide_1(df):
+def airport_slide_1(origin_airport_delay):
     fig, ax = plt.subplots(figsize=(8, 3))
     # Departure bars
     ax.barh(
@@ -801,7 +1173,7 @@ def airport_slide_1(df):
     return fig
 
 # -------- Slide 2: Destination Airport Delay Trends -------------
-def airport_slide_2(df):
+def airport_slide_2(dest_airport_delay):
    
     fig = px.scatter(
     dest_airport_delay,
@@ -903,89 +1275,101 @@ def airport_slide_3(dest_airport_delay, cluster_order):
 
     return fig
 
-# --------- Navigation buttons
-col1c, _, col2c = st.columns([1, 6, 1])
-with col1c:
-    if st.button("◀️ Back", key="back_c") and st.session_state.slide_3 > 1:
-        st.session_state.slide_3 -= 1
-with col2c:
-    if st.button("Next ▶️", key="next_c") and st.session_state.slide_3 < 3:
-        st.session_state.slide_3 += 1
-
-if st.session_state.slide_3 == 1:
-    st.markdown("##### 🛫 Origin Airport Performance: How Do NYC Airports Stack Up?")
-    st.markdown("""
-    **Three busy airports, one big question — who handles delays best?**  
-    We looked at delay rates from EWR, JFK, and LGA to compare how often flights take off and land late.
-    """)
+# Reruns on its own when the slide buttons or the cluster selector are used
+@st.fragment
+def airport_section(selection_key, preview=False):
+    section_start = time.perf_counter()
+    origin_airport_delay, dest_airport_delay = airport_aggregates(selection_key, preview)
+    if preview:
+        preview_caption(selection_key, ['origin', 'dest'])
+
+    # --------- Navigation buttons
+    col1c, _, col2c = st.columns([1, 6, 1])
+    with col1c:
+        if st.button("◀️ Back", key="back_c") and st.session_state.slide_3 > 1:
+            st.session_state.slide_3 -= 1
+    with col2c:
+        if st.button("Next ▶️", key="next_c") and st.session_state.slide_3 < 3:
+            st.session_state.slide_3 += 1
+
+    if st.session_state.slide_3 == 1:
+        st.markdown("##### 🛫 Origin Airport Performance: How Do NYC Airports Stack Up?")
+        st.markdown("""
+        **Three busy airports, one big question — who handles delays best?**  
+        We looked at delay rates from EWR, JFK, and LGA to compare how often flights take off and land late.
+        """)
     
-    fig = airport_slide_1(origin_airport_delay)
-    st.pyplot(fig)
+        fig = airport_slide_1(origin_airport_delay)
+        st.pyplot(fig)
 
-    st.markdown("""
-    **What the data shows:**  
-    - **Newark (EWR)** tops the delay chart with 25% departure and 26% arrival delays out of 117k+ flights.  
-    - **John F. Kennedy (JFK)** follows with 21% departure and 24% arrival delays over 109k flights.  
-    - **LaGuardia (LGA)** is slightly better but still challenged — 19% departure and 23% arrival delays across 101k flights.
+        st.markdown("""
+        **What the data shows:**  
+        - **Newark (EWR)** tops the delay chart with 25% departure and 26% arrival delays out of 117k+ flights.  
+        - **John F. Kennedy (JFK)** follows with 21% departure and 24% arrival delays over 109k flights.  
+        - **LaGuardia (LGA)** is slightly better but still challenged — 19% departure and 23% arrival delays across 101k flights.
 
-    These airports operate in one of the most congested airspaces in the U.S., where weather, volume, and traffic control bottlenecks make delays a persistent issue.
+        These airports operate in one of the most congested airspaces in the U.S., where weather, volume, and traffic control bottlenecks make delays a persistent issue.
 
-    ✈️ **So what?**  
-    - For travelers: Expect delays when flying out of NYC — plan layovers with extra buffer time.  
-    - For airports: There’s room to improve ground operations and traffic coordination to ease schedule pressure.
+        ✈️ **So what?**  
+        - For travelers: Expect delays when flying out of NYC — plan layovers with extra buffer time.  
+        - For airports: There’s room to improve ground operations and traffic coordination to ease schedule pressure.
     
-    Let’s now explore where flights are headed — and how delays vary across **destination airports**.
-    """)
-
-elif st.session_state.slide_3 == 2:
-    st.markdown("##### 📍 Destination Airport Delays: Where Do Flights Land Late?")
-    st.markdown("""
-    **Destination airports tell a mixed story — some struggle, others shine.**  
-    We analyzed delays across 104 destination airports to spot patterns in arrival and departure timeliness.
-    """)
+        Let’s now explore where flights are headed — and how delays vary across **destination airports**.
+        """)
+
+    elif st.session_state.slide_3 == 2:
+        st.markdown("##### 📍 Destination Airport Delays: Where Do Flights Land Late?")
+        st.markdown("""
+        **Destination airports tell a mixed story — some struggle, others shine.**  
+        We analyzed delays across 104 destination airports to spot patterns in arrival and departure timeliness.
+        """)
     
-    fig = airport_slide_2(dest_airport_delay)
-    st.plotly_chart(fig)
+        fig = airport_slide_2(dest_airport_delay)
+        st.plotly_chart(fig)
 
-    st.markdown("""
-    **What the data shows:**  
-    - **High-delay regional airports** like Jackson Hole (50%+ delays, 21 flights) and South Bend (50%+, 10 flights) face major delay challenges.  
-    - **Major hubs** such as Atlanta (20% departure, 26% arrival delays) and Chicago O’Hare (23%, 24%) handle heavy traffic with fewer delays.  
-    - Some airports stand out for **exceptional punctuality**, like Salt Lake City and Seattle-Tacoma, despite varying flight volumes.
+        st.markdown("""
+        **What the data shows:**  
+        - **High-delay regional airports** like Jackson Hole (50%+ delays, 21 flights) and South Bend (50%+, 10 flights) face major delay challenges.  
+        - **Major hubs** such as Atlanta (20% departure, 26% arrival delays) and Chicago O’Hare (23%, 24%) handle heavy traffic with fewer delays.  
+        - Some airports stand out for **exceptional punctuality**, like Salt Lake City and Seattle-Tacoma, despite varying flight volumes.
 
-    ✈️ **So what?**  
-    - For passengers: Regional airports can be surprisingly delay-prone — check stats before booking connections.  
-    - For operators: Volume isn’t the only factor — infrastructure and planning play a huge role in performance.
+        ✈️ **So what?**  
+        - For passengers: Regional airports can be surprisingly delay-prone — check stats before booking connections.  
+        - For operators: Volume isn’t the only factor — infrastructure and planning play a huge role in performance.
 
-    With 100+ airports in the mix, patterns aren't always obvious.  
-    To dig deeper, we clustered destination airports based on their characteristics — and the results were telling.
-    """)  
+        With 100+ airports in the mix, patterns aren't always obvious.  
+        To dig deeper, we clustered destination airports based on their characteristics — and the results were telling.
+        """)  
 
-elif st.session_state.slide_3 == 3:
-    st.markdown("##### 🧭 Clustering Destination Airports: Who’s Efficient, and Who’s Struggling?")
-    st.markdown("""
-    **We grouped 104 destination airports based on departure delays, arrival delays, and flight volumes to reveal distinct operational profiles.**
+    elif st.session_state.slide_3 == 3:
+        st.markdown("##### 🧭 Clustering Destination Airports: Who’s Efficient, and Who’s Struggling?")
+        st.markdown("""
+        **We grouped 104 destination airports based on departure delays, arrival delays, and flight volumes to reveal distinct operational profiles.**
 
-    """)
+        """)
 
-    fig = airport_slide_3(dest_airport_delay, cluster_order)
-    st.plotly_chart(fig)
+        fig = airport_slide_3(dest_airport_delay, cluster_order)
+        st.plotly_chart(fig)
+
+        st.markdown("""
+        **What the data shows:**  
+        - **Cluster 4: Very low delay, low traffic airports** like Anchorage (ANC) and Palm Springs (PSP) operate with minimal delays.  
+        - **Cluster 1: Low delay, average traffic airports** such as Chicago O’Hare (ORD) and Fort Lauderdale (FLL) handle moderate traffic with strong efficiency.  
+        - **Cluster 3: Low delay, high traffic hubs** including Denver (DEN) and Seattle (SEA) manage heavy volumes with few delays.  
+        - **Cluster 0: Moderate delay, low traffic airports** like South Bend (SBN) and Birmingham (BHM) face emerging operational challenges.  
+        - **Cluster 2: High delay, low traffic airports** such as Jackson Hole (JAC) and Columbia (CAE) suffer severe delays despite low flight volumes.
+
+        ✈️ **So what?**  
+        - The least delayed airports often have low traffic but strong operational smoothness.  
+        - Busy hubs with good infrastructure keep delays down despite high volumes.  
+        - Smaller airports with moderate or high delays need targeted improvements to reduce disruptions.
 
-    st.markdown("""
-    **What the data shows:**  
-    - **Cluster 4: Very low delay, low traffic airports** like Anchorage (ANC) and Palm Springs (PSP) operate with minimal delays.  
-    - **Cluster 1: Low delay, average traffic airports** such as Chicago O’Hare (ORD) and Fort Lauderdale (FLL) handle moderate traffic with strong efficiency.  
-    - **Cluster 3: Low delay, high traffic hubs** including Denver (DEN) and Seattle (SEA) manage heavy volumes with few delays.  
-    - **Cluster 0: Moderate delay, low traffic airports** like South Bend (SBN) and Birmingham (BHM) face emerging operational challenges.  
-    - **Cluster 2: High delay, low traffic airports** such as Jackson Hole (JAC) and Columbia (CAE) suffer severe delays despite low flight volumes.
+        **Next up:** Let’s shift focus to the routes — uncover the problematic origin-dest pairs?
+        """)
 
-    ✈️ **So what?**  
-    - The least delayed airports often have low traffic but strong operational smoothness.  
-    - Busy hubs with good infrastructure keep delays down despite high volumes.  
-    - Smaller airports with moderate or high delays need targeted improvements to reduce disruptions.
+    section_timer(section_start)
 
-    **Next up:** Let’s shift focus to the routes — uncover the problematic origin-dest pairs?
-    """)
+airport_section(selection_key, preview)
 
 st.markdown("---")
 
@@ -999,68 +1383,26 @@ Let’s explore which origin-destination combinations are most impacted — and
 """)
 
 # Prepare data
-# Create Route column
-flights_df['route'] = flights_df['origin'] + ' - ' + flights_df['dest']
-
-# Route-level delay aggregation
-route_delay = (
-    flights_df.groupby('route').agg({
-        'dep_delayed_15': 'mean',     # proportion of flights delayed on departure
-        'arr_delayed_15': 'mean',     # proportion of flights delayed on arrival
-        'flight': 'count',
-        'dep_delay': 'mean',          # average delay in minutes
-        'arr_delay': 'mean'
-    }).round(2).reset_index()
-)
-
-# Rename columns for clarity
-route_delay.columns = [
-    'Route',
-    'Departure Delay ≥15m',
-    'Arrival Delay ≥15m',
-    'Total Flights',
-    'Avg Dep Delay',
-    'Avg Arr Delay'
-]
-
-# Calculate delay rate (mean of dep + arr delay proportions)
-route_delay['Delay Rate'] = ((route_delay['Departure Delay ≥15m'] + route_delay['Arrival Delay ≥15m']) / 2).round(2)
-
-# Compute delay score (delay rate * total avg delay)
-route_delay['Delay Score'] = (route_delay['Delay Rate'] * (route_delay['Avg Dep Delay'] + route_delay['Avg Arr Delay'])).round(2)
-
-# Airline-by-route level aggregation
-airline_routes = (
-    flights_df.groupby(['airline_name', 'route']).agg({
-        'dep_delayed_15': 'mean',
-        'arr_delayed_15': 'mean',
-        'flight': 'count',
-        'dep_delay': 'mean',
-        'arr_delay': 'mean'
-    }).round(2).reset_index()
-)
-
-# Rename columns
-airline_routes.columns = [
-    'Airline',
-    'Route',
-    'Departure Delay ≥15m',
-    'Arrival Delay ≥15m',
-    'Total Flights',
-    'Avg Dep Delay',
-    'Avg Arr Delay'
-]
+route_delay, airline_routes, route_options, overall_avg_delay = route_aggregates(selection_key, preview)
+if preview:
+    preview_caption(selection_key, ['route'])
 
-# Calculate delay rate
-airline_routes['Delay Rate'] = ((airline_routes['Departure Delay ≥15m'] + airline_routes['Arrival Delay ≥15m']) / 2).round(2)
 
-# Compute delay score
-airline_routes['Delay Score'] = (airline_routes['Delay Rate'] * (airline_routes['Avg Dep Delay'] + airline_routes['Avg Arr Delay'])).round(2)
+# ------ Bubble Plot
+bubble_start = time.perf_counter()
 
+# Past a few thousand routes, keep the busiest ones and bin the rest, and draw with WebGL
+bubble_points = reduce_scatter_points(
+    route_delay,
+    x="Departure Delay ≥15m",
+    y="Arrival Delay ≥15m",
+    size="Total Flights",
+    color="Delay Rate",
+    label="Route"
+)
 
-# ------ Bubble Plot
 fig = px.scatter(
-    route_delay,
+    bubble_points,
     x="Departure Delay ≥15m",
     y="Arrival Delay ≥15m",
     size="Total Flights",
@@ -1068,6 +1410,7 @@ fig = px.scatter(
     hover_name="Route",
     size_max=60,
     color_continuous_scale='RdBu_r',
+    render_mode='webgl' if len(route_delay) > WEBGL_THRESHOLD else 'svg',
     labels={
         'Departure Delay ≥15m': 'Departure Delay Rate',
         'Arrival Delay ≥15m': 'Arrival Delay Rate',
@@ -1101,122 +1444,242 @@ st.markdown("*The further to the top-right a bubble is, the more problematic the
 
 st.plotly_chart(fig)
 
-# ---- Heatmap
-# Split Route into Origin and Destination for heatmap axes
-route_delay[['Origin', 'Destination']] = route_delay['Route'].str.split('-', expand=True)
-
-# Create pivot table for heatmap
-heatmap_data = route_delay.pivot_table(
-    values='Delay Score',
-    index='Destination',
-    columns='Origin'
+bubble_payload = len(fig.to_json())
+st.caption(
+    f"{len(bubble_points):,} markers for {len(route_delay):,} routes "
+    f"({'WebGL' if len(route_delay) > WEBGL_THRESHOLD else 'SVG'}) · "
+    f"payload {bubble_payload / 1024:,.0f} KB · figure built and serialized on the server in "
+    f"{(time.perf_counter() - bubble_start) * 1000:.0f} ms (browser rendering not included)"
 )
 
-# Create heatmap
-fig = px.imshow(
-    heatmap_data,
-    color_continuous_scale='RdBu_r',
-    aspect='auto',
-    labels=dict(color="Delay Score"),
-)
+# ---- Heatmap
+# Reruns on its own when the window or page changes
+@st.fragment
+def route_heatmap_section(selection_key, preview=False):
+    section_start = time.perf_counter()
+    if preview:
+        st.info("The route heatmap appears with the exact results.")
+        return
+    route_matrix = load_route_matrix(selection_key)
+    n_heatmap_dests = int(np.count_nonzero(route_matrix['index'].getnnz(axis=1)))
+    if n_heatmap_dests < 2:
+        # Narrow filters can leave too few destinations for the slider (min must stay below max)
+        st.info("Too few destinations match these filters for a route heatmap.")
+        section_timer(section_start)
+        return
+
+    # Keep the heatmap to a window of destinations, ranked by traffic
+    heatmap_col1, heatmap_col2 = st.columns(2)
+    with heatmap_col1:
+        heatmap_rows = st.slider(
+            "Destinations shown (busiest first):",
+            min_value=min(10, n_heatmap_dests - 1),
+            max_value=n_heatmap_dests,
+            value=min(n_heatmap_dests, 120)
+        )
+    with heatmap_col2:
+        heatmap_page = st.number_input(
+            "Page:",
+            min_value=1,
+            max_value=max(1, int(np.ceil(n_heatmap_dests / heatmap_rows))),
+            value=1
+        )
+
+    heatmap_data = slice_route_matrix(
+        route_matrix,
+        value='Delay Score',
+        top_dest=heatmap_rows,
+        dest_offset=(heatmap_page - 1) * heatmap_rows,
+        top_origin=40
+    )
 
-fig.update_layout(
-    xaxis=dict(side='top'),
-    height=1000
-)
+    # Create heatmap
+    fig = px.imshow(
+        heatmap_data,
+        color_continuous_scale='RdBu_r',
+        aspect='auto',
+        labels=dict(color="Delay Score"),
+    )
 
-fig.update_xaxes(tickangle=0)  # Make destination labels horizontal
+    fig.update_layout(
+        xaxis=dict(side='top'),
+        height=max(400, 10 * len(heatmap_data))
+    )
 
-st.markdown("##### Route-Level Delay Heatmap (Delay Score)")
-st.markdown("*Scan across a column to see how one origin airport performs across destinations. Dark red squares mean consistent delays — the worst routes by delay behavior jump right out at you.*")
+    fig.update_xaxes(tickangle=0)  # Make destination labels horizontal
 
-st.plotly_chart(fig)
+    st.markdown("##### Route-Level Delay Heatmap (Delay Score)")
+    st.markdown("*Scan across a column to see how one origin airport performs across destinations. Dark red squares mean consistent delays — the worst routes by delay behavior jump right out at you.*")
 
-# ------ Airline Comparison on Selected Route ------
-st.markdown("##### Compare Airlines on Same Route")
-st.markdown("Even on the same route, your experience may vary widely depending on the airline.")
-
-route = st.selectbox("Choose a route:", flights_df["route"].unique())
-
-# Filter for selected route
-filtered = flights_df[flights_df['route'] == route]
-
-# Compute average delays per airline for this route
-airline_delay = (
-    filtered.groupby('airline_name').agg({
-        'dep_delayed_15': 'mean',
-        'arr_delayed_15': 'mean',
-        'flight': 'count'
-        })
-    .round(2)
-    .reset_index()
-)
+    st.plotly_chart(fig)
 
-# Rename columns for cleaner legend labels
-airline_delay = airline_delay.rename(columns={
-    'dep_delayed_15': 'Departure Delay ≥15m',
-    'arr_delayed_15': 'Arrival Delay ≥15m',
-     'flight': 'Total Flights'
-})
+    section_timer(section_start)
 
-airline_delay = airline_delay.sort_values('Total Flights', ascending=False)
+route_heatmap_section(selection_key, preview)
 
+# ------ Airline Comparison on Selected Route ------
+# Reruns on its own when another route is picked
+@st.fragment
+def route_comparison_section(selection_key, route_options, overall_avg_delay, preview=False):
+    section_start = time.perf_counter()
+
+    st.markdown("##### Compare Airlines on Same Route")
+    st.markdown("Even on the same route, your experience may vary widely depending on the airline.")
+
+    route = st.selectbox("Choose a route:", route_options)
+
+    # Average delays per airline for this route
+    airline_delay = route_airline_delay(selection_key, route, preview)
+
+    # Create grouped bar chart
+    fig = px.bar(
+        airline_delay,
+        y='airline_name',
+        x=['Departure Delay ≥15m', 'Arrival Delay ≥15m'],
+        orientation='h',
+        barmode='group',
+        title=f"Delays by Airline for Route {route}",
+        color_discrete_map={
+            'Departure Delay ≥15m': custom_palette[0], 
+            'Arrival Delay ≥15m': custom_palette[1]   
+        }
+    )
 
-# Calculate overall average delay for the route
-overall_avg_delay = flights_df[['dep_delayed_15', 'arr_delayed_15']].values.mean()
+    # Add vertical line
+    fig.add_vline(
+        x=overall_avg_delay,
+        line_dash="dash",
+        line_color="gray",
+        annotation_text="Overall Avg Delay ≥15m",
+        annotation_position="top",
+        annotation_font_size=12,
+        opacity=0.7
+    )
 
-# Create grouped bar chart
-fig = px.bar(
-    airline_delay,
-    y='airline_name',
-    x=['Departure Delay ≥15m', 'Arrival Delay ≥15m'],
-    orientation='h',
-    barmode='group',
-    title=f"Delays by Airline for Route {route}",
-    color_discrete_map={
-        'Departure Delay ≥15m': custom_palette[0], 
-        'Arrival Delay ≥15m': custom_palette[1]   
-    }
-)
+    # Format layout
+    fig.update_layout(
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        yaxis_title="Airline",
+        xaxis_title="Proportion of Delayed Flights",
+        xaxis=dict(tickformat=".0%", range=[0, 1]),
+        legend_title_text=None,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.05,
+            xanchor="right",
+            x=0.3
+        ),
+        height=500
+    )
 
-# Add vertical line
-fig.add_vline(
-    x=overall_avg_delay,
-    line_dash="dash",
-    line_color="gray",
-    annotation_text="Overall Avg Delay ≥15m",
-    annotation_position="top",
-    annotation_font_size=12,
-    opacity=0.7
-)
+    # Add custom hovertemplate including Total Flights
+    fig.update_traces(
+        hovertemplate=(
+            "<b>%{y}</b><br>Total Flights: %{customdata[0]}<br>Delay Rate: %{x:.0%}<extra></extra>"
+        ),
+        customdata=airline_delay[['Total Flights']].values
+    )
 
-# Format layout
-fig.update_layout(
-    plot_bgcolor='white',
-    paper_bgcolor='white',
-    yaxis_title="Airline",
-    xaxis_title="Proportion of Delayed Flights",
-    xaxis=dict(tickformat=".0%", range=[0, 1]),
-    legend_title_text=None,
-    legend=dict(
-        orientation="h",
-        yanchor="bottom",
-        y=1.05,
-        xanchor="right",
-        x=0.3
-    ),
-    height=500
-)
+    st.plotly_chart(fig)
 
-# Add custom hovertemplate including Total Flights
-fig.update_traces(
-    hovertemplate=(
-        "<b>%{y}</b><br>Total Flights: %{customdata[0]}<br>Delay Rate: %{x:.0%}<extra></extra>"
-    ),
-    customdata=airline_delay[['Total Flights']].values
-)
+    # Tail delays for the selected route (from full-data sketches, so not part of the preview)
+    if preview:
+        section_timer(section_start)
+        return
+    route_origin, route_dest = route.split(' - ')
+    route_tails = (
+        load_route_airline_tails(selection_key)
+        .xs((route_origin, route_dest), level=['origin', 'dest'])
+        .rename_axis('Airline')
+    )
 
-st.plotly_chart(fig)
+    st.markdown("*Averages hide the bad days. Typical (p50) and worst-case (p90, p99) delays in minutes for each airline on this route (month, airline and origin filters apply):*")
+    st.dataframe(route_tails)
+
+    section_timer(section_start)
+
+route_comparison_section(selection_key, route_options, overall_avg_delay, preview)
+
+# ------------ 5. What Drives Delays Overall? -------------
+# Small summaries precomputed by scripts/global_explanations.py
+@st.cache_data(show_spinner=False)
+def load_global_explanations(mtime):
+    return pd.read_csv(IMPORTANCE_PATH), pd.read_csv(DEPENDENCE_PATH)
+
+# Reruns on its own when the model, delay type or feature changes
+@st.fragment
+def global_explanations_section():
+    section_start = time.perf_counter()
+    st.markdown("---")
+    st.markdown("### 🧠 What Drives Delays Overall?")
+    st.markdown("*How much each feature moves the models' delay predictions across all flights (mean absolute SHAP value on a stratified sample). The filters above don't apply here.*")
+
+    importance, dependence = load_global_explanations(IMPORTANCE_PATH.stat().st_mtime)
+
+    model_labels = {'logreg': 'Logistic Regression', 'rf': 'Random Forest'}
+    output_labels = {'dep_delayed_15': 'Departure', 'arr_delayed_15': 'Arrival'}
+
+    explain_col1, explain_col2 = st.columns(2)
+    with explain_col1:
+        explain_model = st.radio(
+            "Model:",
+            [m for m in model_labels if m in set(importance['model'])],
+            format_func=model_labels.get,
+            horizontal=True
+        )
+    with explain_col2:
+        explain_output = st.radio("Delay type:", list(output_labels), format_func=output_labels.get, horizontal=True)
+
+    top_features = importance[
+        (importance['model'] == explain_model) & (importance['output'] == explain_output)
+    ].nlargest(15, 'mean_abs_shap')
+
+    fig = px.bar(
+        top_features.sort_values('mean_abs_shap'),
+        x='mean_abs_shap',
+        y='feature',
+        orientation='h',
+        color='mean_shap',
+        color_continuous_scale='RdBu_r',
+        color_continuous_midpoint=0,
+        labels={
+            'mean_abs_shap': 'Mean |SHAP|',
+            'feature': 'Feature',
+            'mean_shap': 'Mean SHAP'
+        }
+    )
+    fig.update_layout(plot_bgcolor='white', paper_bgcolor='white', height=500)
+    st.plotly_chart(fig)
+
+    # Dependence: average effect across the range of one feature
+    explain_feature = st.selectbox("See how one feature's value changes its effect:", top_features['feature'][::-1])
+    curve = dependence[
+        (dependence['model'] == explain_model)
+        & (dependence['output'] == explain_output)
+        & (dependence['feature'] == explain_feature)
+    ].sort_values('feature_value')
+
+    fig = px.line(
+        curve,
+        x='feature_value',
+        y='mean_shap',
+        markers=True,
+        hover_data={'rows': ':,'},
+        labels={
+            'feature_value': f'{explain_feature} (model input scale)',
+            'mean_shap': 'Mean SHAP',
+            'rows': 'Flights'
+        }
+    )
+    fig.add_hline(y=0, line_dash="dash", line_color="gray")
+    fig.update_layout(plot_bgcolor='white', paper_bgcolor='white', height=350)
+    st.plotly_chart(fig)
+    section_timer(section_start)
+
+if IMPORTANCE_PATH.exists() and DEPENDENCE_PATH.exists():
+    global_explanations_section()
 
 st.markdown("---")
 
@@ -1257,3 +1720,6 @@ Delays spike in **June–July** and **December**, driven by holidays and weather
 
 Flight delays follow clear patterns — they’re not just chance events. By understanding when, where, and why delays occur, both travelers and industry players can take proactive steps to minimize disruption and improve the flying experience.
 """)
+
+# Full-page runs only: interactions inside a section rerun just that section and report their own time
+st.caption(f"⏱️ Page rendered in {(time.perf_counter() - page_start) * 1000:.0f} ms")
@@ -1,10 +1,14 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import cloudpickle
 import os
-import plotly.graph_objects as go
-import shap
+import pandas as pd
+from utils.data import read_flights
+from utils.features import month_score_map, dow_score_map
+from utils.alternatives import find_best_alternatives, score_batch
+from utils.prediction import predict_and_explain, with_live_airline_delays
+from utils.prediction_cache import PredictionCache, normalize_flight_input
+from utils.live_delays import start_live_feed
+from utils.memory import start_memory_log, track
+from utils.warmup import get_artifact_reloader, start_warmup
 
 st.set_page_config(
     page_title="Flight Delay Prediction",
@@ -13,273 +17,64 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-st.title("🤖 PREDICT FLIGHT DELAY")
-st.write("Enter flight details below to predict if your flight will be delayed.")
+# Periodic memory log line (once per process; see the Diagnostics page)
+start_memory_log()
 
-# ------ Look up table data--------
-@st.cache_data(show_spinner=False)
-def load_lookups_from_drive():
-    airline_delay_file_id = "1ed2CeYXgwrWEc-aecGBfwRTBbR-Rkilu"
-    route_dist_file_id = "1T6rm_Y-t5a1WwMutJS7PpVwns95qjben" 
-    dest_cluster_file_id = "17DMA5-fWipMqQPGCNYD_cXIIuIphTB8Y"
-    route_cluster_file_id = "1H8I0YOC6zIIHARBIkumuxcVe0njoo04g"
+# Warm-up of the prediction path (once per process, started by whichever page runs first)
+warmup = start_warmup()
 
-    base_url = "https://drive.google.com/uc?id="
-
-    # Construct URLs
-    airline_url = f"{base_url}{airline_delay_file_id}"
-    route_url = f"{base_url}{route_dist_file_id}"
-    dest_cluster_url = f"{base_url}{dest_cluster_file_id}"
-    route_cluster_url = f"{base_url}{route_cluster_file_id}"
+st.title("🤖 PREDICT FLIGHT DELAY")
+st.write("Enter flight details below to predict if your flight will be delayed.")
 
-    # Read CSVs
-    airline_delay_lookup = pd.read_csv(airline_url)
-    route_dist_lookup = pd.read_csv(route_url)
-    dest_cluster_lookup = pd.read_csv(dest_cluster_url)
-    route_cluster_lookup = pd.read_csv(route_cluster_url)
+# ------ Model and look up tables --------
+# Built once per artifact version and warmed with a synthetic prediction before it is served;
+# new lookup CSVs or model versions are loaded in the background and swapped in without
+# clearing caches or restarting the app
+if not warmup.finished.is_set():
+    with st.spinner("Loading model and lookup tables..."):
+        warmup.wait()
 
-    return airline_delay_lookup, route_dist_lookup, dest_cluster_lookup, route_cluster_lookup
+# One snapshot per run: a submission that started before a swap finishes on the old version
+artifact_version, artifacts = get_artifact_reloader().snapshot()
 
 # Load all four lookup tables
-airline_delay_lookup, route_dist_lookup, dest_cluster_lookup, route_cluster_lookup = load_lookups_from_drive()   
-
-# ------- Mapping Functions
-def map_airline_delay_features(airline_name):
-    row = airline_delay_lookup[airline_delay_lookup['airline_name'] == airline_name]
-    return (
-        row.iloc[0]['airline_avg_arr_delay'] if not row.empty else 0,
-        row.iloc[0]['airline_avg_dep_delay'] if not row.empty else 0
-    )
-
-def map_route_dist(route):
-    row = route_dist_lookup[route_dist_lookup["route"] == route]
-    return(
-        row.iloc[0]['route_density'] if not row.empty else 0,
-        row.iloc[0]['dist_haul'] if not row.empty else 0,
-        row.iloc[0]['distance'] if not row.empty else 0
-    )
-
-def map_dest_cluster(dest):
-    row = dest_cluster_lookup[dest_cluster_lookup['dest'] == dest]
-    return row.iloc[0]['dest_cluster'] if not row.empty else 0
-
-def map_route_cluster(route):
-    row = route_cluster_lookup[route_cluster_lookup['route'] == route]
-    return row.iloc[0]['route_cluster'] if not row.empty else 0    
+airline_delay_lookup, route_dist_lookup, dest_cluster_lookup, route_cluster_lookup = artifacts["lookups"]
+
+# Lookups keyed for batch scoring (with the live airline delays when they are used)
+def load_lookup_index(predict_artifacts):
+    return predict_artifacts["lookup_index"]
+
+# Airlines operating each route, for the alternative flight search. Keyed by the artifact
+# version (the codebook isn't hashed), so the labels match the version being served
+@st.cache_data(show_spinner=False, max_entries=2)
+def load_route_airlines(version, _codebook):
+    flights, _ = read_flights(columns=["airline_name", "origin", "dest"])
+    # Group on the packed route id; "ORIGIN - DEST" strings are built once per route, not per flight
+    codebook = _codebook
+    route_ids = codebook.route_ids(flights["origin"], flights["dest"])
+    by_route = flights["airline_name"].groupby(route_ids).unique().apply(sorted)
+    return dict(zip(codebook.route_labels(by_route.index), by_route))
+
+def served_route_airlines():
+    return load_route_airlines(artifact_version, artifacts["codebook"])
 
-def get_time_block(dep_hour):
-    if 0 <= dep_hour < 6:
-        return "12am–6am"
-    elif 6 <= dep_hour < 9:
-        return "6am–9am"
-    elif 9 <= dep_hour < 12:
-        return "9am–12pm"
-    elif 12 <= dep_hour < 15:
-        return "12pm–3pm"
-    elif 15 <= dep_hour < 18:
-        return "3pm–6pm"
-    elif 18 <= dep_hour < 21:
-        return "6pm–9pm"
-    else:
-        return "9pm–12am"
-
-# Define mapping based on delay trend
-time_score_map = {
-    "12am–6am": 1, "6am–9am": 2, "9am–12pm": 3, "12pm–3pm": 4,
-    "3pm–6pm": 5, "6pm–9pm": 6, "9pm–12am": 7
-}
-
-month_score_map = {
-    'Sep': 1, 'Oct': 2, 'Nov': 3, 'Jan': 4, 'Feb': 5, 'Mar': 6, 'May': 7,
-    'Aug': 8, 'Apr': 9, 'Jun': 10, 'Jul': 11, 'Dec': 12
-}
-
-dow_score_map = {
-    'Thu': 1, 'Fri': 2, 'Mon': 3, 'Sun': 4,
-    'Sat': 5, 'Wed': 6, 'Tue': 7
-}        
-   
-# ------------ Preprocessing User's Input ----------
-# Cache pipeline loading for efficiency
-@st.cache_resource
 def load_pipeline():
-    pipeline_path = os.path.join(os.path.dirname(__file__), "..", "logreg_pipeline.pkl")
-    with open(pipeline_path, "rb") as f:
-        return cloudpickle.load(f)
-
-def preprocess_user_input(user_input_dict):
-    # Extract airline and route
-    airline = user_input_dict.pop("airline_name")
-    route = user_input_dict.pop("route")
-
-    # Split route into origin and destination
-    origin, dest = route.split(" - ")
-
-    # Map airline and route-level features
-    arr_avg, dep_avg = map_airline_delay_features(airline)
-    route_density, dist_haul, distance = map_route_dist(route)
-
-    # Map destination and route clusters
-    dest_cluster = map_dest_cluster(dest)
-    route_cluster = map_route_cluster(route)
-
-    # Derived feature: is_redeye
-    dep_hour = user_input_dict.get("dep_hour", 12)
-    is_redeye = int(dep_hour >= 22 or dep_hour <= 5)
-
-    # Time block → score
-    time_block = get_time_block(dep_hour)
-    time_block_score = time_score_map.get(time_block, 4)  
-
-    # Month & Day of Week scores
-    month = user_input_dict.get("month", "Jan")
-    day_of_week = user_input_dict.get("day_of_week", 'Mon')
-
-    month_score = month_score_map.get(month, 6)
-    dow_score = dow_score_map.get(day_of_week, 4)
-
-    # Add all new features
-    user_input_dict.update({
-        "origin": origin,
-        "dest": dest,
-        "dist_haul": dist_haul,
-        "airline_avg_arr_delay": arr_avg,
-        "airline_avg_dep_delay": dep_avg,
-        "route_density": route_density,
-        "dest_cluster": dest_cluster,         
-        "route_cluster": route_cluster,
-        "is_redeye": is_redeye,
-        "time_block_score": time_block_score,
-        "month_delay_score": month_score,
-        "dow_delay_score": dow_score,
-        "distance": distance
-    })
+    return artifacts["pipeline"]
 
-    # Convert to DataFrame
-    df = pd.DataFrame([user_input_dict])
-
-    return df
-
-def predict_with_pipeline(df):
-    pipeline = load_pipeline()
-    try:
-        predictions = pipeline.predict(df)
-        return predictions
-    except Exception as e:
-        st.error(f"Prediction error: {e}")
-        return None
-
-# ------ SHAP Values -------
-def get_shap_values(df_input, pipeline_path="logreg_pipeline.pkl"):
-    with open(pipeline_path, "rb") as f:
-        pipeline = cloudpickle.load(f)
-
-    preprocessor = pipeline.named_steps['preprocessor']
-    multi_clf = pipeline.named_steps['classifier']
-
-    # Transform input to numeric features
-    X_transformed = preprocessor.transform(df_input)
-
-    shap_values_dict = {}
-
-    # Explain each estimator inside MultiOutputClassifier
-    for i, estimator in enumerate(multi_clf.estimators_):
-        explainer = shap.LinearExplainer(estimator, X_transformed, feature_perturbation="interventional")
-        shap_values = explainer.shap_values(X_transformed)
-        shap_values_dict[i] = shap_values
-
-    # Get feature names after preprocessing (if possible)
-    try:
-        feature_names = []
-        for name, transformer, cols in preprocessor.transformers_:
-            if hasattr(transformer, 'get_feature_names_out'):
-                names = transformer.get_feature_names_out(cols)
-            else:
-                names = cols
-            feature_names.extend(names)
-    except Exception:
-        feature_names = [f"f{i}" for i in range(X_transformed.shape[1])]
-
-    return shap_values_dict, feature_names
-
-
-def generate_recommendations(shap_values_dict, feature_names, df_input, model_preds, threshold=0.01):
-    all_recommendations = {}
-
-    # Extract input values once
-    val_dep_hour = df_input["dep_hour"].values[0]
-    val_dist_haul = df_input["dist_haul"].values[0]
-    val_month = df_input["month_delay_score"].values[0]
-    val_day = df_input["dow_delay_score"].values[0]
-    val_airline_arr = df_input["airline_avg_arr_delay"].values[0]
-    val_airline_dep = df_input["airline_avg_dep_delay"].values[0]
-    val_route_density = df_input["route_density"].values[0]
-    val_is_redeye = df_input["is_redeye"].values[0]
-
-    feature_msgs = {
-        "dep_hour": (
-            f"Your flight's scheduled departure hour ({val_dep_hour}:00) makes it a candidate for delay.",
-            "Consider booking flights earlier or later to avoid peak delay times."
-        ),
-        "is_redeye": (
-            "Your flight is a red-eye flight, which tends to have a higher risk of delay." if val_is_redeye else "Your flight is not a red-eye flight, which usually helps avoid delays.",
-            "If possible, consider non-red-eye flights for better punctuality."
-        ),
-        "airline_avg_arr_delay": (
-            f"The airline you chose has an average arrival delay of {val_airline_arr:.1f} minutes historically.",
-            "Trying a different airline might reduce your delay risk."
-        ),
-        "airline_avg_dep_delay": (
-            f"The airline you chose has an average departure delay of {val_airline_dep:.1f} minutes historically.",
-            "Trying a different airline might reduce your delay risk."
-        ),
-        "route_density": (
-            f"This route has a traffic density score of {val_route_density}, indicating heavy traffic which can increase delay chances.",
-            "Flying on less busy routes could improve your chances of on-time flights."
-        ),
-        "month_delay_score": (
-            "This month tends to experience more delays historically.",
-            "If your travel is flexible, consider off-peak months."
-        ),
-        "dow_delay_score": (
-            "Flights on this day of the week tend to be more prone to delays.",
-            "Traveling on less busy days may reduce delay risk."
-        ),
-        "dist_haul": (
-            f"Your flight is classified as a '{val_dist_haul}' haul, which affects delay likelihood.",
-            "Sometimes shorter or longer haul flights have different risk patterns."
-        ),
-    }
-
-    for output_index, shap_values in shap_values_dict.items():
-        pred = model_preds[output_index]
-        shap_frame = pd.DataFrame({
-            'feature': feature_names,
-            'shap_value': shap_values[0]
-        })
+# ------ Prediction Cache -------
+# Shared by all sessions; bounded LRU keyed by the normalized flight input
+@st.cache_resource
+def get_prediction_cache():
+    return track("prediction cache", PredictionCache(maxsize=2048))
 
-        if pred == 1:
-            # Get feature with highest absolute SHAP value above threshold
-            top_feature = shap_frame.loc[
-                shap_frame['shap_value'].abs() > threshold
-            ].sort_values(by="shap_value", key=abs, ascending=False).head(1)
+def prediction_version():
+    # Changes whenever a new model artifact (or lookup set) is swapped in, which invalidates the cache
+    return artifact_version
 
-            if not top_feature.empty:
-                feat = top_feature.iloc[0]['feature']
-                if feat in feature_msgs:
-                    msg1, msg2 = feature_msgs[feat]
-                    all_recommendations[output_index] = [
-                        f"• {msg1}",
-                        f"  👉 {msg2}"
-                    ]
-                else:
-                    all_recommendations[output_index] = ["Delay risk identified, but no specific recommendation available."]
-            else:
-                all_recommendations[output_index] = ["Delay predicted, but no major risk factor stood out."]
-        else:
-            all_recommendations[output_index] = ["No major delay factors identified."]
-
-    return all_recommendations     
+# ------ Live flight status -------
+# Rolling delay rates per airline, origin and route from the flight status feed (once per process)
+live_feed = start_live_feed(artifacts["codebook"])
+live_windows = live_feed.windows
 
 # ------------ USER INPUT FORM -----------
 with st.form("flight_form"):
@@ -288,6 +83,11 @@ with st.form("flight_form"):
     month = st.selectbox("Month", list(month_score_map.keys()))
     day_of_week = st.selectbox("Day of Week", list(dow_score_map.keys()))
     dep_hour = st.number_input("Scheduled Departure Hour (0–23)", min_value=0, max_value=23, value=12)
+    use_live = st.checkbox(
+        "Use live delay conditions",
+        help="Replace the 2023 airline delay averages with the last "
+             f"{live_windows.window_seconds // 3600:g} hours of the flight status feed, where it has enough flights."
+    )
     #distance_group = st.selectbox("Distance", ["Short", "Medium", "Long"])
 
     submitted = st.form_submit_button("Predict Delay")
@@ -301,14 +101,111 @@ if submitted:
         #"dist_haul": distance_group
     }
 
-    df_input = preprocess_user_input(user_input)
+    # The prediction, route suggestions and alternatives below all score with these artifacts
+    predict_artifacts = with_live_airline_delays(artifacts, live_windows) if use_live else artifacts
 
     with st.spinner("Predicting delay, please wait..."):
-        prediction = predict_with_pipeline(df_input)  # e.g. [[1, 0]]
-
-    if prediction is not None:
+        if use_live:
+            # Live features change with every feed batch, so these predictions aren't cached
+            result = predict_and_explain(predict_artifacts, user_input, route_airlines=served_route_airlines(),
+                                         on_error=lambda e: st.error(f"Prediction error: {e}"))
+        else:
+            result = get_prediction_cache().get_or_compute(
+                normalize_flight_input(**user_input),
+                prediction_version(),
+                lambda: predict_and_explain(artifacts, user_input, route_airlines=served_route_airlines(),
+                                            on_error=lambda e: st.error(f"Prediction error: {e}"))
+            )
+
+    if result is not None:
+        df_input, prediction, recommendations = result
         pred_dep, pred_arr = prediction[0]  # unpack departure and arrival delay predictions
 
         st.markdown("### ✈️ Prediction Result")
         st.write(f"**Departure delay predicted:** {'🟥 Yes' if pred_dep == 1 else '🟩 No'}")
-        st.write(f"**Arrival delay predicted:** {'🟥 Yes' if pred_arr == 1 else '🟩 No'}")
\ No newline at end of file
+        st.write(f"**Arrival delay predicted:** {'🟥 Yes' if pred_arr == 1 else '🟩 No'}")
+
+        # ------ Live conditions ------
+        codebook = artifacts["codebook"]
+        origin, dest = route.split(" - ")
+        live_rows = {
+            f"Airline: {airline_name}": live_windows.current("airline", codebook.airline_ids([airline_name])[0]),
+            f"Origin: {origin}": live_windows.current("origin", codebook.airport_ids([origin])[0]),
+            f"Route: {route}": live_windows.current("route", codebook.route_ids([origin], [dest])[0]),
+        }
+        live_rows = {name: stats for name, stats in live_rows.items() if stats is not None}
+        if live_rows:
+            with st.expander(f"📡 Live conditions (last {live_windows.covered_seconds() / 3600:.1f} h of the feed)"):
+                st.dataframe(
+                    pd.DataFrame.from_dict(live_rows, orient="index").rename(columns={
+                        'departures': 'Departures',
+                        'dep_delay_rate': 'Departures Delayed',
+                        'avg_dep_delay': 'Avg Dep Delay (min)',
+                        'arrivals': 'Arrivals',
+                        'arr_delay_rate': 'Arrivals Delayed',
+                        'avg_arr_delay': 'Avg Arr Delay (min)'
+                    }).style.format({
+                        'Departures Delayed': '{:.0%}',
+                        'Avg Dep Delay (min)': '{:.1f}',
+                        'Arrivals Delayed': '{:.0%}',
+                        'Avg Arr Delay (min)': '{:.1f}'
+                    }, na_rep="–")
+                )
+
+        st.markdown("##### 💡 What's driving this?")
+        for output_index, label in enumerate(["Departure", "Arrival"]):
+            st.markdown(f"**{label}:**  \n" + "  \n".join(recommendations[output_index]))
+
+        # ------ Best Alternative Flights ------
+        route_airlines = served_route_airlines().get(route, [airline_name])
+        current_risk = score_batch(load_pipeline(), df_input).mean()
+
+        alternatives, search_ms = find_best_alternatives(
+            load_pipeline(), load_lookup_index(predict_artifacts), route, month, route_airlines, top_n=10
+        )
+
+        with st.expander("🔎 Lower-risk alternatives on this route"):
+            st.caption(
+                f"Scored {len(route_airlines) * 7 * 24:,} options "
+                f"({len(route_airlines)} airlines × 7 days × 24 hours) in {search_ms:.0f} ms. "
+                f"Your flight's delay risk: {current_risk:.0%}."
+            )
+
+            alternatives_view = alternatives.rename(columns={
+                'airline_name': 'Airline',
+                'day_of_week': 'Day',
+                'dep_hour': 'Departure Hour',
+                'dep_delay_proba': 'Departure Delay Risk',
+                'arr_delay_proba': 'Arrival Delay Risk',
+                'delay_risk': 'Delay Risk'
+            }).drop(columns=['route', 'month'])
+
+            st.dataframe(
+                alternatives_view.style.format({
+                    'Departure Delay Risk': '{:.0%}',
+                    'Arrival Delay Risk': '{:.0%}',
+                    'Delay Risk': '{:.0%}'
+                }),
+                hide_index=True
+            )
+
+# ------ Cache counters ------
+cache_stats = get_prediction_cache().stats()
+st.sidebar.caption(
+    f"Prediction cache: {cache_stats['hits']:,} hits · {cache_stats['misses']:,} misses · "
+    f"{cache_stats['evictions']:,} evictions · {cache_stats['size']:,}/{cache_stats['maxsize']:,} entries"
+)
+
+feed_stats = live_feed.stats()
+st.sidebar.caption(
+    f"Live feed: {feed_stats['events']:,} events ingested · {feed_stats['keys']['route']:,} routes"
+    + (f" · {feed_stats['lag_seconds']:,.0f}s behind" if feed_stats['lag_seconds'] is not None else " · waiting for events")
+    + (" · stopped, see Diagnostics" if live_feed.error else "")
+)
+
+reloader = get_artifact_reloader()
+st.sidebar.caption(
+    f"Model: {os.path.basename(artifact_version[0])} · {reloader.swaps} hot swaps · "
+    f"last build {reloader.last_build_seconds:.1f}s"
+    + (" · last reload failed, still serving the previous version" if reloader.last_error else "")
+)
@@ -0,0 +1 @@
+"""Helpers shared by the Streamlit pages and the offline scripts."""
@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+# Combined keys with more possible bins than this per row are compacted to the observed ones
+DENSE_BINS_PER_ROW = 4
+
+
+class Dimension:
+    """
+    A grouping key as one integer code per row, plus the label of each code.
+
+    Codes are what `np.bincount` accumulates on, so grouping never hashes or sorts the keys
+    themselves. Code order is label order, which is also the order pandas groupby returns.
+
+    Parameters:
+        codes (np.ndarray): Code per row in [0, n), -1 where the key is missing (row skipped).
+        n (int): Number of codes.
+        labels (callable): Codes → pd.Index of their labels.
+    """
+
+    def __init__(self, codes, n, labels):
+        self.codes = np.asarray(codes)
+        self.n = int(n)
+        self.labels = labels
+
+    @classmethod
+    def of(cls, series, categories=None):
+        """
+        A column as a dimension: categorical codes as they are; anything else is factorized
+        (sorted, like groupby). With `categories`, the column is first cast to that ordered
+        categorical, and values outside it are skipped.
+        """
+        if categories is not None:
+            series = series.astype(pd.CategoricalDtype(categories, ordered=True))
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            index = pd.CategoricalIndex(series.cat.categories, dtype=series.dtype, name=series.name)
+        else:
+            codes, uniques = pd.factorize(series, sort=True)
+            index = pd.Index(uniques, name=series.name)
+        return cls(codes, len(index), index.take)
+
+    @classmethod
+    def cross(cls, a, b):
+        """
+        The combination of two dimensions (labels: a MultiIndex of both), ordered by a then b.
+
+        The combined code is a * len(b) + b. When that range is much larger than the data
+        (e.g. airline × route), it is compacted to the observed combinations with np.unique.
+        """
+        valid = (a.codes >= 0) & (b.codes >= 0)
+        key = np.where(valid, a.codes.astype(np.int64) * b.n + b.codes, -1)
+
+        if a.n * b.n <= DENSE_BINS_PER_ROW * max(len(key), 1):
+            codes, n, combos = key, a.n * b.n, None
+        else:
+            combos, inverse = np.unique(key[valid], return_inverse=True)
+            codes = np.full(len(key), -1, dtype=np.int64)
+            codes[valid] = inverse
+            n = len(combos)
+
+        def labels(group_codes):
+            group_codes = np.asarray(group_codes)
+            combined = group_codes if combos is None else combos[group_codes]
+            parts = [a.labels(combined // b.n), b.labels(combined % b.n)]
+            levels = [part.get_level_values(i) for part in parts for i in range(part.nlevels)]
+            return pd.MultiIndex.from_arrays(levels)
+
+        return cls(codes, n, labels)
+
+
+class CodeAggregator:
+    """
+    Counts, sums and means of value columns over many dimensions, by vectorized bincount.
+
+    Codes and (NaN-zeroed) values are prepared once per dataset. A `totals` call then runs one
+    bincount per dimension and value column. Filtering is a row mask: excluded rows go to a
+    spill bin instead of being copied out, so a filter selection costs no more than the full data.
+
+    Sums of 0/1 flags and whole-minute delays are exact in float64, so means (sum / count) are
+    identical to pandas groupby's.
+
+    With `weights` (a weighted sample, see `utils.sampling`), sums and counts are weighted, so
+    they estimate the full data's totals and means are ratio estimates; totals then also carry
+    what `group_intervals` needs for confidence intervals.
+
+    Parameters:
+        dimensions (dict): name → `Dimension`, all over the same rows.
+        values (dict): column name → array of numbers (NaN is skipped, as pandas does).
+        weights (np.ndarray, optional): Weight of each row (inverse inclusion probability).
+    """
+
+    def __init__(self, dimensions, values, weights=None):
+        self.dimensions = dimensions
+        self.value_cols = list(values)
+        self.weighted = weights is not None
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float)
+
+        # Per-row weights of every accumulated column; '_n' only where values can be missing
+        self.sums = {}
+        for col, array in values.items():
+            array = np.asarray(array, dtype=float)
+            valid = ~np.isnan(array)
+            array = np.where(valid, array, 0.0)
+            if weights is None:
+                self.sums[col] = array
+                if not valid.all():
+                    self.sums[f"{col}_n"] = valid.astype(float)
+            else:
+                self.sums[col] = weights * array
+                self.sums[f"{col}_n"] = weights * valid
+                self.sums[f"{col}_sq"] = weights * array * array
+        if weights is not None:
+            self.sums["weight"] = weights
+            self.sums["weight_sq"] = weights * weights
+
+    def totals(self, mask=None, keep_empty=()):
+        """
+        Per-group totals for every dimension.
+
+        Parameters:
+            mask (np.ndarray, optional): Rows to include (e.g. `BitmapIndex.query`); None = all.
+            keep_empty (iterable): Dimensions that keep groups without rows (like observed=False).
+
+        Returns:
+            dict: Dimension name → pd.DataFrame indexed by group label, with 'rows' (group size)
+                  and, per value column, its sum (`col`) and non-missing count (`col`_n).
+                  Weighted: those are estimates, 'rows' counts sampled rows, and 'weight',
+                  'weight_sq' and `col`_sq are added.
+        """
+        excluded = None if mask is None else ~np.asarray(mask, dtype=bool)
+        results = {}
+        for name, dim in self.dimensions.items():
+            skip = dim.codes < 0 if excluded is None else (dim.codes < 0) | excluded
+            codes = np.where(skip, dim.n, dim.codes)
+
+            def count(weights=None):
+                return np.bincount(codes, weights=weights, minlength=dim.n + 1)[:-1]
+
+            rows = count()
+            table = {"rows": rows}
+            for key, weights in self.sums.items():
+                table[key] = count(weights)
+            if not self.weighted:
+                for col in self.value_cols:
+                    table[f"{col}_n"] = table[f"{col}_n"].astype(np.int64) if f"{col}_n" in table else rows
+
+            group_codes = np.arange(dim.n) if name in keep_empty else np.flatnonzero(rows)
+            results[name] = pd.DataFrame({key: column[group_codes] for key, column in table.items()},
+                                         index=dim.labels(group_codes))
+        return results
+
+    def nbytes(self):
+        return (sum(dim.codes.nbytes for dim in self.dimensions.values())
+                + sum(weights.nbytes for weights in self.sums.values()))
+
+
+def group_means(totals, cols):
+    """Mean of each value column per group (NaN for empty groups), from `CodeAggregator.totals` output."""
+    return pd.DataFrame({col: totals[col] / totals[f"{col}_n"] for col in cols}, index=totals.index)
+
+
+def group_intervals(totals, cols, z=1.96):
+    """
+    Half-widths of approximate confidence intervals (95% by default) for the weighted means.
+
+    Uses the weighted variance within each group, Kish's effective sample size
+    (sum(w)^2 / sum(w^2)) and a finite-population correction, so a group whose rows were all
+    sampled has zero width.
+
+    Parameters:
+        totals (pd.DataFrame): Weighted `CodeAggregator.totals` output for one dimension.
+        cols (list): Value columns.
+
+    Returns:
+        pd.DataFrame: Half-width per group and column (NaN for empty groups).
+    """
+    n_eff = totals["weight"] ** 2 / totals["weight_sq"]
+    sampled_fraction = (totals["rows"] / totals["weight"]).clip(upper=1)
+    half_widths = {}
+    for col in cols:
+        mean = totals[col] / totals[f"{col}_n"]
+        variance = (totals[f"{col}_sq"] / totals[f"{col}_n"] - mean ** 2).clip(lower=0)
+        half_widths[col] = z * np.sqrt(variance / n_eff * (1 - sampled_fraction))
+    return pd.DataFrame(half_widths, index=totals.index)
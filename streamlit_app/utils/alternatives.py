@@ -0,0 +1,100 @@
+import time
+import numpy as np
+import pandas as pd
+
+from utils.features import build_feature_frame, dow_score_map
+
+
+def build_alternative_grid(route, month, airlines):
+    """
+    Builds every airline × day of week × departure hour option for one route in one month.
+
+    Parameters:
+        route (str): Route as "ORIGIN - DEST".
+        month (str): 3-letter month of travel (kept fixed).
+        airlines (iterable): Airlines that fly the route.
+
+    Returns:
+        pd.DataFrame: Raw flight inputs, one row per alternative.
+    """
+    airlines = np.asarray(list(airlines), dtype=object)
+    days = np.asarray(list(dow_score_map.keys()), dtype=object)
+    hours = np.arange(24)
+
+    airline_idx, day_idx, hour_idx = np.meshgrid(
+        np.arange(len(airlines)), np.arange(len(days)), hours, indexing="ij"
+    )
+
+    return pd.DataFrame({
+        "airline_name": airlines[airline_idx.ravel()],
+        "route": route,
+        "month": month,
+        "day_of_week": days[day_idx.ravel()],
+        "dep_hour": hour_idx.ravel(),
+    })
+
+
+def score_batch(pipeline, features):
+    """
+    Scores a feature frame with one call per output estimator.
+
+    Returns:
+        np.ndarray: Shape (n_rows, 2) with P(departure delay ≥15m) and P(arrival delay ≥15m).
+    """
+    probas = pipeline.predict_proba(features)
+    return np.column_stack([p[:, 1] for p in probas])
+
+
+def unknown_categories(pipeline, features):
+    """
+    Per row, the one-hot inputs the fitted pipeline has never seen, e.g. "origin=ORD".
+
+    One-hot encoders fitted with handle_unknown='error' (the notebook's) raise on such values,
+    so these rows can't be scored; callers split them out first.
+
+    Returns:
+        np.ndarray: Object array, '' for rows the pipeline can score.
+    """
+    reasons = np.full(len(features), '', dtype=object)
+    for _, transformer, cols in pipeline.named_steps['preprocessor'].transformers_:
+        if getattr(transformer, 'handle_unknown', None) != 'error' or not hasattr(transformer, 'categories_'):
+            continue
+        for col, categories in zip(cols, transformer.categories_):
+            values = features[col].to_numpy()
+            unseen = ~pd.Series(values).isin(categories).to_numpy()
+            for i in np.flatnonzero(unseen):
+                reasons[i] = f"{reasons[i]}; {col}={values[i]}" if reasons[i] else f"{col}={values[i]}"
+    return reasons
+
+
+def find_best_alternatives(pipeline, lookups, route, month, airlines, top_n=10):
+    """
+    What-if search: scores every alternative departure on a route in a single batch and ranks them by risk.
+
+    Delay risk is the mean of the departure and arrival delay probabilities.
+
+    Parameters:
+        pipeline: Fitted preprocessing + MultiOutputClassifier pipeline.
+        lookups (dict): Output of `utils.features.index_lookups`.
+        route (str): Route as "ORIGIN - DEST".
+        month (str): 3-letter month of travel.
+        airlines (iterable): Airlines that fly the route.
+        top_n (int): Number of options to return.
+
+    Returns:
+        ranked (pd.DataFrame): Lowest-risk options, best first.
+        elapsed_ms (float): End-to-end latency of the search.
+    """
+    start = time.perf_counter()
+
+    grid = build_alternative_grid(route, month, airlines)
+    proba = score_batch(pipeline, build_feature_frame(grid, lookups))
+
+    grid["dep_delay_proba"] = proba[:, 0]
+    grid["arr_delay_proba"] = proba[:, 1]
+    grid["delay_risk"] = proba.mean(axis=1)
+
+    ranked = grid.nsmallest(top_n, "delay_risk").reset_index(drop=True)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return ranked, elapsed_ms
@@ -0,0 +1,77 @@
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+import cloudpickle
+
+APP_DIR = Path(__file__).resolve().parents[1]
+MODELS_DIR = APP_DIR / "models"
+MANIFEST_PATH = MODELS_DIR / "manifest.json"
+
+
+def _read_manifest():
+    if not MANIFEST_PATH.exists():
+        return {}
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+
+def _atomic_write(path, write):
+    # Write next to the target, then rename, so readers never see a half-written file
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def latest_model_path(name="logreg_pipeline"):
+    """
+    Path of the newest versioned artifact for `name`.
+
+    Falls back to the pickle bundled with the app (e.g. `streamlit_app/logreg_pipeline.pkl`)
+    when no version has been registered.
+    """
+    entry = _read_manifest().get(name)
+    if entry:
+        path = MODELS_DIR / entry["file"]
+        if path.exists():
+            return path
+    return APP_DIR / f"{name}.pkl"
+
+
+def load_model(path):
+    with open(path, "rb") as f:
+        return cloudpickle.load(f)
+
+
+def save_versioned_model(model, name="logreg_pipeline", metadata=None):
+    """
+    Pickles `model` as the next version of `name` and points the manifest at it.
+
+    Parameters:
+        model: Fitted pipeline or estimator.
+        name (str): Artifact name, e.g. 'logreg_pipeline'.
+        metadata (dict, optional): Extra JSON-serializable details (metrics, data months, ...).
+
+    Returns:
+        Path: Location of the new artifact.
+    """
+    MODELS_DIR.mkdir(exist_ok=True)
+    manifest = _read_manifest()
+    version = manifest.get(name, {}).get("version", 0) + 1
+
+    path = MODELS_DIR / f"{name}_v{version}.pkl"
+    _atomic_write(path, lambda f: cloudpickle.dump(model, f))
+
+    manifest[name] = {
+        "version": version,
+        "file": path.name,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **(metadata or {}),
+    }
+    _atomic_write(MANIFEST_PATH, lambda f: f.write(json.dumps(manifest, indent=2).encode()))
+
+    return path
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+# Above this many points, scatter charts switch from SVG to WebGL markers
+WEBGL_THRESHOLD = 1_000
+
+# Points kept individually; the rest are folded into grid cells of BIN_SIZE × BIN_SIZE
+MAX_POINTS = 2_000
+BIN_SIZE = 0.02
+
+
+def reduce_scatter_points(df, x, y, size, color, label, max_points=MAX_POINTS, bin_size=BIN_SIZE,
+                          bin_label="{:,} smaller routes (per-route average)"):
+    """
+    Caps the number of markers sent to the browser for a bubble chart.
+
+    The `max_points` largest points (by `size`) are kept as they are. The remaining ones are
+    binned on an (x, y) grid: each non-empty cell becomes one marker at the cell centre, sized
+    by the mean `size` of its points (a typical member, so a cell of many small routes isn't
+    drawn larger than the kept ones) and coloured by the size-weighted mean `color`. The payload is bounded
+    by max_points + (range / bin_size)² markers, whatever the number of input rows.
+
+    Parameters:
+        df (pd.DataFrame): One row per point.
+        x, y, size, color (str): Column names used by the chart.
+        label (str): Hover label column; binned markers are labelled with `bin_label`.
+
+    Returns:
+        pd.DataFrame: Points to plot, with the same columns used by the chart.
+    """
+    if len(df) <= max_points:
+        return df
+
+    kept = df.nlargest(max_points, size)
+    rest = df.drop(kept.index)
+
+    cells = rest.assign(
+        _x=np.floor(rest[x] / bin_size),
+        _y=np.floor(rest[y] / bin_size),
+        _weighted=rest[color] * rest[size],
+    ).groupby(['_x', '_y'])
+    binned = cells.agg(**{
+        '_total': (size, 'sum'),
+        '_weighted': ('_weighted', 'sum'),
+        '_count': (label, 'count'),
+    }).reset_index()
+
+    binned[x] = ((binned['_x'] + 0.5) * bin_size).round(3)
+    binned[y] = ((binned['_y'] + 0.5) * bin_size).round(3)
+    binned[size] = (binned['_total'] / binned['_count']).round(1)
+    binned[color] = (binned['_weighted'] / binned['_total'].where(binned['_total'] > 0)).fillna(0).round(2)
+    binned[label] = binned['_count'].map(bin_label.format)
+
+    return pd.concat([kept[[label, x, y, size, color]], binned[[label, x, y, size, color]]], ignore_index=True)
@@ -0,0 +1,189 @@
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.data import LOOKUPS_DIR
+
+# The notebook's KMeans inputs for destination airports and routes
+CLUSTER_FEATURES = ['Departure Delay ≥15m', 'Arrival Delay ≥15m', 'Total Flights']
+CENTROIDS_PATH = LOOKUPS_DIR / "cluster_centroids.json"
+
+
+def cluster_stats(flights_df, key):
+    """
+    Delay rates and traffic per destination ('dest') or route ('route'), as fed to the notebook's KMeans.
+
+    Returns:
+        pd.DataFrame: Indexed by `key`, columns CLUSTER_FEATURES.
+    """
+    if key == 'route' and 'route' not in flights_df.columns:
+        flights_df = flights_df.assign(route=flights_df['origin'] + ' - ' + flights_df['dest'])
+    grouped = flights_df.groupby(key)
+    return pd.DataFrame({
+        'Departure Delay ≥15m': grouped['dep_delayed_15'].mean().round(2),
+        'Arrival Delay ≥15m': grouped['arr_delayed_15'].mean().round(2),
+        'Total Flights': grouped.size(),
+    })
+
+
+class NearestCentroid:
+    """
+    Standardize-then-nearest-centroid assignment, i.e. KMeans.predict without the KMeans object.
+
+    Parameters:
+        mean, scale (array): StandardScaler statistics per feature.
+        centroids (array): (k, n_features) centroids in scaled space.
+        labels (array): Cluster label of each centroid row.
+    """
+
+    def __init__(self, mean, scale, centroids, labels):
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.centroids = np.asarray(centroids, dtype=float)
+        self.labels = np.asarray(labels)
+
+    @classmethod
+    def fit(cls, stats, labels):
+        """
+        Rebuilds the scaler and centroids from the keys the notebook already clustered.
+
+        A converged KMeans centroid is the mean of its members, so the centroids are the
+        per-label means of the standardized stats, and existing labels keep their numbering.
+        """
+        X = stats[CLUSTER_FEATURES].to_numpy(dtype=float)
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        scaled = pd.DataFrame((X - mean) / scale, index=stats.index)
+        centroids = scaled.groupby(np.asarray(labels)).mean()
+        return cls(mean, scale, centroids.to_numpy(), centroids.index.to_numpy())
+
+    def predict(self, X):
+        """Label of the nearest centroid for each row of X (n, n_features)."""
+        scaled = (np.asarray(X, dtype=float) - self.mean) / self.scale
+        distances = ((scaled[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return self.labels[distances.argmin(axis=1)]
+
+    def to_dict(self):
+        return {
+            "features": CLUSTER_FEATURES,
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "centroids": self.centroids.tolist(),
+            "labels": self.labels.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["mean"], data["scale"], data["centroids"], data["labels"])
+
+
+def save_cluster_models(models, path=CENTROIDS_PATH):
+    path.parent.mkdir(exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({key: model.to_dict() for key, model in models.items()}, f, indent=2)
+
+
+def load_cluster_models(path=CENTROIDS_PATH):
+    """Persisted {'dest': NearestCentroid, 'route': NearestCentroid}, or None if not exported."""
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return {key: NearestCentroid.from_dict(data) for key, data in json.load(f).items()}
+
+
+class ClusterAssigner:
+    """
+    Cluster for a destination or route: the lookup value when known, else the nearest centroid.
+
+    Unseen keys are placed from their current delay and traffic stats; keys with no flights at
+    all get the overall delay rates and zero traffic. Assignments are cached, so each new key
+    is computed once.
+
+    Parameters:
+        lookup (pd.Series): Known key → cluster.
+        model (NearestCentroid): Fitted scaler + centroids.
+        stats (pd.DataFrame): Current `cluster_stats` for the same key.
+    """
+
+    def __init__(self, lookup, model, stats):
+        self.lookup = lookup
+        self.model = model
+        self.stats = stats
+        self.default_stats = [stats[CLUSTER_FEATURES[0]].mean(), stats[CLUSTER_FEATURES[1]].mean(), 0]
+        self._assigned = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Picklable for process pools; the lock is recreated on the other side
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def assign(self, keys):
+        """Clusters for an array of keys, with one vectorized centroid lookup for the unseen ones."""
+        keys = np.asarray(keys, dtype=object)
+        clusters = self.lookup.reindex(keys)
+        unknown = clusters.isna().to_numpy()
+        if not unknown.any():
+            return clusters.astype(int).to_numpy()
+
+        missing = [key for key in pd.unique(keys[unknown]) if key not in self._assigned]
+        if missing:
+            X = self.stats.reindex(missing)[CLUSTER_FEATURES].fillna(
+                dict(zip(CLUSTER_FEATURES, self.default_stats))
+            )
+            with self._lock:
+                self._assigned.update(zip(missing, self.model.predict(X.to_numpy()).tolist()))
+
+        clusters[unknown] = [self._assigned[key] for key in keys[unknown]]
+        return clusters.astype(int).to_numpy()
+
+    def __call__(self, key):
+        return int(self.assign([key])[0])
+
+
+def _keyed_lookups(dest_cluster_lookup, route_cluster_lookup):
+    return {
+        'dest': dest_cluster_lookup.drop_duplicates('dest').set_index('dest')['dest_cluster'],
+        'route': route_cluster_lookup.drop_duplicates('route').set_index('route')['route_cluster'],
+    }
+
+
+def fit_cluster_models(stats, dest_cluster_lookup, route_cluster_lookup):
+    """
+    NearestCentroid models for 'dest' and 'route' from the keys already in the lookups.
+
+    Parameters:
+        stats (dict): 'dest' and 'route' → `cluster_stats` output.
+    """
+    models = {}
+    for key, lookup in _keyed_lookups(dest_cluster_lookup, route_cluster_lookup).items():
+        known = stats[key].index.intersection(lookup.index)
+        models[key] = NearestCentroid.fit(stats[key].loc[known], lookup.loc[known])
+    return models
+
+
+def make_cluster_assigners(stats, dest_cluster_lookup, route_cluster_lookup, models=None):
+    """
+    Assigners for dest and route clusters, using the persisted centroids when available.
+
+    Parameters:
+        stats (dict): 'dest' and 'route' → `cluster_stats` output, e.g. the exported
+                      'dest_stats' / 'route_stats' from `utils.flight_summaries`.
+
+    Returns:
+        dict: 'dest_assigner' and 'route_assigner', ready to add to `index_lookups` output.
+    """
+    if models is None:
+        models = load_cluster_models() or fit_cluster_models(stats, dest_cluster_lookup, route_cluster_lookup)
+    return {
+        f"{key}_assigner": ClusterAssigner(lookup, models[key], stats[key])
+        for key, lookup in _keyed_lookups(dest_cluster_lookup, route_cluster_lookup).items()
+    }
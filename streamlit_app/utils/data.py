@@ -0,0 +1,105 @@
+import os
+from pathlib import Path
+
+import gdown
+import pandas as pd
+
+# Cleaned flights dataset (see data/README.md)
+FLIGHT_DATA_URL = "https://drive.google.com/uc?id=1-2YlSUqC4XE_DIOanrZabDWHTm1j_FSp"
+FLIGHT_DATA_PATH = "flight_data.csv"
+
+# Optional Parquet copy partitioned by year/month/origin (scripts/build_dataset_store.py)
+DATASET_STORE_PATH = "flight_data_store"
+
+# Stratified sample of the store with its weights, read by the EDA preview (same script)
+PREVIEW_SAMPLE_PATH = "flight_data_preview.parquet"
+
+# Lookup tables used to map user input to model features
+LOOKUP_BASE_URL = "https://drive.google.com/uc?id="
+LOOKUP_FILE_IDS = {
+    "airline_delay": "1ed2CeYXgwrWEc-aecGBfwRTBbR-Rkilu",
+    "route_dist": "1T6rm_Y-t5a1WwMutJS7PpVwns95qjben",
+    "dest_cluster": "17DMA5-fWipMqQPGCNYD_cXIIuIphTB8Y",
+    "route_cluster": "1H8I0YOC6zIIHARBIkumuxcVe0njoo04g",
+}
+LOOKUP_NAMES = ["airline_delay", "route_dist", "dest_cluster", "route_cluster"]
+
+# Locally exported lookups ({name}.csv) take precedence over the Drive copies
+LOOKUPS_DIR = Path(__file__).resolve().parents[1] / "lookups"
+
+
+def ensure_flight_data(output=FLIGHT_DATA_PATH):
+    """
+    Downloads the cleaned flights CSV once and returns its local path.
+
+    Parameters:
+        output (str): Where the CSV is stored locally.
+
+    Returns:
+        str: Path to the local CSV.
+    """
+    if not os.path.exists(output):
+        gdown.download(FLIGHT_DATA_URL, output, quiet=True)
+    return output
+
+
+def read_flights(columns=None, filters=None, source=None):
+    """
+    Loads the cleaned flights, from the partitioned store when one exists, else from the CSV.
+
+    Parameters:
+        columns (list, optional): Columns to load. None loads everything.
+        filters (dict, optional): column → value or list of values. On the store, filters on
+            year/month/origin skip whole partitions.
+        source (str, optional): Store directory or CSV path. Defaults to the local store if it
+            has been built, otherwise the (downloaded) CSV.
+
+    Returns:
+        df (pd.DataFrame): Matching rows, in date order when 'date' is loaded.
+        stats (QueryStats or None): Partitions and bytes scanned (None for the CSV).
+    """
+    if source is None:
+        source = DATASET_STORE_PATH if os.path.isdir(DATASET_STORE_PATH) else ensure_flight_data()
+
+    if os.path.isdir(source):
+        from utils.dataset_store import query_store
+        df, stats = query_store(source, columns=columns, filters=filters)
+        if 'date' in df.columns:
+            # Partitions come back grouped by origin; restore the time order the splits rely on
+            df = df.sort_values('date', kind='stable', ignore_index=True)
+        return df, stats
+
+    df = pd.read_csv(source, usecols=columns)
+    for col, values in (filters or {}).items():
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        df = df[df[col].isin(list(values))]
+    return df.reset_index(drop=True), None
+
+
+def _lookup_source(name):
+    local_path = LOOKUPS_DIR / f"{name}.csv"
+    return local_path if local_path.exists() else f"{LOOKUP_BASE_URL}{LOOKUP_FILE_IDS[name]}"
+
+
+def lookup_fingerprint():
+    """
+    Cheap version stamp of the lookup sources: (name, mtime) of each local CSV, or the Drive id.
+
+    Changes whenever a lookup CSV is (re)exported to `streamlit_app/lookups/`.
+    """
+    stamps = []
+    for name in LOOKUP_NAMES:
+        source = _lookup_source(name)
+        stamps.append((name, os.path.getmtime(source) if isinstance(source, Path) else LOOKUP_FILE_IDS[name]))
+    return tuple(stamps)
+
+
+def load_lookups():
+    """
+    Reads the four lookup tables, from `streamlit_app/lookups/` when exported locally, else from Google Drive.
+
+    Returns:
+        tuple: airline_delay_lookup, route_dist_lookup, dest_cluster_lookup, route_cluster_lookup
+    """
+    return tuple(pd.read_csv(_lookup_source(name)) for name in LOOKUP_NAMES)
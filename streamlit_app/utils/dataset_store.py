@@ -0,0 +1,112 @@
+import os
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+# Directory layout: year=2023/month=Jan/origin=EWR/part-0.parquet
+PARTITION_COLS = ['year', 'month', 'origin']
+PARTITION_SCHEMA = pa.schema([('year', pa.int32()), ('month', pa.string()), ('origin', pa.string())])
+
+
+@dataclass
+class QueryStats:
+    """I/O for one store query: partitions and bytes actually scanned."""
+    files_scanned: int
+    files_total: int
+    bytes_scanned: int
+    rows: int
+    seconds: float
+
+    def __str__(self):
+        return (f"{self.files_scanned}/{self.files_total} partitions, "
+                f"{self.bytes_scanned / 1e6:.1f} MB read, {self.rows:,} rows in {self.seconds * 1000:.0f} ms")
+
+
+def write_store(df, root, row_group_size=250_000):
+    """
+    Writes the cleaned flights as a Parquet dataset partitioned by year, month and origin.
+
+    Parameters:
+        df (pd.DataFrame): Cleaned flights; needs 'date' (or 'year'), 'month' and 'origin'.
+        root (str): Output directory. Existing partitions with the same keys are replaced.
+    """
+    if 'year' not in df.columns:
+        df = df.assign(year=pd.to_datetime(df['date']).dt.year.astype('int32'))
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        table,
+        root,
+        format='parquet',
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'),
+        existing_data_behavior='delete_matching',
+        max_rows_per_group=row_group_size,
+    )
+
+
+def open_store(root):
+    return ds.dataset(root, format='parquet', partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'))
+
+
+def _filter_expression(filters):
+    expression = None
+    for col, values in (filters or {}).items():
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        condition = pc.field(col).isin(list(values))
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _projected_bytes(fragment, columns):
+    # Compressed size of the projected column chunks in one Parquet file
+    metadata = fragment.metadata
+    names = metadata.schema.names
+    wanted = set(names if columns is None else columns)
+    return sum(
+        metadata.row_group(i).column(j).total_compressed_size
+        for i in range(metadata.num_row_groups)
+        for j, name in enumerate(names)
+        if name in wanted
+    )
+
+
+def query_store(root, columns=None, filters=None):
+    """
+    Reads a projection of the store, skipping partitions that can't match the filters.
+
+    Parameters:
+        root (str): Store directory written by `write_store`.
+        columns (list, optional): Columns to load. None loads everything.
+        filters (dict, optional): column → value or list of values, e.g. {'month': ['Jun', 'Jul'], 'origin': 'EWR'}.
+            Filters on partition columns prune whole directories; others are applied to the row groups read.
+
+    Returns:
+        df (pd.DataFrame): Matching rows.
+        stats (QueryStats): Partitions and bytes scanned.
+    """
+    start = time.perf_counter()
+    dataset = open_store(root)
+    expression = _filter_expression(filters)
+
+    fragments = list(dataset.get_fragments(filter=expression))
+    files_total = len(dataset.files)
+
+    table = dataset.to_table(columns=columns, filter=expression)
+
+    stats = QueryStats(
+        files_scanned=len(fragments),
+        files_total=files_total,
+        bytes_scanned=sum(_projected_bytes(fragment, columns) for fragment in fragments),
+        rows=table.num_rows,
+        seconds=time.perf_counter() - start,
+    )
+    return table.to_pandas(), stats
+
+
+def store_exists(root):
+    return os.path.isdir(root) and any(name.startswith('year=') for name in os.listdir(root))
@@ -0,0 +1,176 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.data import LOOKUPS_DIR
+
+CODEBOOK_PATH = LOOKUPS_DIR / "codebook.json"
+
+# route_id = origin_id << ROUTE_SHIFT | dest_id (fits int32 for up to 32k airports)
+ROUTE_SHIFT = 16
+ROUTE_MASK = (1 << ROUTE_SHIFT) - 1
+
+
+def split_routes(routes):
+    """
+    Origin and destination codes of "ORIGIN - DEST" strings, splitting each distinct route once.
+
+    Returns:
+        origins, dests (np.ndarray): Object arrays aligned with `routes` (None where unparseable).
+    """
+    routes = np.asarray(routes, dtype=object)
+    inverse, unique = pd.factorize(routes)
+    parts = pd.Series(unique, dtype=object).str.split(" - ", n=1, expand=True).reindex(columns=[0, 1])
+    parts = parts.astype(object).where(parts.notna(), None)
+    return parts[0].to_numpy()[inverse], parts[1].to_numpy()[inverse]
+
+
+class CodeBook:
+    """
+    Shared dictionary encoding for airports and airlines.
+
+    Every airport code (origin or destination) and airline name gets a small integer id: its
+    position in `airports` / `airlines`. A route is one packed int32, origin_id << 16 | dest_id,
+    so routes are grouped, joined and looked up as integers, and the "ORIGIN - DEST" string is
+    only built for display. Unknown codes encode as -1.
+
+    The same ids serve the cached flights frame (as pandas categorical codes), the EDA
+    aggregations, the lookup indexes and the Predictor. Ids are persisted in
+    lookups/codebook.json; new codes are appended, so existing ids never change.
+
+    Parameters:
+        airports (list): Airport code for each id.
+        airlines (list): Airline name for each id.
+    """
+
+    def __init__(self, airports, airlines):
+        self.airports = pd.Index(list(airports), dtype=object)
+        self.airlines = pd.Index(list(airlines), dtype=object)
+        self.airport_dtype = pd.CategoricalDtype(self.airports)
+        self.airline_dtype = pd.CategoricalDtype(self.airlines)
+
+    # ------ Airports and airlines ------
+    def airport_ids(self, codes):
+        return self.airports.get_indexer(np.asarray(codes, dtype=object))
+
+    def airline_ids(self, names):
+        return self.airlines.get_indexer(np.asarray(names, dtype=object))
+
+    # ------ Routes ------
+    def pack_routes(self, origin_ids, dest_ids):
+        origin_ids = np.asarray(origin_ids, dtype=np.int32)
+        dest_ids = np.asarray(dest_ids, dtype=np.int32)
+        route_ids = (origin_ids << ROUTE_SHIFT) | dest_ids
+        return np.where((origin_ids < 0) | (dest_ids < 0), -1, route_ids).astype(np.int32)
+
+    def unpack_routes(self, route_ids):
+        route_ids = np.asarray(route_ids, dtype=np.int32)
+        return route_ids >> ROUTE_SHIFT, route_ids & ROUTE_MASK
+
+    def route_ids(self, origins, dests):
+        """Packed route ids for airport code arrays."""
+        return self.pack_routes(self.airport_ids(origins), self.airport_ids(dests))
+
+    def parse_routes(self, labels):
+        """
+        Packed route ids for "ORIGIN - DEST" strings (the app's display / lookup format).
+
+        Each distinct label is split once (see `split_routes`).
+        """
+        origins, dests = split_routes(labels)
+        return self.route_ids(origins, dests)
+
+    def route_labels(self, route_ids):
+        """"ORIGIN - DEST" strings for packed route ids, built once per distinct route."""
+        route_ids = np.asarray(route_ids, dtype=np.int32)
+        unique, inverse = np.unique(route_ids, return_inverse=True)
+        origin_ids, dest_ids = self.unpack_routes(unique)
+        airports = self.airports.to_numpy()
+        labels = np.array([f"{airports[o]} - {airports[d]}" for o, d in zip(origin_ids, dest_ids)], dtype=object)
+        return labels[inverse]
+
+    def route_airports(self, route_id):
+        """(origin, dest) codes of one route id."""
+        origin_id, dest_id = self.unpack_routes([route_id])
+        return self.airports[origin_id[0]], self.airports[dest_id[0]]
+
+    # ------ Growing and persisting ------
+    def extend(self, airports=(), airlines=()):
+        """A codebook with unseen codes appended in sorted order; existing ids are kept."""
+        new_airports = sorted(set(pd.unique(np.asarray(airports, dtype=object))) - set(self.airports))
+        new_airlines = sorted(set(pd.unique(np.asarray(airlines, dtype=object))) - set(self.airlines))
+        if not new_airports and not new_airlines:
+            return self
+        return CodeBook(list(self.airports) + new_airports, list(self.airlines) + new_airlines)
+
+    def to_dict(self):
+        return {"airports": list(self.airports), "airlines": list(self.airlines), "route_shift": ROUTE_SHIFT}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["airports"], data["airlines"])
+
+
+def save_codebook(codebook, path=CODEBOOK_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(codebook.to_dict(), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_codebook(path=CODEBOOK_PATH):
+    """Persisted codebook, or None if none has been exported."""
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return CodeBook.from_dict(json.load(f))
+
+
+def codebook_for(flights_df=None, lookups=None, path=CODEBOOK_PATH):
+    """
+    The persisted codebook, extended with any airport or airline in the flights or lookups.
+
+    Parameters:
+        flights_df (pd.DataFrame, optional): With 'origin', 'dest' and/or 'airline_name'.
+        lookups (tuple, optional): The four lookup frames from `utils.data.load_lookups`.
+        path (Path): Persisted codebook to start from.
+    """
+    airports, airlines = [], []
+    if flights_df is not None:
+        airports += [flights_df[col].unique() for col in ['origin', 'dest'] if col in flights_df.columns]
+        if 'airline_name' in flights_df.columns:
+            airlines.append(flights_df['airline_name'].unique())
+    if lookups is not None:
+        airline_delay_lookup, route_dist_lookup, dest_cluster_lookup, route_cluster_lookup = lookups
+        airlines.append(airline_delay_lookup['airline_name'].unique())
+        airports.append(dest_cluster_lookup['dest'].unique())
+        for routes in [route_dist_lookup['route'], route_cluster_lookup['route']]:
+            airports.append(routes.str.split(" - ", n=1, expand=True).stack().unique())
+
+    def flat(arrays):
+        return np.concatenate([np.asarray(a, dtype=object) for a in arrays]) if arrays else []
+
+    base = load_codebook(path) or CodeBook([], [])
+    return base.extend(flat(airports), flat(airlines))
+
+
+def encode_flights(flights_df, codebook):
+    """
+    Dictionary-encodes a flights frame: origin, dest and airline_name become categoricals over
+    the codebook (their codes are the ids), and a packed int32 'route_id' column is added.
+
+    String comparisons and filters on those columns still work; groupbys on them should pass
+    observed=True.
+    """
+    encoded = {}
+    for col, dtype in [('origin', codebook.airport_dtype), ('dest', codebook.airport_dtype),
+                       ('airline_name', codebook.airline_dtype)]:
+        if col in flights_df.columns:
+            encoded[col] = flights_df[col].astype(dtype)
+    if 'origin' in encoded and 'dest' in encoded:
+        encoded['route_id'] = codebook.pack_routes(encoded['origin'].cat.codes.to_numpy(),
+                                                   encoded['dest'].cat.codes.to_numpy())
+    return flights_df.assign(**encoded)
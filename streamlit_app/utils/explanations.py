@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+from utils.artifacts import APP_DIR
+
+# Small precomputed summaries written by scripts/global_explanations.py, read by the EDA page
+EXPLANATIONS_DIR = APP_DIR / "explanations"
+IMPORTANCE_PATH = EXPLANATIONS_DIR / "global_importance.csv"
+DEPENDENCE_PATH = EXPLANATIONS_DIR / "global_dependence.csv"
+
+N_DEPENDENCE_BINS = 10
+
+
+def transformed_feature_names(preprocessor):
+    """
+    Column names after a fitted ColumnTransformer, e.g. 'origin_EWR' for one-hot columns.
+
+    Steps without `get_feature_names_out` (like FunctionTransformer) keep their input names.
+    """
+    names = []
+    for _, transformer, cols in preprocessor.transformers_:
+        if transformer == 'drop':
+            continue
+        if transformer == 'passthrough':
+            names.extend(cols)
+            continue
+        try:
+            names.extend(transformer.get_feature_names_out(cols))
+        except Exception:
+            names.extend(cols)
+    return [str(name) for name in names]
+
+
+def to_dense(X):
+    return X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+
+
+def mean_row(X, chunksize=500_000):
+    """Column means of a dense, memory-mapped or CSR matrix, read in chunks (the background of linear SHAP)."""
+    total = sum(to_dense(X[i:i + chunksize]).sum(axis=0) for i in range(0, X.shape[0], chunksize))
+    return total / max(X.shape[0], 1)
+
+
+def linear_attributions(estimator, X, background_mean):
+    """
+    Exact SHAP values (log-odds) of a linear model with independent features: coef × (x − E[x]).
+    """
+    return (X - background_mean) * estimator.coef_[0]
+
+
+def tree_attributions(estimator, X):
+    """TreeExplainer SHAP values for the positive class of a binary tree ensemble."""
+    import shap
+
+    values = shap.TreeExplainer(estimator).shap_values(X, check_additivity=False)
+    if isinstance(values, list):
+        return values[1]
+    return values[..., 1] if values.ndim == 3 else values
+
+
+def dependence_edges(X, n_bins=N_DEPENDENCE_BINS):
+    """Per-feature quantile bin edges, fixed up front so chunk summaries can be added together."""
+    edges = np.quantile(X, np.linspace(0, 1, n_bins + 1), axis=0).T
+    return [np.unique(feature_edges) for feature_edges in edges]
+
+
+def summarize_chunk(shap_values, X, edges):
+    """
+    Mergeable sums for one chunk of attributions.
+
+    Returns:
+        dict: 'abs_sum' and 'sum' per feature, and per feature/bin 'bin_sum', 'bin_value_sum', 'bin_count'.
+    """
+    n_features = X.shape[1]
+    n_bins = max(len(e) for e in edges)
+    bin_sum = np.zeros((n_features, n_bins))
+    bin_value_sum = np.zeros((n_features, n_bins))
+    bin_count = np.zeros((n_features, n_bins))
+
+    for j in range(n_features):
+        # n edges make n - 1 bins; the maximum (side='right') goes in the last one, not its own
+        bins = np.clip(np.searchsorted(edges[j], X[:, j], side='right') - 1, 0, max(len(edges[j]) - 2, 0))
+        bin_sum[j] = np.bincount(bins, weights=shap_values[:, j], minlength=n_bins)
+        bin_value_sum[j] = np.bincount(bins, weights=X[:, j], minlength=n_bins)
+        bin_count[j] = np.bincount(bins, minlength=n_bins)
+
+    return {
+        'rows': len(X),
+        'abs_sum': np.abs(shap_values).sum(axis=0),
+        'sum': shap_values.sum(axis=0),
+        'bin_sum': bin_sum,
+        'bin_value_sum': bin_value_sum,
+        'bin_count': bin_count,
+    }
+
+
+def explain_summaries(kind, estimators, X, background_mean, edges):
+    """
+    Attributions for one chunk of transformed rows, reduced to one mergeable summary per output.
+
+    Parameters:
+        kind (str): 'logreg' (exact linear SHAP, log-odds) or 'rf' (TreeExplainer, probability).
+        estimators (list): One fitted binary estimator per output.
+        X (np.ndarray): Dense transformed rows.
+        background_mean (np.ndarray): Mean transformed row of the background (linear models).
+        edges (list): Bin edges per feature, from `dependence_edges`.
+    """
+    summaries = []
+    for estimator in estimators:
+        if kind == 'logreg':
+            shap_values = linear_attributions(estimator, X, background_mean)
+        else:
+            shap_values = tree_attributions(estimator, X)
+        summaries.append(summarize_chunk(shap_values, X, edges))
+    return summaries
+
+
+def merge_summaries(summaries):
+    merged = dict(summaries[0])
+    for summary in summaries[1:]:
+        for key, value in summary.items():
+            merged[key] = merged[key] + value
+    return merged
+
+
+def summary_frames(summary, feature_names, model, output):
+    """
+    Turns merged sums into the stored tables.
+
+    Returns:
+        importance (pd.DataFrame): model, output, feature, mean_abs_shap, mean_shap.
+        dependence (pd.DataFrame): model, output, feature, bin, feature_value (mean transformed value), mean_shap, rows.
+    """
+    rows = summary['rows']
+    importance = pd.DataFrame({
+        'model': model,
+        'output': output,
+        'feature': feature_names,
+        'mean_abs_shap': summary['abs_sum'] / rows,
+        'mean_shap': summary['sum'] / rows,
+    })
+
+    count = summary['bin_count']
+    feature_idx, bin_idx = np.nonzero(count)
+    dependence = pd.DataFrame({
+        'model': model,
+        'output': output,
+        'feature': np.asarray(feature_names)[feature_idx],
+        'bin': bin_idx,
+        'feature_value': summary['bin_value_sum'][feature_idx, bin_idx] / count[feature_idx, bin_idx],
+        'mean_shap': summary['bin_sum'][feature_idx, bin_idx] / count[feature_idx, bin_idx],
+        'rows': count[feature_idx, bin_idx].astype(int),
+    })
+    return importance, dependence
+
+
+def global_frames(chunk_summaries, feature_names, model, outputs):
+    """
+    Merges the per-chunk results of `explain_summaries` into the stored tables, for every output.
+
+    Returns:
+        importance (pd.DataFrame), dependence (pd.DataFrame): See `summary_frames`.
+    """
+    importance, dependence = [], []
+    for output_index, output in enumerate(outputs):
+        merged = merge_summaries([summaries[output_index] for summaries in chunk_summaries])
+        output_importance, output_dependence = summary_frames(merged, feature_names, model, output)
+        importance.append(output_importance)
+        dependence.append(output_dependence)
+    return pd.concat(importance, ignore_index=True), pd.concat(dependence, ignore_index=True)
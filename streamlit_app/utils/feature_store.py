@@ -0,0 +1,150 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import cloudpickle
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.explanations import transformed_feature_names
+from utils.training import FEATURE_COLS, TARGET_COLS, split_features_targets, time_split, with_route
+
+FEATURE_STORE_DIR = "feature_store"
+
+ARRAYS = ['X_train', 'X_test', 'y_train', 'y_test']
+
+
+def design_key(df, preprocessor, train_frac=0.8, feature_cols=FEATURE_COLS):
+    """
+    Hash of the model inputs, the (unfitted) preprocessor configuration and the split.
+
+    Any change to the data rows, the feature columns or a preprocessor parameter gives a new key.
+    """
+    if 'route' in feature_cols:
+        df = with_route(df)
+    data_hash = pd.util.hash_pandas_object(df[feature_cols + TARGET_COLS], index=False).to_numpy()
+    return joblib.hash((joblib.hash(data_hash), joblib.hash(preprocessor), train_frac))[:16]
+
+
+def _feature_names(preprocessor, n_features):
+    try:
+        return [str(name) for name in preprocessor.get_feature_names_out()]
+    except Exception:
+        names = transformed_feature_names(preprocessor)
+        return names if len(names) == n_features else [f"f{i}" for i in range(n_features)]
+
+
+def _save_matrix(path, name, X):
+    # CSR matrices are stored as their three component arrays, so they can be memory-mapped too
+    if sparse.issparse(X):
+        X = X.tocsr()
+        for part in ['data', 'indices', 'indptr']:
+            np.save(path / f"{name}.{part}.npy", getattr(X, part))
+        return {"format": "csr", "shape": list(X.shape)}
+    X = np.asarray(X)
+    np.save(path / f"{name}.npy", X)
+    return {"format": "dense", "shape": list(X.shape)}
+
+
+def _load_matrix(path, name, info):
+    if info["format"] == "csr":
+        parts = tuple(np.load(path / f"{name}.{part}.npy", mmap_mode='r') for part in ['data', 'indices', 'indptr'])
+        return sparse.csr_matrix(parts, shape=tuple(info["shape"]), copy=False)
+    return np.load(path / f"{name}.npy", mmap_mode='r')
+
+
+def build_design(df, preprocessor, root=FEATURE_STORE_DIR, train_frac=0.8, feature_cols=FEATURE_COLS):
+    """
+    Fits `preprocessor` on the time-ordered training rows and writes the transformed design matrix.
+
+    Layout of root/<key>/: X_train / X_test (.npy, or .data/.indices/.indptr.npy for CSR output),
+    y_train.npy, y_test.npy, preprocessor.pkl (fitted) and meta.json (feature names, formats and
+    shapes, build time). The directory is written under a temporary name and renamed at the end,
+    so readers never see a partial build.
+
+    Returns:
+        Path: The design directory.
+    """
+    key = design_key(df, preprocessor, train_frac, feature_cols)
+    path = Path(root) / key
+    tmp_path = Path(root) / f".{key}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+
+    start = time.perf_counter()
+    X, y = split_features_targets(df, feature_cols)
+    X_train, X_test, y_train, y_test = time_split(X, y, train_frac)
+
+    X_train_t = preprocessor.fit_transform(X_train)
+    X_test_t = preprocessor.transform(X_test)
+    transform_seconds = time.perf_counter() - start
+
+    matrices = {
+        'X_train': _save_matrix(tmp_path, 'X_train', X_train_t),
+        'X_test': _save_matrix(tmp_path, 'X_test', X_test_t),
+        'y_train': _save_matrix(tmp_path, 'y_train', y_train.to_numpy(dtype=np.int8)),
+        'y_test': _save_matrix(tmp_path, 'y_test', y_test.to_numpy(dtype=np.int8)),
+    }
+
+    with open(tmp_path / "preprocessor.pkl", "wb") as f:
+        cloudpickle.dump(preprocessor, f)
+
+    meta = {
+        "key": key,
+        "feature_names": _feature_names(preprocessor, matrices['X_train']["shape"][1]),
+        "target_names": TARGET_COLS,
+        "matrices": matrices,
+        "transform_seconds": transform_seconds,
+    }
+    with open(tmp_path / "meta.json", "w") as f:
+        json.dump(meta, f, indent=2)
+
+    if path.exists():
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_design(path):
+    """
+    Opens a design directory. Arrays are read-only memory maps: nothing is copied until used.
+
+    Returns:
+        dict: 'X_train', 'X_test', 'y_train', 'y_test' (np.memmap, or CSR over memmaps),
+              'feature_names', 'target_names', 'preprocessor' (fitted), 'meta'.
+    """
+    path = Path(path)
+    with open(path / "meta.json") as f:
+        meta = json.load(f)
+    with open(path / "preprocessor.pkl", "rb") as f:
+        preprocessor = cloudpickle.load(f)
+
+    design = {name: _load_matrix(path, name, meta["matrices"][name]) for name in ARRAYS}
+    design.update(
+        feature_names=meta["feature_names"],
+        target_names=meta["target_names"],
+        preprocessor=preprocessor,
+        meta=meta,
+    )
+    return design
+
+
+def get_design(df, preprocessor, root=FEATURE_STORE_DIR, train_frac=0.8, feature_cols=FEATURE_COLS):
+    """
+    Loads the design matrix for (df, preprocessor), building it first if it isn't stored yet.
+
+    Returns:
+        design (dict): See `load_design`.
+        cached (bool): True when an existing build was reused.
+        seconds (float): Time spent here (hashing + load, or the full build).
+    """
+    start = time.perf_counter()
+    path = Path(root) / design_key(df, preprocessor, train_frac, feature_cols)
+    cached = (path / "meta.json").exists()
+    if not cached:
+        path = build_design(df, preprocessor, root, train_frac, feature_cols)
+    return load_design(path), cached, time.perf_counter() - start
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+from utils.encoding import split_routes
+
+# Define mapping based on delay trend
+time_score_map = {
+    "12am–6am": 1, "6am–9am": 2, "9am–12pm": 3, "12pm–3pm": 4,
+    "3pm–6pm": 5, "6pm–9pm": 6, "9pm–12am": 7
+}
+
+month_score_map = {
+    'Sep': 1, 'Oct': 2, 'Nov': 3, 'Jan': 4, 'Feb': 5, 'Mar': 6, 'May': 7,
+    'Aug': 8, 'Apr': 9, 'Jun': 10, 'Jul': 11, 'Dec': 12
+}
+
+dow_score_map = {
+    'Thu': 1, 'Fri': 2, 'Mon': 3, 'Sun': 4,
+    'Sat': 5, 'Wed': 6, 'Tue': 7
+}
+
+
+def get_time_block(dep_hour):
+    if 0 <= dep_hour < 6:
+        return "12am–6am"
+    elif 6 <= dep_hour < 9:
+        return "6am–9am"
+    elif 9 <= dep_hour < 12:
+        return "9am–12pm"
+    elif 12 <= dep_hour < 15:
+        return "12pm–3pm"
+    elif 15 <= dep_hour < 18:
+        return "3pm–6pm"
+    elif 18 <= dep_hour < 21:
+        return "6pm–9pm"
+    else:
+        return "9pm–12am"
+
+
+# Time block score for every hour of the day, so a batch of hours maps with one take()
+hour_time_scores = np.array([time_score_map[get_time_block(h)] for h in range(24)])
+
+
+def index_lookups(airline_delay_lookup, route_dist_lookup, dest_cluster_lookup, route_cluster_lookup, codebook=None):
+    """
+    Keys each lookup table by its join column so a batch of flights can be mapped with one reindex.
+
+    Duplicate keys keep their first row, matching the first-match behaviour of the Predictor's
+    original row filters.
+
+    Parameters:
+        codebook (utils.encoding.CodeBook, optional): When given, lookups are keyed by integer
+            ids instead of strings (airline id, airport id, packed route id), and the codebook
+            is kept under 'codebook' so `build_feature_frame` encodes its input the same way.
+
+    Returns:
+        dict: Indexed lookups under 'airline', 'route', 'dest' and 'route_cluster'.
+    """
+    if codebook is not None:
+        # Rows the codebook can't encode (-1) are dropped, so unknown inputs still miss
+        def encode(lookup, col, ids):
+            return lookup.assign(**{col: ids})[ids >= 0]
+
+        airline_delay_lookup = encode(airline_delay_lookup, "airline_name", codebook.airline_ids(airline_delay_lookup["airline_name"]))
+        route_dist_lookup = encode(route_dist_lookup, "route", codebook.parse_routes(route_dist_lookup["route"]))
+        dest_cluster_lookup = encode(dest_cluster_lookup, "dest", codebook.airport_ids(dest_cluster_lookup["dest"]))
+        route_cluster_lookup = encode(route_cluster_lookup, "route", codebook.parse_routes(route_cluster_lookup["route"]))
+
+    lookups = {
+        "airline": (
+            airline_delay_lookup.drop_duplicates("airline_name")
+            .set_index("airline_name")[["airline_avg_arr_delay", "airline_avg_dep_delay"]]
+        ),
+        "route": (
+            route_dist_lookup.drop_duplicates("route")
+            .set_index("route")[["route_density", "dist_haul", "distance"]]
+        ),
+        "dest": dest_cluster_lookup.drop_duplicates("dest").set_index("dest")["dest_cluster"],
+        "route_cluster": route_cluster_lookup.drop_duplicates("route").set_index("route")["route_cluster"],
+    }
+    if codebook is not None:
+        lookups["codebook"] = codebook
+    return lookups
+
+
+def _clusters(lookups, name, keys, ids):
+    # Nearest-centroid assignment for unseen keys when assigners are attached (utils.clusters);
+    # assigners are keyed by the airport / route strings, encoded lookups by `ids`
+    assigner = lookups.get(f"{name}_assigner")
+    if assigner is not None:
+        return assigner.assign(keys)
+    return lookups[name if name == "dest" else "route_cluster"].reindex(ids).fillna(0).astype(int).to_numpy()
+
+
+def build_feature_frame(raw, lookups):
+    """
+    Vectorized version of the Predictor's `preprocess_user_input` for many flights at once.
+
+    Parameters:
+        raw (pd.DataFrame): One row per flight with 'airline_name', 'route' ("ORIGIN - DEST"),
+                            'month', 'day_of_week' and 'dep_hour'.
+        lookups (dict): Output of `index_lookups`, optionally with 'dest_assigner' / 'route_assigner'
+                        from `utils.clusters.make_cluster_assigners`.
+
+    Returns:
+        pd.DataFrame: Model-ready features in the same layout the pipeline was trained on.
+    """
+    airline = raw["airline_name"].to_numpy()
+    route = raw["route"].to_numpy()
+    dep_hour = raw["dep_hour"].to_numpy(dtype=int)
+
+    # Split route into origin and destination (once per distinct route)
+    origin, dest = split_routes(route)
+
+    codebook = lookups.get("codebook")
+    if codebook is not None:
+        # Encoded lookups are keyed by airline id, airport id and packed route id
+        dest_keys = codebook.airport_ids(dest)
+        route_keys = codebook.pack_routes(codebook.airport_ids(origin), dest_keys)
+        airline_keys = codebook.airline_ids(airline)
+    else:
+        airline_keys, route_keys, dest_keys = airline, route, dest
+
+    # Unknown keys fall back to 0, as in the single-flight mapping functions (clusters: see _clusters)
+    airline_feats = lookups["airline"].reindex(airline_keys)
+    route_feats = lookups["route"].reindex(route_keys)
+
+    return pd.DataFrame({
+        "month": raw["month"].to_numpy(),
+        "day_of_week": raw["day_of_week"].to_numpy(),
+        "dep_hour": dep_hour,
+        "origin": origin,
+        "dest": dest,
+        "dist_haul": route_feats["dist_haul"].fillna(0).to_numpy(),
+        "airline_avg_arr_delay": airline_feats["airline_avg_arr_delay"].fillna(0).to_numpy(),
+        "airline_avg_dep_delay": airline_feats["airline_avg_dep_delay"].fillna(0).to_numpy(),
+        "route_density": route_feats["route_density"].fillna(0).to_numpy(),
+        "dest_cluster": _clusters(lookups, "dest", dest, dest_keys),
+        "route_cluster": _clusters(lookups, "route", route, route_keys),
+        "is_redeye": ((dep_hour >= 22) | (dep_hour <= 5)).astype(int),
+        "time_block_score": hour_time_scores[dep_hour],
+        "month_delay_score": raw["month"].map(month_score_map).fillna(6).astype(int).to_numpy(),
+        "dow_delay_score": raw["day_of_week"].map(dow_score_map).fillna(4).astype(int).to_numpy(),
+        "distance": route_feats["distance"].fillna(0).to_numpy(),
+    })
@@ -0,0 +1,76 @@
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+
+class BitmapIndex:
+    """
+    Per-value bitmaps over the categorical columns of a frame, for fast cross-filtering.
+
+    Each (column, value) pair is stored as a packed bit array (1 bit per row). A query ORs the
+    selected values within a column and ANDs across columns, so combined filters are resolved
+    without touching the frame itself.
+
+    Parameters:
+        df (pd.DataFrame): Frame to index; row order must stay fixed afterwards.
+        columns (list): Categorical columns to index.
+    """
+
+    def __init__(self, df, columns):
+        self.n_rows = len(df)
+        self.bitmaps = {}
+        for col in columns:
+            codes, uniques = pd.factorize(df[col], sort=True)
+            self.bitmaps[col] = {
+                value: np.packbits(codes == i)
+                for i, value in enumerate(uniques)
+            }
+
+    def values(self, col):
+        return list(self.bitmaps[col])
+
+    def query_bits(self, selection):
+        """
+        Packed bitmap of the rows matching `selection`, or None when nothing is filtered.
+
+        Parameters:
+            selection (dict): column → selected values. Empty (or complete) selections don't filter.
+        """
+        result = None
+        for col, values in selection.items():
+            index = self.bitmaps[col]
+            values = [value for value in values if value in index]
+            if not values and not selection[col]:
+                continue
+            if len(values) == len(index):
+                continue
+
+            if values:
+                col_bits = reduce(np.bitwise_or, (index[value] for value in values))
+            else:
+                col_bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            result = col_bits if result is None else result & col_bits
+        return result
+
+    def query(self, selection):
+        """
+        Row mask for `selection`.
+
+        Returns:
+            np.ndarray or None: Boolean mask of length n_rows, or None when nothing is filtered.
+        """
+        bits = self.query_bits(selection)
+        if bits is None:
+            return None
+        return np.unpackbits(bits, count=self.n_rows).astype(bool)
+
+    def count(self, selection):
+        """Number of matching rows, without unpacking the bitmap."""
+        bits = self.query_bits(selection)
+        if bits is None:
+            return self.n_rows
+        return int(np.bitwise_count(bits).sum())
+
+    def nbytes(self):
+        return sum(bits.nbytes for index in self.bitmaps.values() for bits in index.values())
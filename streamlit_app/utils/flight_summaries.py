@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import pandas as pd
+
+from utils.clusters import cluster_stats
+from utils.data import LOOKUPS_DIR, read_flights
+from utils.stages import atomic_write_csv
+
+# Flight-derived tables the Predictor needs beside the four lookups, exported next to them
+# ({name}.csv) so an artifact build never reads the full flights dataset
+SUMMARY_NAMES = ["dest_stats", "route_stats", "route_rates", "shap_background"]
+SUMMARY_COLUMNS = ["airline_name", "origin", "dest", "month", "day_of_week", "hour",
+                   "dep_delayed_15", "arr_delayed_15"]
+BACKGROUND_COLUMNS = ["airline_name", "origin", "dest", "month", "day_of_week", "hour"]
+
+
+def flight_summaries(flights_df, n_background=1_000, seed=0):
+    """
+    The small tables the Predictor derives from the flights.
+
+    Parameters:
+        flights_df (pd.DataFrame): At least SUMMARY_COLUMNS.
+        n_background (int): Flights sampled for the SHAP background.
+
+    Returns:
+        dict: 'dest_stats' and 'route_stats' (`utils.clusters.cluster_stats` with the key as a
+              column), 'route_rates' (route, origin, dest, dep_rate, arr_rate per route flown)
+              and 'shap_background' (a random sample of flights, BACKGROUND_COLUMNS).
+    """
+    routes = (flights_df['origin'].astype(str) + ' - ' + flights_df['dest'].astype(str)).rename('route')
+    rates = (
+        flights_df[['dep_delayed_15', 'arr_delayed_15']]
+        .groupby(routes).mean()
+        .rename(columns={'dep_delayed_15': 'dep_rate', 'arr_delayed_15': 'arr_rate'})
+        .reset_index()
+    )
+    rates[['origin', 'dest']] = rates['route'].str.split(' - ', n=1, expand=True)
+    sample = flights_df.sample(n=min(n_background, len(flights_df)), random_state=seed)
+    return {
+        "dest_stats": cluster_stats(flights_df, 'dest').reset_index(),
+        "route_stats": cluster_stats(flights_df, 'route').reset_index(),
+        "route_rates": rates[['route', 'origin', 'dest', 'dep_rate', 'arr_rate']],
+        "shap_background": sample[BACKGROUND_COLUMNS].reset_index(drop=True),
+    }
+
+
+def export_flight_summaries(flights_df, lookups_dir=None):
+    """Writes `flight_summaries` to `lookups_dir` (default LOOKUPS_DIR) and returns them."""
+    lookups_dir = Path(lookups_dir or LOOKUPS_DIR)
+    summaries = flight_summaries(flights_df)
+    for name, frame in summaries.items():
+        atomic_write_csv(frame, lookups_dir / f"{name}.csv")
+    return summaries
+
+
+def load_flight_summaries(lookups_dir=None):
+    """
+    Reads the exported summaries, with 'dest_stats' and 'route_stats' indexed by their key.
+
+    Lookups downloaded from Google Drive come without summaries; those are then derived from
+    the flights once and exported, so later builds read only the small files.
+    """
+    lookups_dir = Path(lookups_dir or LOOKUPS_DIR)
+    paths = {name: lookups_dir / f"{name}.csv" for name in SUMMARY_NAMES}
+    if all(path.exists() for path in paths.values()):
+        summaries = {name: pd.read_csv(path) for name, path in paths.items()}
+    else:
+        flights, _ = read_flights(columns=SUMMARY_COLUMNS)
+        try:
+            summaries = export_flight_summaries(flights, lookups_dir)
+        except OSError:
+            # Read-only app directory: use them for this build only
+            summaries = flight_summaries(flights)
+    for key in ['dest', 'route']:
+        summaries[f"{key}_stats"] = summaries[f"{key}_stats"].set_index(key)
+    return summaries
@@ -0,0 +1,90 @@
+import threading
+import time
+import traceback
+
+
+class HotReloader:
+    """
+    Keeps one built version of some artifacts and swaps in a new one when its sources change.
+
+    A daemon thread polls `fingerprint()` (cheap, e.g. file paths and mtimes). When the value
+    changes, `build(fingerprint)` runs on that thread — loading models, building indexes — while
+    requests keep being served from the current version. The finished build then replaces the
+    current one in a single reference assignment.
+
+    Callers take `current()` (or `snapshot()`) once per request and use that object throughout, so a request that
+    started before a swap finishes on the old version. A failed build (e.g. a half-copied file)
+    leaves the current version in place; its fingerprint is remembered, and the build is only
+    retried once the sources change again (a finished copy has a new mtime), not on every poll.
+
+    Parameters:
+        fingerprint (callable): Returns a hashable value identifying the source versions.
+        build (callable): Takes a fingerprint and returns the built artifacts.
+        poll_seconds (float): How often the sources are checked.
+    """
+
+    def __init__(self, fingerprint, build, poll_seconds=15):
+        self.fingerprint = fingerprint
+        self.build = build
+        self.poll_seconds = poll_seconds
+
+        self.swaps = 0
+        self.last_error = None
+        self.last_build_seconds = None
+        self.failed_version = None
+
+        # The first build runs in the caller, so there is always a current version
+        version = fingerprint()
+        self._state = (version, self._timed_build(version))
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="artifact-watcher", daemon=True)
+        self._thread.start()
+
+    def _timed_build(self, version):
+        start = time.perf_counter()
+        built = self.build(version)
+        self.last_build_seconds = time.perf_counter() - start
+        return built
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            self.check()
+
+    def check(self):
+        """Rebuilds and swaps if the sources changed. Returns True when a swap happened."""
+        try:
+            version = self.fingerprint()
+        except Exception:
+            self.last_error = traceback.format_exc(limit=3)
+            return False
+        if version == self.version or version == self.failed_version:
+            return False
+
+        try:
+            built = self._timed_build(version)
+        except Exception:
+            self.last_error = traceback.format_exc(limit=3)
+            self.failed_version = version
+            return False
+
+        # One reference assignment: readers see either the old (version, artifacts) pair or the new one
+        self._state = (version, built)
+        self.last_error = None
+        self.failed_version = None
+        self.swaps += 1
+        return True
+
+    def current(self):
+        return self._state[1]
+
+    def snapshot(self):
+        """(version, artifacts) taken together, for callers that key caches by version."""
+        return self._state
+
+    @property
+    def version(self):
+        return self._state[0]
+
+    def stop(self):
+        self._stop.set()
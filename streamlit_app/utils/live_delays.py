@@ -0,0 +1,399 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+
+import numpy as np
+import pandas as pd
+
+from utils.logs import ensure_handler
+from utils.memory import track
+
+# Live flight status events: a JSON-lines file that is followed as it grows (e.g. written by
+# scripts/replay_flight_status.py), or "tcp://host:port" for a socket that streams the same lines
+FEED_SOURCE = os.environ.get("FLIGHT_STATUS_FEED", "flight_status.jsonl")
+
+# One event per line: 'ts' in epoch seconds, the flight's airline and airports, and whichever
+# delays it reports (a departure event has 'dep_delay', an arrival event 'arr_delay', or both)
+EVENT_FIELDS = ["ts", "airline_name", "origin", "dest", "dep_delay", "arr_delay"]
+
+# Accumulated per key and time bucket
+WINDOW_FIELDS = ["dep_n", "dep_delayed", "dep_minutes", "arr_n", "arr_delayed", "arr_minutes"]
+
+# Slots per dimension; keys with no events left in the window free theirs
+DEFAULT_CAPACITY = {"airline": 64, "origin": 1024, "route": 8192}
+
+logger = logging.getLogger("flight_delay.live")
+
+_feed_lock = threading.Lock()
+_feed = None
+
+
+class _KeyedBuckets:
+    """Ring buffers of time buckets for up to `capacity` keys of one dimension, plus their window totals."""
+
+    def __init__(self, capacity, n_buckets):
+        self.n_buckets = n_buckets
+        self.buckets = np.zeros((capacity, n_buckets, len(WINDOW_FIELDS)))
+        self.totals = np.zeros((capacity, len(WINDOW_FIELDS)))
+        self.slots = {}
+        self.keys = np.full(capacity, -1, dtype=np.int64)
+        self.free = list(range(capacity - 1, -1, -1))
+        self.dropped = 0
+
+    def expire(self, ring):
+        self.totals -= self.buckets[:, ring]
+        self.buckets[:, ring] = 0
+
+    def _reclaim(self):
+        # Keys whose window has emptied give their slot back
+        stale = np.flatnonzero((self.keys >= 0) & (self.totals[:, [0, 3]].sum(axis=1) <= 0))
+        for slot in stale:
+            del self.slots[int(self.keys[slot])]
+        self.keys[stale] = -1
+        self.totals[stale] = 0
+        self.free.extend(stale.tolist())
+
+    def slots_of(self, keys):
+        slots = np.empty(len(keys), dtype=np.int64)
+        for i, key in enumerate(keys.tolist()):
+            slot = self.slots.get(key)
+            if slot is None:
+                if not self.free:
+                    self._reclaim()
+                if not self.free:
+                    slots[i] = -1
+                    continue
+                slot = self.slots[key] = self.free.pop()
+                self.keys[slot] = key
+            slots[i] = slot
+        return slots
+
+    def add(self, keys, ring, values):
+        known = keys >= 0
+        unique, inverse = np.unique(keys[known], return_inverse=True)
+        slots = self.slots_of(unique)[inverse]
+        placed = slots >= 0
+        self.dropped += int((~placed).sum())
+
+        # One bincount per field over the (slot, bucket) cells the batch touches
+        cells = slots[placed] * self.n_buckets + ring[known][placed]
+        values = values[known][placed]
+        cells, inverse = np.unique(cells, return_inverse=True)
+        sums = np.column_stack([np.bincount(inverse, weights=values[:, f], minlength=len(cells))
+                                for f in range(values.shape[1])])
+        self.buckets.reshape(-1, values.shape[1])[cells] += sums
+        np.add.at(self.totals, cells // self.n_buckets, sums)
+
+    def get(self, key):
+        slot = self.slots.get(key)
+        return None if slot is None else self.totals[slot].copy()
+
+    def nbytes(self):
+        return self.buckets.nbytes + self.totals.nbytes + self.keys.nbytes
+
+
+class RollingDelayWindows:
+    """
+    Rolling time-windowed delay counts per airline, origin airport and route, in fixed memory.
+
+    The window is a ring of `bucket_seconds` buckets. Every key has its own ring in one
+    preallocated array per dimension (at most `capacity` keys each), and a running total over
+    the ring, so a read is one dict lookup and one row: O(1) whatever the event rate. When
+    stream time moves past a bucket, that bucket is subtracted from every total and cleared,
+    one vectorized step per bucket.
+
+    Time is the events' own 'ts' (the latest seen), so a replayed or delayed feed rolls the
+    window exactly as a live one. Events older than the window are dropped (`late`); events
+    within it are added to their bucket even if out of order.
+
+    Keys are codebook ids (utils.encoding): airline id, origin airport id and packed route id.
+
+    Parameters:
+        window_seconds (int): Window length.
+        bucket_seconds (int): Expiry granularity; the window covers the last
+            window_seconds // bucket_seconds buckets.
+        capacity (dict, optional): Dimension → maximum keys (defaults to DEFAULT_CAPACITY).
+    """
+
+    def __init__(self, window_seconds=3 * 3600, bucket_seconds=600, capacity=None):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = max(1, window_seconds // bucket_seconds)
+        self.window_seconds = self.n_buckets * bucket_seconds
+        capacity = dict(DEFAULT_CAPACITY, **(capacity or {}))
+        self.dimensions = {name: _KeyedBuckets(capacity[name], self.n_buckets) for name in DEFAULT_CAPACITY}
+
+        self.head = None         # latest bucket number seen
+        self.first_bucket = None
+        self.events = 0
+        self.late = 0
+        self._lock = threading.Lock()
+
+    def _advance(self, bucket):
+        if self.head is None:
+            self.head = self.first_bucket = bucket
+            return
+        for expired in range(max(self.head + 1, bucket - self.n_buckets + 1), bucket + 1):
+            for counts in self.dimensions.values():
+                counts.expire(expired % self.n_buckets)
+        self.head = max(self.head, bucket)
+
+    def add(self, ts, airline_ids, origin_ids, route_ids, dep_delay, arr_delay):
+        """
+        Adds a batch of events (aligned arrays; ids of -1 skip that dimension, NaN delays that field).
+        """
+        ts = np.asarray(ts, dtype=float)
+        dep_delay = np.asarray(dep_delay, dtype=float)
+        arr_delay = np.asarray(arr_delay, dtype=float)
+        if len(ts) == 0:
+            return
+        dep_n, arr_n = ~np.isnan(dep_delay), ~np.isnan(arr_delay)
+        values = np.column_stack([dep_n, dep_delay >= 15, np.where(dep_n, dep_delay, 0),
+                                  arr_n, arr_delay >= 15, np.where(arr_n, arr_delay, 0)]).astype(float)
+        bucket = np.floor_divide(ts, self.bucket_seconds).astype(np.int64)
+
+        with self._lock:
+            self._advance(int(bucket.max()))
+            self.first_bucket = min(self.first_bucket, int(bucket.min()))
+            fresh = bucket > self.head - self.n_buckets
+            self.late += int((~fresh).sum())
+            self.events += int(fresh.sum())
+            ring = bucket[fresh] % self.n_buckets
+            for name, keys in [("airline", airline_ids), ("origin", origin_ids), ("route", route_ids)]:
+                self.dimensions[name].add(np.asarray(keys, dtype=np.int64)[fresh], ring, values[fresh])
+
+    def covered_seconds(self):
+        """How much of the window the stream has filled so far."""
+        if self.head is None:
+            return 0
+        return min(self.n_buckets, self.head - self.first_bucket + 1) * self.bucket_seconds
+
+    def current(self, dimension, key):
+        """
+        Window stats of one key, or None when it has no events in the window.
+
+        Returns:
+            dict: 'departures', 'dep_delay_rate', 'avg_dep_delay', 'arrivals', 'arr_delay_rate',
+                  'avg_arr_delay' (rates and averages are NaN without departures/arrivals).
+        """
+        with self._lock:
+            totals = self.dimensions[dimension].get(int(key))
+        if totals is None or totals[[0, 3]].sum() <= 0:  # slot not yet reclaimed
+            return None
+        dep_n, dep_delayed, dep_minutes, arr_n, arr_delayed, arr_minutes = totals
+        return {
+            "departures": int(dep_n),
+            "dep_delay_rate": dep_delayed / dep_n if dep_n else np.nan,
+            "avg_dep_delay": dep_minutes / dep_n if dep_n else np.nan,
+            "arrivals": int(arr_n),
+            "arr_delay_rate": arr_delayed / arr_n if arr_n else np.nan,
+            "avg_arr_delay": arr_minutes / arr_n if arr_n else np.nan,
+        }
+
+    def airline_delays(self, airline_ids, min_flights=20):
+        """
+        The airlines' mean delays in the window, to stand in for the 2023 averages of the
+        airline lookup ('airline_avg_dep_delay' / 'airline_avg_arr_delay').
+
+        A mean is only given once the airline has `min_flights` departures / arrivals in the
+        window (NaN otherwise). One `current` read per airline.
+
+        Returns:
+            pd.DataFrame: Indexed by `airline_ids`.
+        """
+        rows = {}
+        for airline_id in airline_ids:
+            stats = self.current("airline", airline_id) if airline_id >= 0 else None
+            if stats is None:
+                continue
+            rows[airline_id] = {
+                "airline_avg_dep_delay": stats["avg_dep_delay"] if stats["departures"] >= min_flights else np.nan,
+                "airline_avg_arr_delay": stats["avg_arr_delay"] if stats["arrivals"] >= min_flights else np.nan,
+            }
+        table = pd.DataFrame.from_dict(rows, orient="index", columns=["airline_avg_dep_delay", "airline_avg_arr_delay"])
+        return table.reindex(airline_ids)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "events": self.events,
+                "late": self.late,
+                "keys": {name: len(counts.slots) for name, counts in self.dimensions.items()},
+                "dropped": {name: counts.dropped for name, counts in self.dimensions.items()},
+                "stream_time": None if self.head is None else (self.head + 1) * self.bucket_seconds,
+            }
+
+    def nbytes(self):
+        return sum(counts.nbytes() for counts in self.dimensions.values())
+
+
+# ------ Event sources ------
+def _file_batches(path, stop, max_bytes, poll_seconds, follow):
+    # Waits for the file to appear, then reads whole lines as it grows (like `tail -f`, from the start)
+    while not os.path.exists(path):
+        if not follow or stop.wait(poll_seconds):
+            return
+    partial = ""
+    with open(path, encoding="utf-8") as f:
+        while not stop.is_set():
+            lines = f.readlines(max_bytes)
+            if not lines:
+                if not follow or stop.wait(poll_seconds):
+                    return
+                continue
+            lines[0] = partial + lines[0]
+            partial = "" if lines[-1].endswith("\n") else lines.pop()
+            if lines:
+                yield lines
+
+
+def _socket_batches(address, stop, max_bytes, poll_seconds):
+    # Reconnects (with backoff) whenever the feed closes or fails
+    host, port = address.rsplit(":", 1)
+    backoff = poll_seconds
+    while not stop.is_set():
+        try:
+            with socket.create_connection((host, int(port)), timeout=5) as sock:
+                sock.settimeout(poll_seconds)
+                backoff, partial = poll_seconds, b""
+                while not stop.is_set():
+                    try:
+                        chunk = sock.recv(max_bytes)
+                    except socket.timeout:
+                        continue
+                    if not chunk:
+                        break
+                    *lines, partial = (partial + chunk).split(b"\n")
+                    if lines:
+                        yield [line.decode("utf-8") for line in lines]
+        except OSError as e:
+            logger.warning("feed %s unavailable (%s); retrying in %.0fs", address, e, backoff)
+        if stop.wait(backoff):
+            return
+        backoff = min(backoff * 2, 30)
+
+
+def event_batches(source, stop, max_bytes=1 << 20, poll_seconds=0.2, follow=True):
+    """
+    Lists of raw event lines from a JSON-lines file or "tcp://host:port", about `max_bytes` at a time.
+
+    Parameters:
+        source (str): File path or socket address.
+        stop (threading.Event): Ends the iteration when set.
+        follow (bool): Keep waiting for new lines at the end of a file (a socket is always followed).
+    """
+    if source.startswith("tcp://"):
+        return _socket_batches(source[len("tcp://"):], stop, max_bytes, poll_seconds)
+    return _file_batches(source, stop, max_bytes, poll_seconds, follow)
+
+
+def parse_events(lines):
+    """
+    Event lines → (events frame with EVENT_FIELDS, number of unparseable lines).
+    Lines that aren't JSON objects or lack a numeric 'ts' are counted and skipped.
+    """
+    records, errors = [], 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            errors += 1
+    events = pd.DataFrame.from_records([r for r in records if isinstance(r, dict)], columns=EVENT_FIELDS)
+    errors += len(records) - len(events)
+    for col in ["ts", "dep_delay", "arr_delay"]:
+        events[col] = pd.to_numeric(events[col], errors="coerce")
+    valid = events["ts"].notna()
+    return events[valid], errors + int((~valid).sum())
+
+
+class FlightStatusFeed:
+    """
+    Background ingestion of a flight status stream into `RollingDelayWindows`.
+
+    A daemon thread reads batches of lines from `source` (see `event_batches`), parses them,
+    encodes airline and airports with the codebook (codes it doesn't know skip that dimension)
+    and adds them to `windows`. Readers (the Predictor) only ever take `windows.current` /
+    `windows.airline_delays`, which don't wait for parsing.
+
+    Parameters:
+        source (str): JSON-lines file or "tcp://host:port".
+        codebook (utils.encoding.CodeBook): Shared ids; appended codes never change existing ones.
+        windows (RollingDelayWindows, optional): Where events are counted.
+        follow (bool): For files, keep following the end (False: stop at the end, e.g. benchmarks).
+    """
+
+    def __init__(self, source, codebook, windows=None, follow=True):
+        self.source = source
+        self.codebook = codebook
+        self.windows = windows or RollingDelayWindows()
+        self.follow = follow
+        self.lines = 0
+        self.parse_errors = 0
+        self.busy_seconds = 0.0
+        self.started_at = pd.Timestamp.now()
+        self.last_event_ts = None
+        self.error = None
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="flight-status-feed", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            for lines in event_batches(self.source, self._stop, follow=self.follow):
+                start = time.perf_counter()
+                self.ingest(lines)
+                self.busy_seconds += time.perf_counter() - start
+        except Exception:
+            self.error = traceback.format_exc(limit=3)
+            logger.error("feed %s stopped:\n%s", self.source, self.error)
+
+    def ingest(self, lines):
+        events, errors = parse_events(lines)
+        self.lines += len(lines)
+        self.parse_errors += errors
+        if events.empty:
+            return
+        origin_ids = self.codebook.airport_ids(events["origin"])
+        route_ids = self.codebook.pack_routes(origin_ids, self.codebook.airport_ids(events["dest"]))
+        self.windows.add(events["ts"].to_numpy(), self.codebook.airline_ids(events["airline_name"]),
+                         origin_ids, route_ids, events["dep_delay"].to_numpy(), events["arr_delay"].to_numpy())
+        self.last_event_ts = float(events["ts"].max())
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        """Window stats plus lines read, parse errors, throughput while busy and lag behind the wall clock."""
+        stats = self.windows.stats()
+        stats.update({
+            "lines": self.lines,
+            "parse_errors": self.parse_errors,
+            "events_per_second": self.lines / self.busy_seconds if self.busy_seconds else None,
+            "lag_seconds": None if self.last_event_ts is None else time.time() - self.last_event_ts,
+        })
+        return stats
+
+
+def start_live_feed(codebook, source=FEED_SOURCE):
+    """Starts ingesting `source` once per process (shared by every session) and returns the feed."""
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            ensure_handler(logger)
+            _feed = FlightStatusFeed(source, codebook)
+            track("live delay windows", _feed.windows)
+        return _feed
+
+
+def live_feed():
+    """The running feed, or None until a Predictor session has started it."""
+    return _feed
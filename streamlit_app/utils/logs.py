@@ -0,0 +1,14 @@
+import logging
+
+
+def ensure_handler(logger, level=logging.INFO):
+    """
+    Gives `logger` a stderr handler at `level` if none is configured, so background threads'
+    log lines show up in the `streamlit run` output. Returns the logger.
+    """
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(level)
+    return logger
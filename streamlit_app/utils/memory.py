@@ -0,0 +1,302 @@
+import functools
+import logging
+import resource
+import sys
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.logs import ensure_handler
+
+logger = logging.getLogger("flight_delay.memory")
+
+# name → callable returning the object (a weakref, or a strong ref for objects that can't be weakly referenced)
+_tracked = {}
+# name → (id, change stamp, time measured, bytes), so unchanged objects aren't re-measured
+_sizes = {}
+# Objects are re-measured at least this often, for growth their lengths don't show (e.g. a full LRU)
+SIZE_TTL_SECONDS = 60
+# label → {'peak_rss', 'rss_growth', 'seconds', 'at'} of the latest run
+_peaks = {}
+_lock = threading.Lock()
+_log_thread = None
+
+
+# ------ Process memory ------
+def rss_bytes():
+    """Current resident set size of this process (Linux /proc; 0 where unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return 0
+
+
+def peak_rss_bytes():
+    """Highest RSS this process has reached since it started."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RSSSampler:
+    """
+    Background thread recording the peak RSS between start() and stop().
+
+    `ru_maxrss` only knows the lifetime peak; sampling gives the peak of one phase (a data
+    load, an aggregation, a load-test level). Also usable as a context manager.
+    """
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.start_rss = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_bytes())
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self.start_rss = self.peak = rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+        return self.peak
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+@contextmanager
+def record_peak(label):
+    """
+    Records the peak RSS, RSS growth and duration of the enclosed block under `label`.
+
+    Example:
+        with record_peak("flights load"):
+            df, _ = read_flights()
+    """
+    start = time.perf_counter()
+    with RSSSampler() as sampler:
+        yield sampler
+    with _lock:
+        _peaks[label] = {
+            "peak_rss": sampler.peak,
+            "rss_growth": sampler.peak - sampler.start_rss,
+            "seconds": time.perf_counter() - start,
+            "at": time.strftime("%H:%M:%S"),
+        }
+
+
+def measured(label):
+    """Decorator form of `record_peak`, for loaders and aggregations (stack it under st.cache_*)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with record_peak(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def recorded_peaks():
+    """Latest `record_peak` result per label, largest peak first."""
+    with _lock:
+        peaks = pd.DataFrame.from_dict(_peaks, orient="index")
+    if peaks.empty:
+        return peaks
+    return peaks.rename_axis("phase").sort_values("peak_rss", ascending=False).reset_index()
+
+
+# ------ Object sizes ------
+def deep_size(obj, _seen=None):
+    """
+    Bytes held by `obj` and everything it references, counting shared objects once.
+
+    DataFrames, Series and Indexes use pandas' deep memory usage (string contents included),
+    arrays their buffers and CSR matrices their three component arrays. Memory-mapped arrays
+    count as 0: their pages belong to the OS page cache, not to this process's heap.
+    Modules, classes and functions are not followed.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.memmap):
+        return 0
+    if isinstance(obj, np.ndarray):
+        # A view's buffer belongs to its base array, counted once through it
+        size = sys.getsizeof(obj) + (0 if obj.base is None else deep_size(obj.base, seen))
+        if obj.dtype == object:
+            size += sum(deep_size(item, seen) for item in obj.ravel())
+        return size
+    if sparse.issparse(obj):
+        return sum(deep_size(getattr(obj, part), seen) for part in ("data", "indices", "indptr") if hasattr(obj, part))
+    if isinstance(obj, (type, type(sys), type(deep_size))) or (callable(obj) and not hasattr(obj, "__dict__")):
+        return 0
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if isinstance(slot, str) and hasattr(obj, slot):
+            size += deep_size(getattr(obj, slot), seen)
+    return size
+
+
+def track(name, obj):
+    """
+    Registers a long-lived object (cached frame, lookup, pipeline, ...) for memory accounting.
+
+    Objects are held through a weak reference where possible, so tracking never keeps a
+    swapped-out or evicted object alive. Re-tracking a name replaces the previous object.
+    """
+    try:
+        ref = weakref.ref(obj)
+    except TypeError:
+        ref = lambda: obj
+    with _lock:
+        _tracked[name] = ref
+    return obj
+
+
+def _change_stamp(obj):
+    # Cheap growth signal: the length of the object and of each of its attributes (O(1) each)
+    stamp = []
+    for value in [obj, *getattr(obj, "__dict__", {}).values()]:
+        try:
+            stamp.append(len(value))
+        except Exception:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def tracked_sizes():
+    """
+    Deep size of every tracked object that is still alive.
+
+    A size is reused only while the object is the same one, its change stamp (its length and
+    its attributes' lengths) is unchanged and the measurement is under SIZE_TTL_SECONDS old,
+    so caches and per-request maps that grow are measured again.
+
+    Returns:
+        pd.DataFrame: 'object', 'type', 'bytes', largest first.
+    """
+    with _lock:
+        items = list(_tracked.items())
+
+    rows = []
+    for name, ref in items:
+        obj = ref()
+        if obj is None:
+            continue
+        stamp = (id(obj), _change_stamp(obj))
+        measured = _sizes.get(name)
+        if measured is None or measured[:2] != stamp or time.monotonic() - measured[2] > SIZE_TTL_SECONDS:
+            measured = (*stamp, time.monotonic(), deep_size(obj))
+            _sizes[name] = measured
+        rows.append({"object": name, "type": type(obj).__name__, "bytes": measured[3]})
+
+    sizes = pd.DataFrame(rows, columns=["object", "type", "bytes"])
+    return sizes.sort_values("bytes", ascending=False, ignore_index=True)
+
+
+# ------ Streamlit caches and sessions ------
+def streamlit_memory_stats():
+    """
+    Streamlit's own memory stats: st.cache_data entries and the session state of every
+    active session (the data behind the server's /_stcore/metrics endpoint).
+
+    Returns:
+        pd.DataFrame: 'category', 'name', 'bytes'. Empty outside a running Streamlit server.
+    """
+    columns = ["category", "name", "bytes"]
+    try:
+        from streamlit import runtime
+        if not runtime.exists():
+            return pd.DataFrame(columns=columns)
+        stats = runtime.get_instance().stats_mgr.get_stats()
+    except Exception:
+        return pd.DataFrame(columns=columns)
+
+    if isinstance(stats, dict):
+        stats = [stat for family in stats.values() for stat in family]
+    rows = [
+        {"category": stat.category_name, "name": stat.cache_name, "bytes": stat.byte_length}
+        for stat in stats if hasattr(stat, "byte_length")
+    ]
+    return pd.DataFrame(rows, columns=columns)
+
+
+def session_overhead(stats=None):
+    """Number of active sessions and their mean / max session-state bytes."""
+    stats = streamlit_memory_stats() if stats is None else stats
+    sessions = stats.loc[stats["category"] == "st_session_state", "bytes"]
+    return {
+        "sessions": len(sessions),
+        "mean_bytes": float(sessions.mean()) if len(sessions) else 0.0,
+        "max_bytes": int(sessions.max()) if len(sessions) else 0,
+    }
+
+
+# ------ Periodic log line ------
+def memory_log_line():
+    sizes = tracked_sizes()
+    stats = streamlit_memory_stats()
+    sessions = session_overhead(stats)
+    cached = stats.loc[stats["category"] != "st_session_state", "bytes"].sum()
+    return (
+        f"memory rss={rss_bytes() / 1e6:,.0f}MB peak={peak_rss_bytes() / 1e6:,.0f}MB "
+        f"tracked={sizes['bytes'].sum() / 1e6:,.1f}MB st_cache={cached / 1e6:,.1f}MB "
+        f"sessions={sessions['sessions']} per_session={sessions['mean_bytes'] / 1e3:,.0f}KB | "
+        + " ".join(f"{row.object}={row.bytes / 1e6:,.1f}MB" for row in sizes.head(6).itertuples())
+    )
+
+
+def start_memory_log(interval=300):
+    """
+    Logs `memory_log_line()` every `interval` seconds from a daemon thread (once per process).
+
+    The logger is 'flight_delay.memory'; it gets a stderr handler at INFO level if none is configured.
+    """
+    global _log_thread
+    with _lock:
+        if _log_thread is not None:
+            return
+        ensure_handler(logger)
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    logger.info(memory_log_line())
+                except Exception:
+                    logger.exception("memory accounting failed")
+
+        _log_thread = threading.Thread(target=run, name="memory-log", daemon=True)
+        _log_thread.start()
@@ -0,0 +1,402 @@
+import os
+
+import cloudpickle
+import numpy as np
+import pandas as pd
+import shap
+
+from utils.alternatives import score_batch
+from utils.artifacts import latest_model_path, load_model
+from utils.clusters import make_cluster_assigners
+from utils.data import LOOKUP_NAMES, load_lookups, lookup_fingerprint
+from utils.encoding import codebook_for
+from utils.explanations import to_dense, transformed_feature_names
+from utils.features import (time_score_map, month_score_map, dow_score_map, get_time_block, index_lookups,
+                            build_feature_frame)
+from utils.flight_summaries import load_flight_summaries
+from utils.memory import record_peak, track
+from utils.similar_routes import SimilarRouteIndex, route_feature_table
+
+
+# ------ Model and look up tables --------
+def artifact_fingerprint():
+    pipeline_path = latest_model_path("logreg_pipeline")
+    return (str(pipeline_path), os.path.getmtime(pipeline_path), lookup_fingerprint())
+
+
+def build_artifacts(version):
+    """
+    Loads everything a prediction needs for one artifact version (see `artifact_fingerprint`).
+
+    Returns:
+        dict: 'pipeline', 'lookups' (the four lookup frames), 'codebook', 'lookup_index'
+              (`index_lookups` output keyed by codebook ids, plus the dest/route cluster assigners)
+              'route_index' (`SimilarRouteIndex` for route suggestions) and 'shap_background'
+              (mean transformed features of a flight sample, for `get_shap_values`).
+
+    Only the lookups and the small flight summaries exported next to them are read, never the
+    flights themselves (see `utils.flight_summaries`).
+    """
+    with record_peak("artifact build"):
+        lookups = load_lookups()
+        summaries = load_flight_summaries()
+        codebook = codebook_for(summaries["route_rates"], lookups)
+        lookup_index = index_lookups(*lookups, codebook=codebook)
+
+        # Destinations/routes missing from the cluster lookups get the nearest centroid of their exported stats
+        stats = {"dest": summaries["dest_stats"], "route": summaries["route_stats"]}
+        lookup_index.update(make_cluster_assigners(stats, lookups[2], lookups[3]))
+
+        # Comparable routes sharing an airport, for the route_density recommendation
+        route_index = SimilarRouteIndex(route_feature_table(summaries["route_rates"], lookups[1], lookups[3], codebook))
+
+        pipeline = load_model(version[0])
+        shap_background = shap_background_for(pipeline, summaries["shap_background"], lookup_index)
+
+    # Memory accounting: re-tracking on a hot swap replaces the previous version's entries
+    track("pipeline", pipeline)
+    for name, frame in zip(LOOKUP_NAMES, lookups):
+        track(f"lookup: {name}", frame)
+    for name, index in lookup_index.items():
+        if name != "codebook":
+            track(f"lookup index: {name}", index)
+    track("codebook", codebook)
+    track("similar route index", route_index)
+
+    return {
+        "pipeline": pipeline,
+        "lookups": lookups,
+        "codebook": codebook,
+        "lookup_index": lookup_index,
+        "route_index": route_index,
+        "shap_background": shap_background,
+    }
+
+
+def shap_background_for(pipeline, sample, lookup_index):
+    """
+    Mean preprocessed feature vector of a random sample of flights (the exported
+    'shap_background'): the reference that per-prediction SHAP values are measured against
+    (each value is the feature's contribution relative to a typical flight).
+    """
+    codebook = lookup_index["codebook"]
+    raw = pd.DataFrame({
+        "airline_name": sample["airline_name"].to_numpy(),
+        "route": codebook.route_labels(codebook.route_ids(sample["origin"], sample["dest"])),
+        "month": sample["month"].to_numpy(),
+        "day_of_week": sample["day_of_week"].to_numpy(),
+        "dep_hour": sample["hour"].to_numpy(),
+    })
+    X = pipeline.named_steps['preprocessor'].transform(build_feature_frame(raw, lookup_index))
+    return to_dense(X).mean(axis=0, keepdims=True)
+
+
+def with_live_airline_delays(artifacts, live, min_flights=20):
+    """
+    The artifacts with the airline lookup's 2023 delay averages replaced by the live feed's
+    window means (`utils.live_delays.RollingDelayWindows.airline_delays`), wherever an airline
+    has `min_flights` flights in the window.
+
+    Live means are clipped to the range of the lookup column (and at least 0, since the model
+    square-roots these features), so a window of early departures can't leave its domain.
+    Single predictions, the alternatives search and route suggestions all read the same
+    'lookup_index', so they see the same values. Route density keeps its 2023 value: a few
+    hours of departures don't estimate a yearly route total.
+    """
+    lookup_index = artifacts["lookup_index"]
+    airline = lookup_index["airline"].copy()
+    live_means = live.airline_delays(airline.index.to_numpy(), min_flights)
+    for col in ["airline_avg_dep_delay", "airline_avg_arr_delay"]:
+        trained = artifacts["lookups"][0][col]
+        values = live_means[col].to_numpy().clip(max(trained.min(), 0), trained.max())
+        airline[col] = np.where(np.isnan(values), airline[col].to_numpy(), values)
+    return dict(artifacts, lookup_index=dict(lookup_index, airline=airline))
+
+
+# ------- Mapping Functions
+# Lookup indexes are keyed by codebook ids (unknown ids are -1 and miss, as unknown strings did)
+def map_airline_delay_features(artifacts, airline_name):
+    airline_id = artifacts["codebook"].airline_ids([airline_name])[0]
+    row = artifacts["lookup_index"]["airline"].reindex([airline_id]).iloc[0]
+    return (
+        row['airline_avg_arr_delay'] if pd.notna(row['airline_avg_arr_delay']) else 0,
+        row['airline_avg_dep_delay'] if pd.notna(row['airline_avg_dep_delay']) else 0
+    )
+
+
+def map_route_dist(artifacts, route_id):
+    row = artifacts["lookup_index"]["route"].reindex([route_id]).iloc[0]
+    return(
+        row['route_density'] if pd.notna(row['route_density']) else 0,
+        row['dist_haul'] if pd.notna(row['dist_haul']) else 0,
+        row['distance'] if pd.notna(row['distance']) else 0
+    )
+
+
+def map_dest_cluster(artifacts, dest):
+    dest_id = artifacts["codebook"].airport_ids([dest])[0]
+    cluster = artifacts["lookup_index"]["dest"].get(dest_id)
+    return cluster if cluster is not None else artifacts["lookup_index"]["dest_assigner"](dest)
+
+
+def map_route_cluster(artifacts, route, route_id):
+    cluster = artifacts["lookup_index"]["route_cluster"].get(route_id)
+    return cluster if cluster is not None else artifacts["lookup_index"]["route_assigner"](route)
+
+
+# ------------ Preprocessing User's Input ----------
+def preprocess_user_input(artifacts, user_input_dict):
+    # Extract airline and route
+    airline = user_input_dict.pop("airline_name")
+    route = user_input_dict.pop("route")
+
+    # Split route into origin and destination, and encode it
+    origin, dest = route.split(" - ")
+    route_id = artifacts["codebook"].route_ids([origin], [dest])[0]
+
+    # Map airline and route-level features
+    arr_avg, dep_avg = map_airline_delay_features(artifacts, airline)
+    route_density, dist_haul, distance = map_route_dist(artifacts, route_id)
+
+    # Map destination and route clusters
+    dest_cluster = map_dest_cluster(artifacts, dest)
+    route_cluster = map_route_cluster(artifacts, route, route_id)
+
+    # Derived feature: is_redeye
+    dep_hour = user_input_dict.get("dep_hour", 12)
+    is_redeye = int(dep_hour >= 22 or dep_hour <= 5)
+
+    # Time block → score
+    time_block = get_time_block(dep_hour)
+    time_block_score = time_score_map.get(time_block, 4)
+
+    # Month & Day of Week scores
+    month = user_input_dict.get("month", "Jan")
+    day_of_week = user_input_dict.get("day_of_week", 'Mon')
+
+    month_score = month_score_map.get(month, 6)
+    dow_score = dow_score_map.get(day_of_week, 4)
+
+    # Add all new features
+    user_input_dict.update({
+        "origin": origin,
+        "dest": dest,
+        "dist_haul": dist_haul,
+        "airline_avg_arr_delay": arr_avg,
+        "airline_avg_dep_delay": dep_avg,
+        "route_density": route_density,
+        "dest_cluster": dest_cluster,
+        "route_cluster": route_cluster,
+        "is_redeye": is_redeye,
+        "time_block_score": time_block_score,
+        "month_delay_score": month_score,
+        "dow_delay_score": dow_score,
+        "distance": distance
+    })
+
+    # Convert to DataFrame
+    df = pd.DataFrame([user_input_dict])
+
+    return df
+
+
+# ------ SHAP Values -------
+def get_shap_values(pipeline, df_input, background, pipeline_path=None):
+    """
+    SHAP values of each output for one preprocessed flight, relative to `background`
+    (see `shap_background_for`), and the preprocessed feature names.
+    """
+    if pipeline_path is not None:
+        with open(pipeline_path, "rb") as f:
+            pipeline = cloudpickle.load(f)
+
+    preprocessor = pipeline.named_steps['preprocessor']
+    multi_clf = pipeline.named_steps['classifier']
+
+    # Transform input to numeric features
+    X_transformed = preprocessor.transform(df_input)
+
+    shap_values_dict = {}
+
+    # Explain each estimator inside MultiOutputClassifier
+    for i, estimator in enumerate(multi_clf.estimators_):
+        explainer = shap.LinearExplainer(estimator, background, feature_perturbation="interventional")
+        shap_values = explainer.shap_values(X_transformed)
+        shap_values_dict[i] = shap_values
+
+    # Feature names after preprocessing (FunctionTransformer columns keep their input names)
+    return shap_values_dict, transformed_feature_names(preprocessor)
+
+
+# ------ Similar, less delay-prone routes -------
+def suggest_routes(artifacts, user_input, k=3, candidates=12, route_airlines=None):
+    """
+    Comparable routes from the same origin or into the same destination with a lower predicted
+    delay risk for the user's airline, month, day and hour.
+
+    The `candidates` nearest routes (by delay rates, density, distance and cluster) are scored in
+    one batch together with the user's own route; risk is the mean of the two delay probabilities.
+    With `route_airlines` ("ORIGIN - DEST" → airlines flying it), only routes the user's airline
+    operates are candidates.
+
+    Returns:
+        list: Up to `k` (route, risk) pairs, most similar first, each below `current_risk`.
+        current_risk (float or None): Risk of the user's route (None for routes without history).
+    """
+    codebook = artifacts["codebook"]
+    route_id = codebook.parse_routes([user_input["route"]])[0]
+    # Search deeper when filtering by airline, so enough operated routes remain
+    candidate_ids, _ = artifacts["route_index"].query(route_id, k=candidates if route_airlines is None else 4 * candidates)
+    labels = list(codebook.route_labels(candidate_ids))
+    if route_airlines is not None:
+        labels = [label for label in labels if user_input["airline_name"] in route_airlines.get(label, ())]
+    labels = labels[:candidates]
+    if not labels:
+        return [], None
+
+    routes = [user_input["route"]] + labels
+    raw = pd.DataFrame({
+        "airline_name": user_input["airline_name"],
+        "route": routes,
+        "month": user_input["month"],
+        "day_of_week": user_input["day_of_week"],
+        "dep_hour": int(user_input["dep_hour"]),
+    })
+    risk = score_batch(artifacts["pipeline"], build_feature_frame(raw, artifacts["lookup_index"])).mean(axis=1)
+
+    better = [(route, route_risk) for route, route_risk in zip(routes[1:], risk[1:]) if route_risk < risk[0]]
+    return better[:k], risk[0]
+
+
+def generate_recommendations(shap_values_dict, feature_names, df_input, model_preds, threshold=0.01,
+                             route_suggestions=None):
+    """
+    Parameters:
+        route_suggestions (callable, optional): Returns `suggest_routes` output; only called when
+            route_density is what drives a predicted delay, to name concrete alternatives.
+    """
+    all_recommendations = {}
+
+    # Extract input values once
+    val_dep_hour = df_input["dep_hour"].values[0]
+    val_dist_haul = df_input["dist_haul"].values[0]
+    val_month = df_input["month_delay_score"].values[0]
+    val_day = df_input["dow_delay_score"].values[0]
+    val_airline_arr = df_input["airline_avg_arr_delay"].values[0]
+    val_airline_dep = df_input["airline_avg_dep_delay"].values[0]
+    val_route_density = df_input["route_density"].values[0]
+    val_is_redeye = df_input["is_redeye"].values[0]
+
+    feature_msgs = {
+        "dep_hour": (
+            f"Your flight's scheduled departure hour ({val_dep_hour}:00) makes it a candidate for delay.",
+            "Consider booking flights earlier or later to avoid peak delay times."
+        ),
+        "is_redeye": (
+            "Your flight is a red-eye flight, which tends to have a higher risk of delay." if val_is_redeye else "Your flight is not a red-eye flight, which usually helps avoid delays.",
+            "If possible, consider non-red-eye flights for better punctuality."
+        ),
+        "airline_avg_arr_delay": (
+            f"The airline you chose has an average arrival delay of {val_airline_arr:.1f} minutes historically.",
+            "Trying a different airline might reduce your delay risk."
+        ),
+        "airline_avg_dep_delay": (
+            f"The airline you chose has an average departure delay of {val_airline_dep:.1f} minutes historically.",
+            "Trying a different airline might reduce your delay risk."
+        ),
+        "route_density": (
+            f"This route has a traffic density score of {val_route_density}, indicating heavy traffic which can increase delay chances.",
+            "Flying on less busy routes could improve your chances of on-time flights."
+        ),
+        "month_delay_score": (
+            "This month tends to experience more delays historically.",
+            "If your travel is flexible, consider off-peak months."
+        ),
+        "dow_delay_score": (
+            "Flights on this day of the week tend to be more prone to delays.",
+            "Traveling on less busy days may reduce delay risk."
+        ),
+        "dist_haul": (
+            f"Your flight is classified as a '{val_dist_haul}' haul, which affects delay likelihood.",
+            "Sometimes shorter or longer haul flights have different risk patterns."
+        ),
+    }
+
+    # Concrete alternatives for the route_density advice, looked up at most once
+    suggested = None
+
+    def route_density_advice():
+        nonlocal suggested
+        if suggested is None:
+            suggested = route_suggestions() if route_suggestions is not None else ([], None)
+        better, current_risk = suggested
+        if not better:
+            return feature_msgs["route_density"][1]
+        origin, dest = df_input["origin"].values[0], df_input["dest"].values[0]
+        return (
+            f"Comparable routes from {origin} or into {dest} with a lower predicted delay risk "
+            f"(yours: {current_risk:.0%}): "
+            + ", ".join(f"{route} ({route_risk:.0%})" for route, route_risk in better) + "."
+        )
+
+    for output_index, shap_values in shap_values_dict.items():
+        pred = model_preds[output_index]
+        shap_frame = pd.DataFrame({
+            'feature': feature_names,
+            'shap_value': shap_values[0]
+        })
+
+        if pred == 1:
+            # Get feature with highest absolute SHAP value above threshold
+            top_feature = shap_frame.loc[
+                shap_frame['shap_value'].abs() > threshold
+            ].sort_values(by="shap_value", key=abs, ascending=False).head(1)
+
+            if not top_feature.empty:
+                feat = top_feature.iloc[0]['feature']
+                if feat in feature_msgs:
+                    msg1, msg2 = feature_msgs[feat]
+                    if feat == "route_density":
+                        msg2 = route_density_advice()
+                    all_recommendations[output_index] = [
+                        f"• {msg1}",
+                        f"  👉 {msg2}"
+                    ]
+                else:
+                    all_recommendations[output_index] = ["Delay risk identified, but no specific recommendation available."]
+            else:
+                all_recommendations[output_index] = ["Delay predicted, but no major risk factor stood out."]
+        else:
+            all_recommendations[output_index] = ["No major delay factors identified."]
+
+    return all_recommendations
+
+
+def predict_and_explain(artifacts, user_input, on_error=None, route_airlines=None):
+    """
+    Preprocess, predict and explain one flight: the Predictor page's full submission path.
+
+    Parameters:
+        artifacts (dict): Output of `build_artifacts`.
+        user_input (dict): 'airline_name', 'route', 'month', 'day_of_week', 'dep_hour'.
+        on_error (callable, optional): Called with the exception when prediction fails.
+        route_airlines (dict, optional): Route → airlines flying it, to limit route suggestions
+            to routes the user's airline operates (see `suggest_routes`).
+
+    Returns:
+        tuple or None: (df_input, prediction, recommendations), or None if prediction fails.
+    """
+    df_input = preprocess_user_input(artifacts, dict(user_input))
+    try:
+        prediction = artifacts["pipeline"].predict(df_input)  # e.g. [[1, 0]]
+    except Exception as e:
+        if on_error is not None:
+            on_error(e)
+        return None
+
+    shap_values_dict, feature_names = get_shap_values(artifacts["pipeline"], df_input, artifacts["shap_background"])
+    recommendations = generate_recommendations(
+        shap_values_dict, feature_names, df_input, prediction[0],
+        route_suggestions=lambda: suggest_routes(artifacts, user_input, route_airlines=route_airlines)
+    )
+    return df_input, prediction, recommendations
@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+
+
+def normalize_flight_input(airline_name, route, month, day_of_week, dep_hour):
+    """
+    Canonical cache key for one Predictor submission.
+
+    Whitespace and case differences in the route ("ewr-atl", "EWR - ATL") map to the same key.
+    """
+    origin, dest = [code.strip().upper() for code in route.replace(" - ", "-").split("-", 1)]
+    return (
+        airline_name.strip(),
+        f"{origin} - {dest}",
+        month.strip().title(),
+        day_of_week.strip().title(),
+        int(dep_hour),
+    )
+
+
+class PredictionCache:
+    """
+    Thread-safe, size-bounded LRU cache for prediction + explanation results.
+
+    Every lookup carries a version (e.g. model artifact path and mtime plus lookup-table hash)
+    and entries are keyed by (version, key), so results from an old model are never served.
+    A version switch drops nothing: during a hot swap, sessions still on the old version keep
+    their hits, and old entries age out through the LRU. `None` results (failed predictions)
+    are not cached.
+
+    Parameters:
+        maxsize (int): Maximum number of entries kept.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, version, compute):
+        """
+        Returns the cached value for `key`, computing and storing it on a miss.
+
+        `compute` runs outside the lock, so a slow prediction doesn't block other sessions.
+        """
+        entry_key = (version, key)
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return self._entries[entry_key]
+            self.misses += 1
+
+        value = compute()
+        if value is None:
+            return value
+
+        with self._lock:
+            self._entries[entry_key] = value
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
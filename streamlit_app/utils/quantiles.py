@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class DelaySketch:
+    """
+    Mergeable quantile sketch (DDSketch-style) for delay minutes, kept for many keys at once.
+
+    Values are counted in log-spaced buckets, so any quantile is returned within a relative
+    error of `relative_accuracy` of the exact value (|x| < 1 minute is counted as 0; delays
+    are whole minutes, so this only affects 0). Memory grows with the number of distinct
+    buckets per key, not with the number of flights.
+
+    Parameters:
+        key_cols (list): Columns that identify a sketch, e.g. ['origin', 'dest', 'airline_name', 'month'].
+        relative_accuracy (float): Target relative error for quantile queries.
+    """
+
+    def __init__(self, key_cols, relative_accuracy=0.01):
+        self.key_cols = list(key_cols)
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        # Count per (key..., bucket); None until the first chunk arrives
+        self.counts = None
+
+    # ----- Buckets -----
+    def _bucket(self, values):
+        # Signed bucket ids keep the same order as the values: negatives < 0 < positives
+        magnitude = np.abs(values)
+        k = np.ceil(np.log(np.maximum(magnitude, 1.0)) / self._log_gamma).astype(np.int64) + 1
+        return np.where(magnitude < 1, 0, np.sign(values).astype(np.int64) * k)
+
+    def _bucket_value(self, buckets):
+        # Representative value for each bucket, within relative_accuracy of anything in it
+        k = np.abs(buckets) - 1
+        value = 2 * self.gamma ** k / (self.gamma + 1)
+        return np.where(buckets == 0, 0.0, np.sign(buckets) * value)
+
+    # ----- Building -----
+    def update(self, chunk, value_col):
+        """
+        Adds one chunk of flights to the sketch. Rows with a missing value are skipped.
+
+        Parameters:
+            chunk (pd.DataFrame): Must contain the key columns and `value_col`.
+            value_col (str): Column with delay minutes, e.g. 'dep_delay'.
+        """
+        chunk = chunk.loc[chunk[value_col].notna(), self.key_cols + [value_col]]
+        if chunk.empty:
+            return self
+
+        buckets = self._bucket(chunk[value_col].to_numpy(dtype=float))
+        chunk_counts = (
+            chunk[self.key_cols]
+            .assign(bucket=buckets)
+            .groupby(self.key_cols + ['bucket'], observed=True)
+            .size()
+            .astype(float)
+        )
+        self._add_counts(chunk_counts)
+        return self
+
+    def _add_counts(self, counts):
+        if self.counts is None:
+            self.counts = counts
+        elif counts is not None:
+            self.counts = self.counts.add(counts, fill_value=0)
+
+    def merge(self, other):
+        """Adds another sketch with the same keys and accuracy into this one."""
+        if other.key_cols != self.key_cols or other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketches must share key columns and relative accuracy to be merged.")
+        self._add_counts(other.counts)
+        return self
+
+    def rollup(self, key_cols):
+        """
+        Merges sketches up to a coarser key, e.g. route × airline × month → airline.
+
+        Returns:
+            DelaySketch: New sketch keyed by `key_cols` (a subset of this sketch's keys).
+        """
+        missing = set(key_cols) - set(self.key_cols)
+        if missing:
+            raise ValueError(f"Cannot roll up to keys not in the sketch: {sorted(missing)}")
+
+        rolled = DelaySketch(key_cols, self.relative_accuracy)
+        if self.counts is not None:
+            rolled.counts = self.counts.groupby(level=list(key_cols) + ['bucket'], observed=True).sum()
+        return rolled
+
+    def subset(self, selection):
+        """
+        Keeps only keys whose levels are in the selected values, e.g. {'month': ['Jun', 'Jul']}.
+
+        Columns that aren't sketch keys, and empty selections, are ignored.
+
+        Returns:
+            DelaySketch: New sketch with the same keys.
+        """
+        subset = DelaySketch(self.key_cols, self.relative_accuracy)
+        if self.counts is None:
+            return subset
+
+        keep = np.ones(len(self.counts), dtype=bool)
+        for col, values in selection.items():
+            if col in self.key_cols and len(values):
+                keep &= self.counts.index.get_level_values(col).isin(values)
+        subset.counts = self.counts[keep]
+        return subset
+
+    # ----- Queries -----
+    def quantiles(self, qs=DEFAULT_QUANTILES):
+        """
+        Approximate quantiles for every key.
+
+        Uses the lower rank convention, i.e. the value at sorted position floor(q * (n - 1)),
+        which matches `np.quantile(..., method='lower')`.
+
+        Returns:
+            pd.DataFrame: One row per key, one column per quantile (named 'p50', 'p90', ...).
+        """
+        if self.counts is None:
+            return pd.DataFrame(columns=[f"p{q * 100:g}" for q in qs])
+
+        counts = self.counts[self.counts > 0].sort_index()
+        frame = counts.rename('count').reset_index()
+
+        cumulative = frame.groupby(self.key_cols, observed=True)['count'].cumsum().to_numpy()
+        totals = frame.groupby(self.key_cols, observed=True)['count'].transform('sum').to_numpy()
+        values = self._bucket_value(frame['bucket'].to_numpy())
+
+        result = frame[self.key_cols].drop_duplicates().set_index(self.key_cols)
+        for q in qs:
+            rank = np.floor(q * (totals - 1))
+            hit = frame.loc[cumulative > rank, self.key_cols].assign(value=values[cumulative > rank])
+            first_hit = hit.drop_duplicates(self.key_cols).set_index(self.key_cols)['value']
+            result[f"p{q * 100:g}"] = first_hit.reindex(result.index).to_numpy()
+
+        return result
+
+    def count(self):
+        """Number of values per key."""
+        if self.counts is None:
+            return pd.Series(dtype=float)
+        return self.counts.groupby(level=self.key_cols, observed=True).sum()
+
+
+def build_delay_sketches(chunks, key_cols, value_cols=('dep_delay', 'arr_delay'), relative_accuracy=0.01):
+    """
+    Builds one sketch per delay column in a single streaming pass.
+
+    Parameters:
+        chunks (iterable of pd.DataFrame): e.g. `pd.read_csv(path, chunksize=500_000)`.
+        key_cols (list): Finest key to keep; coarser keys come from `DelaySketch.rollup`.
+        value_cols (tuple): Delay columns to sketch.
+        relative_accuracy (float): Target relative error.
+
+    Returns:
+        dict: value column → DelaySketch.
+    """
+    sketches = {col: DelaySketch(key_cols, relative_accuracy) for col in value_cols}
+    for chunk in chunks:
+        for col, sketch in sketches.items():
+            sketch.update(chunk, col)
+    return sketches
+
+
+def quantile_features(frame, sketch, value_col, qs=DEFAULT_QUANTILES):
+    """
+    Joins sketch quantiles onto rows as model features, e.g. 'arr_delay_p90'.
+
+    Keys missing from the sketch get NaN so the caller can choose a fallback.
+
+    Returns:
+        pd.DataFrame: `frame` with one extra column per quantile.
+    """
+    quantiles = sketch.quantiles(qs)
+    quantiles.columns = [f"{value_col}_{col}" for col in quantiles.columns]
+    return frame.merge(quantiles, left_on=sketch.key_cols, right_index=True, how='left')
+
+
+def add_quantile_features(flights_df, train_frac=0.8, key_cols=('origin', 'dest', 'airline_name'),
+                          value_cols=('dep_delay', 'arr_delay'), qs=DEFAULT_QUANTILES):
+    """
+    Adds per route × airline delay quantiles as model features, e.g. 'arr_delay_p90'.
+
+    Sketches are built from the first `train_frac` of rows only (the time split's training
+    rows, see `utils.training.time_split`), so test rows never inform their own features.
+    Keys without training flights get the overall training quantile.
+
+    Returns:
+        pd.DataFrame: `flights_df` (same row order) with one column per delay column and quantile.
+    """
+    train = flights_df.iloc[:int(train_frac * len(flights_df))]
+    sketches = build_delay_sketches([train], list(key_cols), value_cols)
+    for col, sketch in sketches.items():
+        flights_df = quantile_features(flights_df, sketch, col, qs)
+        for q in qs:
+            name = f"{col}_p{q * 100:g}"
+            flights_df[name] = flights_df[name].fillna(train[col].quantile(q, interpolation='lower'))
+    return flights_df
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def route_delay_scores(flights_df):
+    """
+    Route-level delay rate and delay score keyed by origin and destination codes.
+
+    Uses the same rounding as the EDA page's `route_delay` table, but groups on the two
+    airport columns instead of a concatenated route string.
+
+    Returns:
+        pd.DataFrame: One row per (origin, dest) pair.
+    """
+    routes = (
+        flights_df.groupby(['origin', 'dest'], observed=True).agg({
+            'dep_delayed_15': 'mean',
+            'arr_delayed_15': 'mean',
+            'flight': 'count',
+            'dep_delay': 'mean',
+            'arr_delay': 'mean'
+        }).round(2).reset_index()
+    )
+
+    routes.columns = [
+        'Origin',
+        'Destination',
+        'Departure Delay ≥15m',
+        'Arrival Delay ≥15m',
+        'Total Flights',
+        'Avg Dep Delay',
+        'Avg Arr Delay'
+    ]
+
+    routes['Delay Rate'] = ((routes['Departure Delay ≥15m'] + routes['Arrival Delay ≥15m']) / 2).round(2)
+    routes['Delay Score'] = (routes['Delay Rate'] * (routes['Avg Dep Delay'] + routes['Avg Arr Delay'])).round(2)
+
+    return routes
+
+
+def build_route_matrix(flights_df, codebook):
+    """
+    Precomputes a sparse destination × origin matrix over the codebook's airport ids.
+
+    Both axes use the shared airport ids (utils.encoding), so the heatmap's ids are the same
+    as everywhere else in the app. The sparse matrix stores, for each route that exists, its
+    row number in the pair table plus one, so explicit zero scores stay distinguishable from
+    routes that are not flown.
+
+    Parameters:
+        flights_df (pd.DataFrame): Flights with 'origin' and 'dest' (codes or encoded categoricals).
+        codebook (CodeBook): Covers every airport in the flights.
+
+    Returns:
+        dict:
+            'airports' (np.ndarray): Airport code for each id (the codebook's).
+            'routes' (pd.DataFrame): Route table with 'origin_id' and 'dest_id' columns.
+            'index' (scipy.sparse.csr_matrix): Shape (n_airports, n_airports), rows = destination, cols = origin.
+    """
+    routes = route_delay_scores(flights_df)
+    routes['origin_id'] = codebook.airport_ids(routes['Origin'])
+    routes['dest_id'] = codebook.airport_ids(routes['Destination'])
+
+    airports = codebook.airports.to_numpy()
+    index = sparse.csr_matrix(
+        (np.arange(1, len(routes) + 1), (routes['dest_id'], routes['origin_id'])),
+        shape=(len(airports), len(airports))
+    )
+
+    return {'airports': airports, 'routes': routes, 'index': index}
+
+
+def _ranked_ids(ids, weights, n_airports):
+    # Airports that appear on this axis, heaviest first
+    totals = np.bincount(ids, weights=weights, minlength=n_airports)
+    present = np.flatnonzero(np.bincount(ids, minlength=n_airports))
+    return present[np.argsort(-totals[present], kind='stable')]
+
+
+def slice_route_matrix(route_matrix, value='Delay Score', top_dest=None, dest_offset=0,
+                       top_origin=None, rank_by='Total Flights'):
+    """
+    Cuts a small dense window out of the sparse route matrix for plotting.
+
+    Destinations and origins are ranked by `rank_by` (summed over their routes); the window keeps
+    `top_dest` destinations starting at `dest_offset` and the first `top_origin` origins.
+    Labels are returned in alphabetical order.
+
+    Parameters:
+        route_matrix (dict): Output of `build_route_matrix`.
+        value (str): Route column to place in the cells.
+        top_dest (int or None): Destinations per window. None keeps all.
+        dest_offset (int): Start of the destination window in the ranking.
+        top_origin (int or None): Origins to keep. None keeps all.
+        rank_by (str): Route column used to rank airports.
+
+    Returns:
+        pd.DataFrame: Destination × origin values, NaN where no route exists.
+    """
+    airports = route_matrix['airports']
+    routes = route_matrix['routes']
+    n_airports = len(airports)
+    weights = routes[rank_by].to_numpy(dtype=float)
+
+    dest_ids = _ranked_ids(routes['dest_id'].to_numpy(), weights, n_airports)
+    origin_ids = _ranked_ids(routes['origin_id'].to_numpy(), weights, n_airports)
+
+    dest_end = None if top_dest is None else dest_offset + top_dest
+    # Codebook ids follow insertion order, not the alphabet: sort the window by code
+    dest_ids = dest_ids[dest_offset:dest_end]
+    dest_ids = dest_ids[np.argsort(airports[dest_ids], kind='stable')]
+    origin_ids = origin_ids[:top_origin]
+    origin_ids = origin_ids[np.argsort(airports[origin_ids], kind='stable')]
+
+    window = route_matrix['index'][dest_ids][:, origin_ids].tocoo()
+
+    cells = np.full((len(dest_ids), len(origin_ids)), np.nan)
+    cells[window.row, window.col] = routes[value].to_numpy()[window.data - 1]
+
+    return pd.DataFrame(
+        cells,
+        index=pd.Index(airports[dest_ids], name='Destination'),
+        columns=pd.Index(airports[origin_ids], name='Origin')
+    )
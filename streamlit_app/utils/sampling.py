@@ -0,0 +1,85 @@
+import time
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregation import Dimension
+
+# Strata of the EDA preview: filters on month, airline or origin keep or drop whole strata
+PREVIEW_STRATA = ['month', 'airline_name', 'origin']
+
+
+class StratifiedSample:
+    """
+    A stratified random sample of row positions with Horvitz–Thompson weights.
+
+    Each stratum (e.g. month × airline × origin) gets `min_per_stratum` rows (all of its rows if
+    it is smaller), so thin strata still yield estimates, plus a share of the rest of `size`
+    proportional to its rows. `size` bounds the expected sample: with more strata than
+    size / min_per_stratum, the per-stratum minimum is scaled down to size / strata. Rows are drawn independently with their stratum's probability:
+    one vectorized pass (a bincount and a uniform draw), with no sort of the data.
+
+    Weights are 1 / probability, so weighted sums over the sample estimate totals over the
+    data, and any filter that keeps or drops whole strata is estimated within those strata only.
+
+    Parameters:
+        strata (np.ndarray): Stratum code per row in [0, n_strata); -1 rows form their own stratum.
+        n_strata (int): Number of stratum codes.
+        size (int): Target sample size.
+        min_per_stratum (int): Minimum expected rows per stratum.
+        seed (int): Random seed (the sample is drawn once and reused).
+    """
+
+    def __init__(self, strata, n_strata, size=200_000, min_per_stratum=50, seed=0):
+        strata = np.where(np.asarray(strata) < 0, n_strata, strata)
+        counts = np.bincount(strata, minlength=n_strata + 1)
+        n_rows = counts.sum()
+
+        minimum = min(min_per_stratum, size / max(np.count_nonzero(counts), 1))
+        target = minimum + (size - minimum * np.count_nonzero(counts)) * counts / max(n_rows, 1)
+        probability = np.minimum(1.0, target / np.maximum(counts, 1))
+
+        row_probability = probability[strata]
+        self.rows = np.flatnonzero(np.random.default_rng(seed).random(len(strata)) < row_probability)
+        self.weights = 1.0 / row_probability[self.rows]
+        self.n_rows = int(n_rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def nbytes(self):
+        return self.rows.nbytes + self.weights.nbytes
+
+
+def stratified_sample(df, strata_cols=PREVIEW_STRATA, **kwargs):
+    """A `StratifiedSample` of the rows of `df` over every combination of `strata_cols`."""
+    strata = reduce(Dimension.cross, [Dimension.of(df[col]) for col in strata_cols])
+    return StratifiedSample(strata.codes, strata.n, **kwargs)
+
+
+def write_sample(df, sample, path):
+    """
+    Saves the sampled rows of `df` with their weights (a 'weight' column) as one Parquet file,
+    so the sample can be read back without touching the full data.
+    """
+    df.take(sample.rows).assign(weight=sample.weights).to_parquet(path, index=False)
+
+
+def read_sample(path, columns=None):
+    """
+    Reads a sample saved by `write_sample`.
+
+    Parameters:
+        path (str): Parquet file.
+        columns (list, optional): Columns to read (the weights are always read).
+
+    Returns:
+        df (pd.DataFrame): The sampled rows.
+        weights (np.ndarray): Horvitz–Thompson weight per row.
+        seconds (float): Read time.
+    """
+    start = time.perf_counter()
+    df = pd.read_parquet(path, columns=None if columns is None else list(columns) + ['weight'])
+    weights = df.pop('weight').to_numpy()
+    return df, weights, time.perf_counter() - start
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+# Per-route features the similarity is measured on (counts and miles on a log scale, as in training)
+ROUTE_FEATURES = ['dep_rate', 'arr_rate', 'route_density', 'distance']
+LOG_FEATURES = ['route_density', 'distance']
+
+
+def route_feature_table(route_rates, route_dist_lookup, route_cluster_lookup, codebook):
+    """
+    One row per route flown: delay rates from the flights, density and distance from the
+    route_dist lookup, and the route cluster. Indexed by packed route id (utils.encoding).
+
+    Parameters:
+        route_rates (pd.DataFrame): 'origin', 'dest', 'dep_rate' and 'arr_rate' per route, as
+                                    exported by `utils.flight_summaries`.
+        route_dist_lookup, route_cluster_lookup (pd.DataFrame): As loaded by `utils.data.load_lookups`.
+        codebook (utils.encoding.CodeBook): Shared ids.
+
+    Returns:
+        pd.DataFrame: ROUTE_FEATURES, 'route_cluster' (-1 when unclustered), 'origin_id', 'dest_id'.
+    """
+    route_ids = codebook.route_ids(route_rates['origin'], route_rates['dest'])
+    rates = route_rates[['dep_rate', 'arr_rate']].set_axis(route_ids).groupby(level=0).mean()
+
+    def by_route_id(lookup, cols):
+        lookup = lookup.assign(route_id=codebook.parse_routes(lookup['route']))
+        return lookup[lookup['route_id'] >= 0].drop_duplicates('route_id').set_index('route_id')[cols]
+
+    table = rates[rates.index >= 0].join(by_route_id(route_dist_lookup, ['route_density', 'distance']), how='inner')
+    table = table.join(by_route_id(route_cluster_lookup, ['route_cluster']), how='left')
+    table['route_cluster'] = table['route_cluster'].fillna(-1).astype(int)
+    table['origin_id'], table['dest_id'] = codebook.unpack_routes(table.index.to_numpy())
+    return table
+
+
+class SimilarRouteIndex:
+    """
+    Nearest comparable routes that share the origin or the destination of a given route.
+
+    Each route is a standardized vector of ROUTE_FEATURES plus its cluster (one-hot). One
+    KD-tree is built per airport over the routes departing from or arriving at it, so a query
+    searches two small trees (the route's origin and destination) instead of filtering the
+    neighbours of a global search. Queries return ids only and take tens of microseconds;
+    ranking by predicted delay is left to the caller (`utils.prediction.suggest_routes`).
+
+    Parameters:
+        table (pd.DataFrame): Output of `route_feature_table`.
+        leaf_size (int): KD-tree leaf size.
+    """
+
+    def __init__(self, table, leaf_size=16):
+        self.route_ids = table.index.to_numpy()
+        self.position = pd.Series(np.arange(len(table)), index=self.route_ids)
+
+        X = table[ROUTE_FEATURES].astype(float)
+        X[LOG_FEATURES] = np.log1p(X[LOG_FEATURES].clip(lower=0))
+        X = X.fillna(X.mean()).to_numpy()
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        clusters = pd.get_dummies(table['route_cluster']).to_numpy(dtype=float)
+        self.vectors = np.ascontiguousarray(np.hstack([(X - X.mean(axis=0)) / std, clusters]))
+
+        # Routes touching each airport (as origin or destination)
+        airports = np.concatenate([table['origin_id'].to_numpy(), table['dest_id'].to_numpy()])
+        members = np.concatenate([np.arange(len(table))] * 2)
+        order = np.argsort(airports, kind='stable')
+        airports, members = airports[order], members[order]
+        starts = np.flatnonzero(np.r_[True, airports[1:] != airports[:-1]])
+        self.trees = {}
+        for airport, group in zip(airports[starts], np.split(members, starts[1:])):
+            group = np.unique(group)
+            self.trees[int(airport)] = (KDTree(self.vectors[group], leaf_size=leaf_size), group)
+
+        self.origin_ids = table['origin_id'].to_numpy()
+        self.dest_ids = table['dest_id'].to_numpy()
+
+    def __len__(self):
+        return len(self.route_ids)
+
+    def query(self, route_id, k=10):
+        """
+        The `k` routes closest to `route_id` among those from its origin or into its destination.
+
+        Returns:
+            route_ids (np.ndarray): Nearest first; excludes the route itself. Empty for unknown routes.
+            distances (np.ndarray): Distances in the standardized feature space.
+        """
+        pos = self.position.get(route_id)
+        if pos is None:
+            return np.empty(0, dtype=self.route_ids.dtype), np.empty(0)
+        x = self.vectors[pos:pos + 1]
+
+        found, dists = [], []
+        for airport in (self.origin_ids[pos], self.dest_ids[pos]):
+            tree, members = self.trees[int(airport)]
+            dist, idx = tree.query(x, k=min(k + 1, len(members)))
+            found.append(members[idx[0]])
+            dists.append(dist[0])
+        found, dists = np.concatenate(found), np.concatenate(dists)
+
+        # Merge the two searches: drop the route itself and duplicates, nearest first
+        keep = found != pos
+        found, dists = found[keep], dists[keep]
+        order = np.argsort(dists, kind='stable')
+        found, dists = found[order], dists[order]
+        _, first = np.unique(found, return_index=True)
+        first = np.sort(first)[:k]
+        return self.route_ids[found[first]], dists[first]
+
+    def nbytes(self):
+        return self.vectors.nbytes + sum(members.nbytes for _, members in self.trees.values())
@@ -0,0 +1,243 @@
+import hashlib
+import inspect
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+PREP_CACHE_DIR = "prep_cache"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Content hash of a file, read in chunks (so renames and touches don't count as changes)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def atomic_write_csv(df, path):
+    """Writes `df` next to `path` and renames it into place, so readers never see a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def referenced_constants(obj):
+    """
+    Module-level values a function (or a class's methods) reads by name, e.g. bin edges or
+    column lists, including from nested functions and comprehensions. Modules, functions and
+    classes are left out: code is keyed by its source.
+
+    Returns:
+        dict: name → value, sorted by name.
+    """
+    if inspect.isclass(obj):
+        functions = [member for member in vars(obj).values() if inspect.isfunction(member)]
+    else:
+        functions = [inspect.unwrap(obj)]
+
+    constants = {}
+    for func in functions:
+        codes = [func.__code__]
+        while codes:
+            code = codes.pop()
+            codes.extend(const for const in code.co_consts if inspect.iscode(const))
+            for name in code.co_names:
+                if name not in func.__globals__:
+                    continue
+                value = func.__globals__[name]
+                if not (inspect.ismodule(value) or callable(value)):
+                    constants[name] = value
+    return dict(sorted(constants.items()))
+
+
+class Source:
+    """
+    An input file of the pipeline. Its cache key is the hash of its contents.
+
+    Parameters:
+        name (str): Name stages refer to it by.
+        path (str or Path): File location.
+        read (callable): Loads the file (default: pd.read_csv).
+    """
+
+    def __init__(self, name, path, read=pd.read_csv):
+        self.name = name
+        self.path = Path(path)
+        self.read = read
+
+    def key(self, input_keys):
+        return file_digest(self.path)
+
+
+class Stage:
+    """
+    One declared step: `func(*inputs, **params)` → pd.DataFrame.
+
+    The cache key combines the stage name, the source code of `func` (and of any helper in
+    `deps`), the module constants they read (`referenced_constants`), `params` and the keys of
+    its inputs, so changing the data, the code, a constant or a parameter anywhere upstream
+    changes the key of everything downstream. Stage functions must not
+    modify their inputs: independent stages share them across threads.
+
+    Parameters:
+        name (str): Stage name (also its cache sub-directory).
+        func (callable): The step.
+        inputs (list): Names of the sources/stages whose outputs are passed positionally.
+        params (dict, optional): Keyword arguments, part of the key.
+        deps (list, optional): Helper functions/classes whose code the step relies on.
+        targets (list, optional): Files the step writes as a side effect (e.g. exports); the
+            stage reruns if any of them is missing even when its output is cached.
+    """
+
+    def __init__(self, name, func, inputs=(), params=None, deps=(), targets=()):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.params = params or {}
+        self.deps = list(deps)
+        self.targets = [Path(target) for target in targets]
+
+    def key(self, input_keys):
+        code = [inspect.getsource(obj) for obj in [self.func] + self.deps]
+        constants = [referenced_constants(obj) for obj in [self.func] + self.deps]
+        return joblib.hash((self.name, code, constants, self.params, input_keys))[:16]
+
+
+class StagePipeline:
+    """
+    Runs declared stages in dependency order, with outputs cached on disk by key.
+
+    Keys are computed for every stage before anything runs (they only need the source file
+    hashes and the code), so unchanged stages are skipped without loading their data. Cached
+    outputs are read only when a stage that needs them has to run. Stages whose inputs are
+    ready run in parallel on a thread pool.
+
+    Layout: cache_dir/<stage>/<key>.parquet, written to a temporary name and renamed.
+
+    Parameters:
+        sources (list): `Source` objects.
+        stages (list): `Stage` objects.
+        cache_dir (str or Path): Cache root.
+    """
+
+    def __init__(self, sources, stages, cache_dir=PREP_CACHE_DIR):
+        self.nodes = {node.name: node for node in list(sources) + list(stages)}
+        if len(self.nodes) != len(sources) + len(stages):
+            raise ValueError("Source and stage names must be unique")
+        # A stage's written file read back as a source would change its own key on the next run
+        targets = {target.resolve(): stage.name for stage in stages for target in stage.targets}
+        for source in sources:
+            if source.path.resolve() in targets:
+                raise ValueError(f"Source '{source.name}' ({source.path}) is written by stage "
+                                 f"'{targets[source.path.resolve()]}'")
+        self.stages = list(stages)
+        self.cache_dir = Path(cache_dir)
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        order, state = [], {}
+
+        def visit(name, path):
+            if name not in self.nodes:
+                raise ValueError(f"Unknown input '{name}' (needed by {path[-1]})")
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Cycle in stages: {' → '.join(path + [name])}")
+            state[name] = "visiting"
+            for input_name in getattr(self.nodes[name], "inputs", []):
+                visit(input_name, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name, [])
+        return order
+
+    def keys(self):
+        """Cache key of every source and stage."""
+        keys = {}
+        for name in self.order:
+            node = self.nodes[name]
+            keys[name] = node.key([keys[input_name] for input_name in getattr(node, "inputs", [])])
+        return keys
+
+    def output_path(self, name, key):
+        return self.cache_dir / name / f"{key}.parquet"
+
+    def _is_fresh(self, stage, key):
+        return self.output_path(stage.name, key).exists() and all(target.exists() for target in stage.targets)
+
+    def run(self, workers=None, force=(), log=print):
+        """
+        Runs every stage whose output isn't cached (or that is listed in `force`).
+
+        Parameters:
+            workers (int, optional): Stages run at the same time (default: CPU count).
+            force (iterable): Stage names to rerun even if cached.
+            log (callable): Progress messages.
+
+        Returns:
+            pd.DataFrame: Per stage: status ('cached' / 'ran'), seconds, output rows, key.
+        """
+        keys = self.keys()
+        force = set(force)
+        pending = {stage.name for stage in self.stages
+                   if stage.name in force or not self._is_fresh(stage, keys[stage.name])}
+        report = {stage.name: {"stage": stage.name, "status": "cached", "seconds": 0.0, "rows": None,
+                               "key": keys[stage.name]} for stage in self.stages}
+
+        outputs = {}
+        load_lock = threading.Lock()
+
+        def load(name):
+            # Sources and cached stage outputs are read on first use only
+            with load_lock:
+                if name not in outputs:
+                    node = self.nodes[name]
+                    if isinstance(node, Source):
+                        outputs[name] = node.read(node.path)
+                    else:
+                        outputs[name] = pd.read_parquet(self.output_path(name, keys[name]))
+                return outputs[name]
+
+        def execute(stage):
+            start = time.perf_counter()
+            result = stage.func(*[load(name) for name in stage.inputs], **stage.params)
+            path = self.output_path(stage.name, keys[stage.name])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            result.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            with load_lock:
+                outputs[stage.name] = result
+            return time.perf_counter() - start, len(result)
+
+        running = {}
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            while pending or running:
+                for name in [n for n in self.order if n in pending]:
+                    stage = self.nodes[name]
+                    if not any(input_name in pending or input_name in running.values()
+                               for input_name in stage.inputs):
+                        pending.discard(name)
+                        running[pool.submit(execute, stage)] = name
+                        log(f"→ {name}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    seconds, rows = future.result()
+                    report[name].update(status="ran", seconds=seconds, rows=rows)
+                    log(f"✓ {name} ({seconds:.1f}s, {rows:,} rows)")
+
+        return pd.DataFrame([report[stage.name] for stage in self.stages])
@@ -0,0 +1,242 @@
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import (OneHotEncoder, PowerTransformer, StandardScaler,
+                                   FunctionTransformer, MinMaxScaler)
+from sklearn.metrics import (f1_score, recall_score, precision_score, hamming_loss,
+                             accuracy_score, average_precision_score, make_scorer)
+
+# Multi-output target
+TARGET_COLS = ['dep_delayed_15', 'arr_delayed_15']
+
+# Columns for encoding
+one_hot_cols = ['origin', 'dist_haul', 'dest_cluster', 'route_cluster']
+
+# Columns for transformation
+yeo_johnson_cols = ['airline_avg_arr_delay']
+log_cols = ['distance', 'route_density']
+sqrt_cols = ['airline_avg_dep_delay']
+
+# Delay score features (optional scaling for linear models)
+score_cols = ['month_delay_score', 'dow_delay_score', 'time_block_score']
+
+# Features to leave as-is
+passthrough_cols = ['is_redeye']
+
+FEATURE_COLS = one_hot_cols + yeo_johnson_cols + log_cols + sqrt_cols + score_cols + passthrough_cols
+
+# Raw high-cardinality categories, one-hot encoded only on the sparse path
+high_cardinality_cols = ['dest', 'route', 'airline_name']
+SPARSE_FEATURE_COLS = FEATURE_COLS + high_cardinality_cols
+
+# Route × airline delay-minute tails (utils.quantiles.add_quantile_features), optional
+quantile_cols = [f"{col}_p{q}" for col in ['dep_delay', 'arr_delay'] for q in [50, 90, 99]]
+QUANTILE_FEATURE_COLS = FEATURE_COLS + quantile_cols
+
+MONTH_ORDER = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+               'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def make_linear_preprocessor():
+    """The notebook's `linear_preprocessor` (unfitted)."""
+    yeo_pipeline = Pipeline([
+        ('yeo', PowerTransformer(method='yeo-johnson')),
+        ('scale', StandardScaler())
+    ])
+
+    log_pipeline = Pipeline([
+        ('log', FunctionTransformer(np.log1p, validate=True)),
+        ('scale', StandardScaler())
+    ])
+
+    sqrt_pipeline = Pipeline([
+        ('sqrt', FunctionTransformer(np.sqrt, validate=True)),
+        ('scale', StandardScaler())
+    ])
+
+    score_pipeline = Pipeline([
+        ('scale', MinMaxScaler())
+    ])
+
+    return ColumnTransformer(transformers=[
+        ('yeo', yeo_pipeline, yeo_johnson_cols),
+        ('log', log_pipeline, log_cols),
+        ('sqrt', sqrt_pipeline, sqrt_cols),
+        ('score', score_pipeline, score_cols),
+        ('onehot', OneHotEncoder(sparse_output=False), one_hot_cols),
+        ('passthrough', 'passthrough', passthrough_cols),
+    ])
+
+
+def make_sparse_linear_preprocessor(sparse=True):
+    """
+    `linear_preprocessor` plus one-hot raw dest / route / airline_name, producing a CSR matrix.
+
+    The one-hot blocks are sparse and `sparse_threshold=1.0` keeps the stacked output (with the
+    scaled numeric and passthrough columns) in CSR form, so the design matrix never goes dense.
+    With sparse=False the same features are built densely, for comparison.
+    """
+    preprocessor = make_linear_preprocessor()
+    transformers = [t for t in preprocessor.transformers if t[0] != 'onehot']
+    transformers.insert(-1, (
+        'onehot',
+        OneHotEncoder(sparse_output=sparse, handle_unknown='ignore', dtype=np.float64),
+        one_hot_cols + high_cardinality_cols
+    ))
+    return ColumnTransformer(transformers=transformers, sparse_threshold=1.0 if sparse else 0.0)
+
+
+def make_quantile_linear_preprocessor():
+    """`linear_preprocessor` plus the standardized delay quantile features."""
+    preprocessor = make_linear_preprocessor()
+    transformers = list(preprocessor.transformers)
+    transformers.insert(-1, ('quantile', StandardScaler(), quantile_cols))
+    return ColumnTransformer(transformers=transformers)
+
+
+def make_tree_preprocessor():
+    """The notebook's `tree_preprocessor` (unfitted): skip scaling, keep log transform where needed."""
+    return ColumnTransformer(transformers=[
+        ('log', FunctionTransformer(np.log1p, validate=True), log_cols),
+        ("onehot", OneHotEncoder(sparse_output=False), one_hot_cols),
+        ("pass", "passthrough", yeo_johnson_cols + sqrt_cols + score_cols + passthrough_cols)
+    ])
+
+
+def with_route(flights_df):
+    """Adds the 'ORIGIN - DEST' route key used by the lookups, if it's missing."""
+    if 'route' in flights_df.columns:
+        return flights_df
+    return flights_df.assign(route=flights_df['origin'] + ' - ' + flights_df['dest'])
+
+
+def split_features_targets(flights_df, feature_cols=FEATURE_COLS):
+    """
+    Splits the cleaned dataset into model features and the multi-output target.
+
+    Parameters:
+        feature_cols (list): FEATURE_COLS, or SPARSE_FEATURE_COLS for the sparse path.
+
+    Returns:
+        X (pd.DataFrame): Feature columns used by the pipelines.
+        y (pd.DataFrame): 'dep_delayed_15' and 'arr_delayed_15'.
+    """
+    if 'route' in feature_cols:
+        flights_df = with_route(flights_df)
+    return flights_df[feature_cols], flights_df[TARGET_COLS]
+
+
+def time_split(X, y, train_frac=0.8):
+    """Split by time, as in the notebook: first `train_frac` of rows train, the rest test."""
+    split_index = int(train_frac * len(X))
+    return X.iloc[:split_index], X.iloc[split_index:], y.iloc[:split_index], y.iloc[split_index:]
+
+
+def get_multioutput_proba(model, X):
+    """
+    Extracts predicted probabilities for the positive class (label=1)
+    from a multi-output classification model.
+
+    Parameters:
+        model: Trained multi-output model (e.g., MultiOutputClassifier).
+        X (array-like): Feature data to predict on.
+
+    Returns:
+        np.ndarray: Array of shape (n_samples, n_outputs) with probabilities
+                    for class 1 of each output.
+    """
+    if not hasattr(model, "estimators_"):
+        raise ValueError("The model must be a fitted MultiOutputClassifier with estimators_ attribute.")
+
+    proba_matrix = np.column_stack([
+        clf.predict_proba(X)[:, 1] for clf in model.estimators_
+    ])
+
+    return proba_matrix
+
+
+def evaluate_multioutput_model(y_true, y_pred, y_proba=None, label_names=None, average='binary', verbose=True):
+    """
+    Evaluates a multi-output binary classification model.
+
+    Parameters:
+        y_true (array-like): Ground truth binary labels, shape (n_samples, n_outputs).
+        y_pred (array-like): Predicted binary labels, shape (n_samples, n_outputs).
+        y_proba (array-like, optional): Predicted probabilities, same shape as y_true. Required for PR AUC.
+        label_names (list, optional): List of label names for reporting. Defaults to "Label 0", "Label 1", etc.
+        average (str): Averaging method for metrics ('binary', 'micro', 'macro', etc.).
+        verbose (bool): Print the metrics.
+
+    Returns:
+        metrics_dict (dict): Dictionary with overall metrics.
+        detailed_df (pd.DataFrame): DataFrame with precision, recall, F1 per label.
+    """
+    y_true = np.array(y_true)
+    y_pred = np.array(y_pred)
+    n_labels = y_true.shape[1]
+    label_names = label_names or [f"Label {i}" for i in range(n_labels)]
+
+    f1s, precisions, recalls, pr_aucs = [], [], [], []
+
+    for i in range(n_labels):
+        f1s.append(f1_score(y_true[:, i], y_pred[:, i], average=average))
+        recalls.append(recall_score(y_true[:, i], y_pred[:, i], average=average))
+        precisions.append(precision_score(y_true[:, i], y_pred[:, i], average=average))
+
+        if y_proba is not None:
+            pr_aucs.append(average_precision_score(y_true[:, i], y_proba[:, i]))
+        else:
+            pr_aucs.append(np.nan)
+
+    hamming = hamming_loss(y_true, y_pred)
+    subset_acc = accuracy_score(y_true, y_pred)
+
+    detailed_df = pd.DataFrame({
+        "Label": label_names,
+        "Recall": recalls,
+        "Precision": precisions,
+        "F1 Score": f1s,
+        "PR AUC": pr_aucs
+    })
+
+    metrics_dict = {
+        "Hamming Loss": hamming,
+        "Subset Accuracy": subset_acc,
+        "Average PR AUC": np.nanmean(pr_aucs)
+    }
+
+    if verbose:
+        print("==== Overall Metrics ====")
+        for k, v in metrics_dict.items():
+            print(f"{k}: {v:.2f}" if isinstance(v, float) else f"{k}: {v}")
+
+        print("\n==== Per-Label Metrics ====")
+        print(detailed_df.round(2).to_string(index=False))
+
+    return metrics_dict, detailed_df
+
+
+# Custom scoring function to average PR AUC across all labels
+def multilabel_avg_precision(y_true, y_pred_proba):
+    y_true = np.asarray(y_true)
+    # predict_proba output is a list of (n, 2) arrays; newer scorers pass the (n, n_outputs) positive-class matrix
+    if isinstance(y_pred_proba, list):
+        y_pred_proba = np.column_stack([p[:, 1] for p in y_pred_proba])
+
+    scores = []
+    for i in range(y_true.shape[1]):
+        class_1_probs = y_pred_proba[:, i]  # Prob for class 1
+        y_true_label = y_true[:, i]
+        # Can't compute average_precision_score if only one class present
+        if len(np.unique(y_true_label)) < 2:
+            scores.append(0)
+            continue
+        score = average_precision_score(y_true_label, class_1_probs)
+        scores.append(0 if np.isnan(score) else score)
+    return np.mean(scores)
+
+
+def make_pr_auc_scorer():
+    """Scorer for search CV: average PR AUC over the outputs of a MultiOutputClassifier."""
+    return make_scorer(multilabel_avg_precision, response_method="predict_proba")
@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+from pathlib import Path
+
+import pandas as pd
+
+from utils.artifacts import APP_DIR
+from utils.logs import ensure_handler
+
+# Written once warm-up succeeds, for deploy readiness probes (e.g. `test -f streamlit_app/warmup.ready`).
+# Anchored to the app directory rather than the working directory; WARMUP_READY_FILE overrides it
+READY_FILE_PATH = Path(os.environ.get("WARMUP_READY_FILE", APP_DIR / "warmup.ready"))
+
+# Synthetic submission used to exercise the prediction path (airline and route come from the lookups)
+WARMUP_INPUT = {"month": "Jan", "day_of_week": "Mon", "dep_hour": 12}
+
+logger = logging.getLogger("flight_delay.warmup")
+
+_warmup_lock = threading.Lock()
+_reloader_lock = threading.Lock()
+_warmup = None
+_reloader = None
+
+
+def _raise(e):
+    raise e
+
+
+def build_warm_artifacts(version):
+    """
+    `utils.prediction.build_artifacts`, followed by one synthetic prediction, SHAP explanation
+    and alternatives search on the new artifacts, so the first real request on this version
+    runs at steady-state latency.
+
+    Returns:
+        dict: The artifacts, plus 'warmup_seconds' (step → seconds).
+    """
+    from utils.alternatives import find_best_alternatives
+    from utils.prediction import build_artifacts, predict_and_explain
+
+    timings = {}
+    start = time.perf_counter()
+    artifacts = build_artifacts(version)
+    timings["artifacts + indexes"] = time.perf_counter() - start
+
+    airline_delay_lookup, route_dist_lookup = artifacts["lookups"][:2]
+    user_input = dict(WARMUP_INPUT,
+                      airline_name=airline_delay_lookup["airline_name"].iloc[0],
+                      route=route_dist_lookup["route"].iloc[0])
+
+    start = time.perf_counter()
+    predict_and_explain(artifacts, user_input, on_error=_raise)
+    timings["prediction + explanation"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    find_best_alternatives(artifacts["pipeline"], artifacts["lookup_index"], user_input["route"],
+                           user_input["month"], [user_input["airline_name"]])
+    timings["alternatives search"] = time.perf_counter() - start
+
+    artifacts["warmup_seconds"] = timings
+    return artifacts
+
+
+def get_artifact_reloader():
+    """
+    The process-wide `HotReloader` over the prediction artifacts (shared by every session).
+
+    Every version it serves, including hot-swapped ones, has been warmed by
+    `build_warm_artifacts`. The first call builds the first version; concurrent callers wait for it.
+    """
+    global _reloader
+    with _reloader_lock:
+        if _reloader is None:
+            from utils.hot_reload import HotReloader
+            from utils.prediction import artifact_fingerprint
+            _reloader = HotReloader(artifact_fingerprint, build_warm_artifacts, poll_seconds=15)
+        return _reloader
+
+
+class Warmup:
+    """
+    Background warm-up of the prediction path, with a readiness signal.
+
+    Steps: import the heavy modules (shap, sklearn, cloudpickle via utils.prediction), then build
+    the first artifact version through `get_artifact_reloader` (unpickle the pipeline, download
+    and index the lookups, fit the cluster assigners, run a synthetic prediction, explanation
+    and alternatives search).
+
+    `ready` is set only when every step succeeded; `finished` is set either way. On success
+    READY_FILE_PATH is written with the step timings. A failed warm-up leaves `error` set and
+    the Predictor builds the artifacts on demand, as it did before.
+    """
+
+    def __init__(self, ready_file=READY_FILE_PATH):
+        self.ready_file = Path(ready_file)
+        self.ready = threading.Event()
+        self.finished = threading.Event()
+        self.error = None
+        self.started_at = pd.Timestamp.now()
+        self.seconds = None
+        self.timings = {}
+
+        # A ready file left by a previous process doesn't vouch for this one
+        self.ready_file.unlink(missing_ok=True)
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            step_start = time.perf_counter()
+            import utils.alternatives  # noqa: F401
+            import utils.prediction  # noqa: F401
+            self.timings["imports"] = time.perf_counter() - step_start
+
+            self.timings.update(get_artifact_reloader().current()["warmup_seconds"])
+            self.seconds = time.perf_counter() - start
+
+            self.ready_file.write_text(json.dumps({"seconds": self.seconds, "steps": self.timings}, indent=2))
+            self.ready.set()
+            logger.info("ready in %.1fs (%s)", self.seconds,
+                        ", ".join(f"{step} {seconds:.1f}s" for step, seconds in self.timings.items()))
+        except Exception:
+            self.seconds = time.perf_counter() - start
+            self.error = traceback.format_exc(limit=3)
+            logger.error("warm-up failed after %.1fs:\n%s", self.seconds, self.error)
+        finally:
+            self.finished.set()
+
+    def wait(self, timeout=None):
+        """Blocks until warm-up has finished (or `timeout` seconds). Returns True when ready."""
+        self.finished.wait(timeout)
+        return self.ready.is_set()
+
+    def status(self):
+        """'warming up', 'ready' or 'failed'."""
+        if not self.finished.is_set():
+            return "warming up"
+        return "ready" if self.ready.is_set() else "failed"
+
+
+def start_warmup():
+    """Starts the warm-up once per process (from whichever page runs first) and returns it."""
+    global _warmup
+    with _warmup_lock:
+        if _warmup is None:
+            ensure_handler(logger)
+            _warmup = Warmup()
+        return _warmup
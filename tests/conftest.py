@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app's modules import each other as `utils.*`, as when Streamlit runs from streamlit_app/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "streamlit_app"))
@@ -0,0 +1,121 @@
+"""
+Smoke test of the Predictor path: `build_artifacts` on a small synthetic dataset, then one
+`predict_and_explain` submission, as the page and the warm-up run them.
+"""
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("shap")
+cloudpickle = pytest.importorskip("cloudpickle")
+pytest.importorskip("gdown")
+
+from sklearn.linear_model import LogisticRegression  # noqa: E402
+from sklearn.multioutput import MultiOutputClassifier  # noqa: E402
+from sklearn.pipeline import Pipeline  # noqa: E402
+
+ORIGINS = ["EWR", "JFK", "LGA"]
+DESTS = ["ATL", "ORD", "LAX", "MIA", "BOS"]
+AIRLINES = ["Alpha Airlines", "Beta Airways", "Gamma Air"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def synthetic_flights(n_rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "airline_name": rng.choice(AIRLINES, n_rows),
+        "origin": rng.choice(ORIGINS, n_rows),
+        "dest": rng.choice(DESTS, n_rows),
+        "month": rng.choice(MONTHS, n_rows),
+        "day_of_week": rng.choice(DAYS, n_rows),
+        "hour": rng.integers(0, 24, n_rows),
+        "dep_delayed_15": rng.integers(0, 2, n_rows),
+        "arr_delayed_15": rng.integers(0, 2, n_rows),
+    })
+
+
+def synthetic_lookups(flights):
+    routes = sorted({f"{o} - {d}" for o, d in zip(flights["origin"], flights["dest"])})
+    rng = np.random.default_rng(1)
+    airline_delay = pd.DataFrame({
+        "airline_name": AIRLINES,
+        "airline_avg_arr_delay": rng.uniform(-2, 15, len(AIRLINES)),
+        "airline_avg_dep_delay": rng.uniform(5, 20, len(AIRLINES)),
+    })
+    route_dist = pd.DataFrame({
+        "route": routes,
+        "route_density": rng.integers(50, 5_000, len(routes)),
+        "dist_haul": rng.choice(["Short", "Medium", "Long"], len(routes)),
+        "distance": rng.integers(150, 2_500, len(routes)),
+    })
+    # One destination and one route left unclustered, for the nearest-centroid assigners
+    dest_cluster = pd.DataFrame({"dest": DESTS[:-1], "dest_cluster": np.arange(len(DESTS) - 1) % 3})
+    route_cluster = pd.DataFrame({"route": routes[:-1], "route_cluster": np.arange(len(routes) - 1) % 4})
+    return airline_delay, route_dist, dest_cluster, route_cluster
+
+
+@pytest.fixture
+def model_version(tmp_path, monkeypatch):
+    """Synthetic lookups and flight summaries on disk, and a pipeline fitted on the flights' features."""
+    from utils import data, flight_summaries
+    from utils.features import build_feature_frame, index_lookups
+    from utils.training import FEATURE_COLS, TARGET_COLS, make_linear_preprocessor
+
+    flights = synthetic_flights()
+    lookups = synthetic_lookups(flights)
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(data, "LOOKUPS_DIR", tmp_path / "lookups")
+    monkeypatch.setattr(flight_summaries, "LOOKUPS_DIR", tmp_path / "lookups")
+    (tmp_path / "lookups").mkdir()
+    for name, frame in zip(data.LOOKUP_NAMES, lookups):
+        frame.to_csv(tmp_path / "lookups" / f"{name}.csv", index=False)
+    flight_summaries.export_flight_summaries(flights)
+
+    raw = pd.DataFrame({
+        "airline_name": flights["airline_name"],
+        "route": flights["origin"] + " - " + flights["dest"],
+        "month": flights["month"],
+        "day_of_week": flights["day_of_week"],
+        "dep_hour": flights["hour"],
+    })
+    X = build_feature_frame(raw, index_lookups(*lookups))[FEATURE_COLS]
+    pipeline = Pipeline([
+        ("preprocessor", make_linear_preprocessor()),
+        ("classifier", MultiOutputClassifier(LogisticRegression(max_iter=500))),
+    ]).fit(X, flights[TARGET_COLS])
+
+    path = tmp_path / "logreg_pipeline.pkl"
+    with open(path, "wb") as f:
+        cloudpickle.dump(pipeline, f)
+    return str(path), os.path.getmtime(path), data.lookup_fingerprint()
+
+
+def test_build_artifacts_and_predict(model_version, monkeypatch):
+    from utils import flight_summaries
+    from utils.prediction import build_artifacts, predict_and_explain
+
+    # A build reads only the exported lookups and summaries, never the flights dataset
+    def read_flights(*args, **kwargs):
+        raise AssertionError("build_artifacts read the flights dataset")
+    monkeypatch.setattr(flight_summaries, "read_flights", read_flights)
+
+    artifacts = build_artifacts(model_version)
+    for name in ["pipeline", "lookups", "codebook", "lookup_index", "route_index", "shap_background"]:
+        assert name in artifacts
+
+    # The unclustered destination goes through the nearest-centroid assigner
+    user_input = {"airline_name": AIRLINES[0], "route": f"EWR - {DESTS[-1]}",
+                  "month": "Jul", "day_of_week": "Fri", "dep_hour": 18}
+    errors = []
+    result = predict_and_explain(artifacts, user_input, on_error=errors.append)
+
+    assert not errors
+    df_input, prediction, recommendations = result
+    assert df_input.loc[0, "origin"] == "EWR" and df_input.loc[0, "dest"] == DESTS[-1]
+    assert prediction.shape == (1, 2)
+    assert isinstance(recommendations, dict)